@@ -5,11 +5,12 @@ A professional GUI for generating meme videos with customization options.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, filedialog, colorchooser
+from tkinter import ttk, messagebox, scrolledtext, filedialog, colorchooser, simpledialog
 import os
 import sys
 import json
 import threading
+import time
 import shutil
 import subprocess
 import webbrowser
@@ -22,8 +23,15 @@ from packaging import version
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.core.asset_catalog import AssetCatalog, IMAGES, OUTPUTS, QUOTES, SOUNDS
 from src.core.niche_manager import NicheManager
-from src.utils import get_config, init_config, setup_logger
+from src.core.niche_watcher import NicheWatcher
+from src.processors.covers import thumbnail_path
+from src.processors.render_core import MemeRenderer
+from src.processors.render_plan import DEFAULT_VIDEO_SETTINGS, compile_render_plan, load_video_settings
+from src.utils import get_config, get_next_filename, init_config, setup_logger
+from src.utils.progress import BatchEta, format_eta
+from src.utils.resources import JobCancelled, get_resource_manager
 
 
 class MemeGeneratorGUI:
@@ -71,27 +79,14 @@ class MemeGeneratorGUI:
             sys.exit(1)
         
         self.current_niche = None
+        self.asset_catalog = None
+        self.niche_watcher = None
         self.processing = False
+        self.cancel_requested = threading.Event()
         self.repo_slug = "flodlol/Reel-Generator"
         
-        # Default video settings
-        self.video_settings = {
-            'font': 'Arial',
-            'font_size': 72,
-            'font_color': 'text_box_white',
-            'fade_duration': 0.5,
-            'fade_in_start': True,
-            'fade_out_end': True,
-            'sound_fade': 0.3,
-            'text_position': 'above',
-            'bg_color': '#000000',
-            'part_enabled': False,
-            'part_start_number': 1,
-            'part_font': 'Arial',
-            'part_font_size': 36,
-            'part_color': 'white_outline',
-            'part_text_position': 'below'
-        }
+        # Default video settings (replaced by the niche's video_settings.json on selection)
+        self.video_settings = dict(DEFAULT_VIDEO_SETTINGS)
         
         # Setup UI
         self.setup_ui()
@@ -204,6 +199,7 @@ class MemeGeneratorGUI:
         file_menu.add_command(label="New Niche", command=self.create_niche_dialog)
         file_menu.add_separator()
         file_menu.add_command(label="Open Output Folder", command=self.open_output_folder)
+        file_menu.add_command(label="Build Compilation...", command=self.build_compilation)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
@@ -215,6 +211,7 @@ class MemeGeneratorGUI:
         import_menu.add_command(label="Import Sounds List", command=self.import_sounds)
         import_menu.add_separator()
         import_menu.add_command(label="Download Sounds", command=self.download_sounds_menu)
+        import_menu.add_command(label="Find Duplicate Sounds", command=self.find_duplicate_sounds)
         
         # Customize menu
         customize_menu = tk.Menu(menubar, tearoff=0)
@@ -325,6 +322,28 @@ class MemeGeneratorGUI:
                      command=self.generate_memes, width=20, style="Accent.TButton")
         self.gen_btn.pack(side=tk.LEFT)
 
+        self.cancel_btn = ttk.Button(left_actions, text="⏹ Cancel",
+                        command=self.cancel_generation, width=10, state='disabled')
+        self.cancel_btn.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.draft_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left_actions, text="Draft (540x960)",
+                        variable=self.draft_var).pack(side=tk.LEFT, padx=(10, 0))
+
+        ttk.Label(left_actions, text="Slides:").pack(side=tk.LEFT, padx=(10, 0))
+        self.slides_var = tk.IntVar(value=1)
+        slides_spin = ttk.Spinbox(left_actions, from_=1, to=5, textvariable=self.slides_var, width=4)
+        slides_spin.configure(style="Dark.TSpinbox")
+        slides_spin.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.promote_btn = ttk.Button(left_actions, text="✅ Promote Drafts",
+                         command=self.show_promote_drafts, width=18)
+        self.promote_btn.pack(side=tk.LEFT, padx=(10, 0))
+
+        self.sheet_btn = ttk.Button(left_actions, text="🗂 Contact Sheet",
+                       command=self.show_contact_sheet, width=18)
+        self.sheet_btn.pack(side=tk.LEFT, padx=(10, 0))
+
         right_actions = ttk.Frame(actions_row)
         right_actions.pack(side=tk.RIGHT)
 
@@ -379,7 +398,10 @@ class MemeGeneratorGUI:
             self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
 
         self.preview_content.bind("<Configure>", update_preview_scroll)
-        self.preview_thumbnails = []
+        self.preview_thumbnails = {}
+        self.preview_cells = {}
+        self.preview_strip = None
+        self.preview_header = None
         
         # Status bar
         status_frame = ttk.Frame(self.root)
@@ -430,10 +452,54 @@ class MemeGeneratorGUI:
                 self.current_niche = os.path.join(self.niche_manager.niches_base_path, niche)
                 break
         
+        self.video_settings = load_video_settings(self.current_niche)
+        self.watch_current_niche()
         self.update_niche_info()
         self.update_output_preview()
         self.log(f"📁 Selected niche: {selected}")
     
+    def watch_current_niche(self):
+        """Build the asset catalog for the current niche and watch it for changes."""
+        if self.niche_watcher:
+            self.niche_watcher.stop()
+            self.niche_watcher = None
+        
+        self.asset_catalog = AssetCatalog(self.current_niche)
+        self.asset_catalog.scan()
+        
+        watcher = NicheWatcher(
+            self.asset_catalog,
+            lambda changes: self.root.after(0, lambda: self.on_assets_changed(changes))
+        )
+        try:
+            if watcher.start():
+                self.niche_watcher = watcher
+        except Exception as e:
+            self.logger.warning(f"Filesystem watcher unavailable: {e}")
+    
+    def on_assets_changed(self, changes):
+        """Apply catalog changes reported by the niche watcher to the UI."""
+        if not self.asset_catalog:
+            return
+        
+        self.update_niche_info()
+        
+        changed_outputs = {name for category, name in changes if category == OUTPUTS}
+        if changed_outputs:
+            self.update_output_preview(changed_outputs)
+    
+    def refresh_assets(self):
+        """Refresh the niche info and preview, rescanning only when no watcher is running."""
+        if not self.current_niche:
+            return
+        if self.asset_catalog is None:
+            self.watch_current_niche()
+        elif self.niche_watcher is None:
+            self.asset_catalog.scan()
+        self.update_niche_info()
+        if self.niche_watcher is None:
+            self.update_output_preview()
+    
     def update_niche_info(self):
         """Update niche information display."""
         if not self.current_niche:
@@ -448,34 +514,12 @@ class MemeGeneratorGUI:
             if niche_name.startswith('!'):
                 niche_name = niche_name[1:]
             
-            # Get video counts
-            final_videos_path = os.path.join(self.current_niche, 'Meme-Final')
-            if os.path.exists(final_videos_path):
-                videos = [f for f in os.listdir(final_videos_path) 
-                         if f.endswith('.mp4')]
-                total_videos = len(videos)
-            else:
-                total_videos = 0
-            
-            # Get content stats
-            quotes_file = os.path.join(self.current_niche, 'Quotes.txt')
-            images_folder = os.path.join(self.current_niche, 'Raw-Images')
-            audio_folder = os.path.join(self.current_niche, 'TikTok-Sounds')
-            
-            quotes_count = 0
-            if os.path.exists(quotes_file):
-                with open(quotes_file, 'r') as f:
-                    quotes_count = len([l for l in f if l.strip() and not l.startswith('#')])
-            
-            images_count = 0
-            if os.path.exists(images_folder):
-                images_count = len([f for f in os.listdir(images_folder) 
-                                  if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))])
-            
-            audio_count = 0
-            if os.path.exists(audio_folder):
-                audio_count = len([f for f in os.listdir(audio_folder) 
-                                 if f.lower().endswith('.mp3')])
+            # Get content counts from the catalog (kept current by the watcher)
+            counts = self.asset_catalog.counts()
+            total_videos = counts[OUTPUTS]
+            quotes_count = counts[QUOTES]
+            images_count = counts[IMAGES]
+            audio_count = counts[SOUNDS]
             
             # Format info
             info = f"Niche: {niche_name}\n\n"
@@ -508,29 +552,43 @@ class MemeGeneratorGUI:
         self.log_text.see(tk.END)
         self.logger.info(message)
     
-    def set_status(self, message, processing=False, progress=0):
-        """Update status bar."""
+    def set_status(self, message, processing=False, progress=0, cancellable=False):
+        """Update status bar; Cancel is only offered for operations that stop on JobCancelled."""
         self.status_var.set(message)
         self.processing = processing
         
         if processing:
             self.progress['value'] = progress
-            self.disable_buttons()
+            self.disable_buttons(cancellable)
         else:
             self.progress['value'] = 0
             self.enable_buttons()
     
-    def disable_buttons(self):
+    def disable_buttons(self, cancellable=False):
         """Disable action buttons."""
         self.gen_btn.config(state='disabled')
+        self.promote_btn.config(state='disabled')
+        self.sheet_btn.config(state='disabled')
         self.customize_btn.config(state='disabled')
         self.folder_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal' if cancellable else 'disabled')
     
     def enable_buttons(self):
         """Enable action buttons."""
         self.gen_btn.config(state='normal')
+        self.promote_btn.config(state='normal')
+        self.sheet_btn.config(state='normal')
         self.customize_btn.config(state='normal')
         self.folder_btn.config(state='normal')
+        self.cancel_btn.config(state='disabled')
+
+    def cancel_generation(self):
+        """Cancel the running generation or promotion, stopping the current encode."""
+        self.cancel_requested.set()
+        self.cancel_btn.config(state='disabled')
+        self.status_var.set("Cancelling...")
+        # Kills the running ffmpeg processes; the job unwinds and removes its partial files
+        get_resource_manager().cancel_all()
     
     def generate_memes(self):
         """Generate memes."""
@@ -539,15 +597,17 @@ class MemeGeneratorGUI:
             return
         
         count = self.gen_count.get()
-        self.log(f"🎨 Starting generation of {count} meme(s)...")
-        self.set_status(f"Generating {count} meme(s)...", processing=True)
+        draft = self.draft_var.get()
+        kind = "draft(s)" if draft else "meme(s)"
+        self.log(f"🎨 Starting generation of {count} {kind}...")
+        self.set_status(f"Generating {count} {kind}...", processing=True, cancellable=True)
         
         # Run in thread to not block UI
-        thread = threading.Thread(target=self._generate_thread, args=(count,))
+        thread = threading.Thread(target=self._generate_thread, args=(count, draft))
         thread.daemon = True
         thread.start()
     
-    def _generate_thread(self, count):
+    def _generate_thread(self, count, draft=False, selections=None):
         """Thread for generation - runs in background to avoid UI blocking."""
         error_occurred = False
         error_str = ""
@@ -560,33 +620,68 @@ class MemeGeneratorGUI:
             # Set the base path for generator
             generator_engine.BASE_PATH = self.current_niche
             
-            # Apply video settings to generator
-            # TODO: Pass video_settings to generator_engine
-            
-            # Run generation
-            for i in range(count):
-                if not self.processing:
-                    self.root.after(0, lambda: self.log("⚠️  Generation cancelled by user"))
-                    break
-                
-                # Update progress
-                progress_percent = int((i / count) * 100)
-                self.root.after(0, lambda p=progress_percent, idx=i: 
-                               self.set_status(f"Generating video {idx+1}/{count}...", processing=True, progress=p))
-                self.root.after(0, lambda idx=i: self.log(f"🎨 Generating video {idx+1}/{count}..."))
-                
-                try:
-                    # Pass auto_count=1 to generate 1 video at a time without prompting
-                    generator_engine.main(self.current_niche, auto_count=1)
+            video_settings = dict(self.video_settings)
+            kind = "draft" if draft else "video"
+            slides = self.slides_var.get()
+            self.cancel_requested.clear()
+            eta = BatchEta(count)
+            last_update = [0.0]
+
+            def show_progress():
+                done = eta.finished_jobs
+                text = f"Generating {kind}s — {done}/{count} done — ETA {format_eta(eta.eta())}"
+                self.root.after(0, lambda: self.cancel_requested.is_set() or
+                                self.set_status(text, processing=True, progress=eta.fraction() * 100,
+                                                cancellable=True))
+
+            def on_wait(position):
+                self.root.after(0, lambda: self.cancel_requested.is_set() or self.set_status(
+                    f"Waiting for an encode slot (position {position})",
+                    processing=True, progress=eta.fraction() * 100, cancellable=True))
+
+            def on_progress(job):
+                # Called from encoder threads several times a second; redraw at most every 100 ms
+                eta.update(job)
+                now = time.monotonic()
+                if now - last_update[0] >= 0.1:
+                    last_update[0] = now
+                    show_progress()
+
+            def on_job_done(idx, name, outcome):
+                nonlocal success_count
+                eta.job_finished(name)
+                if isinstance(outcome, JobCancelled):
+                    return
+                if isinstance(outcome, Exception):
+                    self.root.after(0, lambda err=str(outcome): self.log(f"⚠️  Error on {kind} {idx+1}: {err}"))
+                else:
                     success_count += 1
-                    self.root.after(0, lambda idx=i: self.log(f"✅ Video {idx+1}/{count} generated successfully"))
-                except Exception as e:
-                    self.root.after(0, lambda idx=i, err=str(e): self.log(f"⚠️  Error on video {idx+1}: {err}"))
+                    self.root.after(0, lambda: self.log(f"✅ {kind.capitalize()} {idx+1}/{count} generated successfully"))
+                show_progress()
+
+            # Run generation; videos run in parallel on the autotuned number of workers
+            show_progress()
+            self.root.after(0, lambda: self.log(f"🎨 Generating {count} {kind}(s)..."))
+            try:
+                if selections is not None:
+                    generator_engine.main(self.current_niche, video_settings=video_settings, draft=draft,
+                                          selections=selections, on_progress=on_progress, on_wait=on_wait,
+                                          on_job_done=on_job_done, keep_going=True,
+                                          cancel_event=self.cancel_requested)
+                else:
+                    generator_engine.main(self.current_niche, auto_count=count, video_settings=video_settings,
+                                          draft=draft, slides=slides, on_progress=on_progress, on_wait=on_wait,
+                                          on_job_done=on_job_done, keep_going=True,
+                                          cancel_event=self.cancel_requested)
+            except JobCancelled:
+                pass
+            if self.cancel_requested.is_set():
+                self.root.after(0, lambda: self.log("⚠️  Generation cancelled by user"))
             
             # Set progress to 100% when done
             if success_count > 0:
                 self.root.after(0, lambda: self.set_status("Generation complete!", processing=True, progress=100))
-                self.root.after(0, lambda: self.log(f"✅ Generation completed! Created {success_count}/{count} videos"))
+                self.root.after(0, lambda: self.log(f"✅ Generation completed! Created {success_count}/{count} {kind}s"))
         except Exception as e:
             import traceback
             error_msg = traceback.format_exc()
@@ -599,11 +694,13 @@ class MemeGeneratorGUI:
             def final_update():
                 try:
                     self.set_status("Ready", processing=False)
-                    self.update_niche_info()
-                    self.update_output_preview()
+                    self.refresh_assets()
                     
                     if error_occurred:
                         messagebox.showerror("Error", f"Failed to generate videos:\n{error_str}")
+                    elif success_count > 0 and draft:
+                        messagebox.showinfo("Success", f"Generated {success_count}/{count} draft(s)!\n"
+                                                       f"Review them in Meme-Drafts, then use Promote Drafts.")
                     elif success_count > 0:
                         messagebox.showinfo("Success", f"Generated {success_count}/{count} video(s)! Check the output folder.")
                     elif success_count == 0:
@@ -613,14 +710,335 @@ class MemeGeneratorGUI:
             
             self.root.after(0, final_update)
     
-    def update_output_preview(self):
-        """Update the output folder preview."""
+    def show_contact_sheet(self):
+        """Plan the next memes, show them as a contact sheet and generate the approved ones."""
         if not self.current_niche:
+            messagebox.showwarning("No Niche", "Please select a niche first.")
+            return
+        
+        from PIL import ImageTk
+        from src.processors import contact_sheet
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Contact Sheet")
+        dialog.geometry("1100x800")
+        dialog.transient(self.root)
+        
+        state = {'candidates': [], 'rejected': set(), 'sheet': None, 'columns': 0,
+                 'tile_size': (1, 1), 'scale': 1.0, 'photo': None, 'planning': False}
+        
+        top_frame = ttk.Frame(dialog, padding="10")
+        top_frame.pack(fill=tk.X)
+        ttk.Label(top_frame, text="Candidates:").pack(side=tk.LEFT)
+        plan_count = tk.IntVar(value=max(self.gen_count.get(), 12))
+        ttk.Spinbox(top_frame, from_=1, to=100, textvariable=plan_count, width=6).pack(side=tk.LEFT, padx=10)
+        plan_btn = ttk.Button(top_frame, text="🔀 Plan", width=12)
+        plan_btn.pack(side=tk.LEFT)
+        summary_label = ttk.Label(top_frame, text="Click a tile to reject it.")
+        summary_label.pack(side=tk.LEFT, padx=15)
+        
+        canvas_frame = ttk.Frame(dialog)
+        canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        sheet_canvas = tk.Canvas(canvas_frame, bg='#202020', highlightthickness=0)
+        scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=sheet_canvas.yview)
+        sheet_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        sheet_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        def show_sheet():
+            sheet = state['sheet']
+            if sheet is None:
+                return
+            marked = sheet.copy()
+            contact_sheet.draw_labels(marked, len(state['candidates']), state['columns'],
+                                      state['tile_size'], state['rejected'])
+            scale = min(1.0, max(200, sheet_canvas.winfo_width()) / marked.width)
+            if scale < 1.0:
+                marked = marked.resize((int(marked.width * scale), int(marked.height * scale)))
+            state['scale'] = scale
+            state['photo'] = ImageTk.PhotoImage(marked)
+            sheet_canvas.delete('all')
+            sheet_canvas.create_image(0, 0, image=state['photo'], anchor=tk.NW)
+            sheet_canvas.configure(scrollregion=(0, 0, marked.width, marked.height))
+            approved_count = len(state['candidates']) - len(state['rejected'])
+            summary_label.config(text=f"{approved_count}/{len(state['candidates'])} approved - "
+                                      f"click a tile to reject it.")
+        
+        def on_click(event):
+            if state['sheet'] is None:
+                return
+            x = sheet_canvas.canvasx(event.x) / state['scale']
+            y = sheet_canvas.canvasy(event.y) / state['scale']
+            index = contact_sheet.tile_at((int(x), int(y)), len(state['candidates']),
+                                          state['columns'], state['tile_size'])
+            if index is None:
+                return
+            state['rejected'].symmetric_difference_update({index})
+            show_sheet()
+        
+        sheet_canvas.bind("<Button-1>", on_click)
+        
+        def plan():
+            # Planning resets the generator's niche paths and render plans, which a running batch reads
+            if self.processing:
+                summary_label.config(text="Wait for the running batch to finish before planning.")
+                return
+            count = plan_count.get()
+            state['planning'] = True
+            plan_btn.config(state='disabled')
+            generate_btn.config(state='disabled')
+            self.set_status(f"Planning {count} candidates...", processing=True)
+            summary_label.config(text=f"Planning {count} candidates...")
+            video_settings = dict(self.video_settings)
+            niche_path = self.current_niche
+            
+            def worker():
+                try:
+                    from src.core import generator_engine
+                    candidates = generator_engine.plan_batch(niche_path, count, video_settings=video_settings)
+                    # Tiles are drawn without labels; labels are redrawn as tiles are rejected
+                    sheet, columns, tile_size = contact_sheet.render_contact_sheet(
+                        niche_path, candidates, video_settings=video_settings, labels=False
+                    )
+                    
+                    def done():
+                        state['planning'] = False
+                        self.set_status("Ready", processing=False)
+                        # The dialog may have been closed while planning
+                        if not dialog.winfo_exists():
+                            return
+                        state.update(candidates=candidates, rejected=set(), sheet=sheet,
+                                     columns=columns, tile_size=tile_size)
+                        plan_btn.config(state='normal')
+                        generate_btn.config(state='normal')
+                        show_sheet()
+                    self.root.after(0, done)
+                except Exception as e:
+                    def failed(err=str(e)):
+                        state['planning'] = False
+                        self.set_status("Ready", processing=False)
+                        self.log(f"❌ Contact sheet failed: {err}")
+                        if dialog.winfo_exists():
+                            plan_btn.config(state='normal')
+                            generate_btn.config(state='normal')
+                            summary_label.config(text=f"Planning failed: {err}")
+                    self.root.after(0, failed)
+            
+            thread = threading.Thread(target=worker)
+            thread.daemon = True
+            thread.start()
+        
+        plan_btn.config(command=plan)
+        
+        def generate_approved():
+            selections = contact_sheet.approved(state['candidates'], sorted(state['rejected']))
+            if not selections:
+                messagebox.showwarning("Nothing Approved", "No candidates left to generate.", parent=dialog)
+                return
+            if self.processing:
+                messagebox.showwarning("Busy", "Wait for the running batch to finish.", parent=dialog)
+                return
+            dialog.destroy()
+            draft = self.draft_var.get()
+            kind = "draft(s)" if draft else "meme(s)"
+            self.log(f"🎨 Generating {len(selections)} approved {kind} from the contact sheet...")
+            self.set_status(f"Generating {len(selections)} {kind}...", processing=True, cancellable=True)
+            
+            thread = threading.Thread(target=self._generate_thread, args=(len(selections), draft, selections))
+            thread.daemon = True
+            thread.start()
+        
+        button_frame = ttk.Frame(dialog, padding="10")
+        button_frame.pack(fill=tk.X)
+        generate_btn = ttk.Button(button_frame, text="🎨 Generate Approved", command=generate_approved,
+                                  style="Accent.TButton")
+        generate_btn.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
+        ttk.Label(button_frame, text="Part numbers are assigned in order to the approved memes.").pack(side=tk.LEFT)
+        
+        def sync_buttons():
+            # The dialog is not modal, so a batch can start or end while it is open
+            if not dialog.winfo_exists():
+                return
+            if not state['planning']:
+                busy = 'disabled' if self.processing else 'normal'
+                plan_btn.config(state=busy)
+                generate_btn.config(state=busy)
+            dialog.after(300, sync_buttons)
+        
+        dialog.after(100, plan)
+        dialog.after(300, sync_buttons)
+    
+    def build_compilation(self):
+        """Join the latest outputs into one compilation video."""
+        if not self.current_niche:
+            messagebox.showwarning("No Niche", "Please select a niche first.")
+            return
+        
+        available = len(self.asset_catalog.outputs) if self.asset_catalog else 0
+        if not available:
+            messagebox.showinfo("No Outputs", "Generate some videos first.")
+            return
+        
+        count = simpledialog.askinteger(
+            "Build Compilation", f"How many of the latest videos? (1-{available})",
+            parent=self.root, minvalue=1, maxvalue=available, initialvalue=min(10, available)
+        )
+        if not count:
+            return
+        
+        self.log(f"🎞️ Building compilation of the last {count} video(s)...")
+        self.set_status("Building compilation...", processing=True)
+        
+        def worker():
+            error_str = ""
+            output_path = None
+            cancelled = False
+            try:
+                from src.processors.compilation import build_compilation
+                output_path = build_compilation(
+                    self.current_niche, count,
+                    on_progress=lambda message: self.root.after(0, lambda: self.log(f"   {message}"))
+                )
+            except JobCancelled:
+                cancelled = True
+            except Exception as e:
+                error_str = str(e)
+                self.logger.error(f"Compilation failed: {e}")
+            
+            def final_update():
+                self.set_status("Ready", processing=False)
+                if cancelled:
+                    self.log("⚠️  Compilation cancelled")
+                elif error_str:
+                    self.log(f"❌ Compilation failed: {error_str}")
+                    messagebox.showerror("Error", f"Failed to build compilation:\n{error_str}")
+                else:
+                    self.log(f"✅ Compilation saved: {os.path.basename(output_path)}")
+                    messagebox.showinfo("Success", f"Compilation saved to:\n{output_path}")
+            
+            self.root.after(0, final_update)
+        
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+    
+    def show_promote_drafts(self):
+        """Show the drafts of the current niche and promote the approved ones."""
+        if not self.current_niche:
+            messagebox.showwarning("No Niche", "Please select a niche first.")
+            return
+        
+        from src.core import generator_engine
+        
+        drafts = generator_engine.list_drafts(self.current_niche)
+        if not drafts:
+            messagebox.showinfo("No Drafts", "No drafts to promote.\n\nTick 'Draft' and generate some first.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Promote Drafts")
+        dialog.geometry("420x480")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ttk.Label(dialog, text="Select the drafts to render at full quality:",
+                  font=("Arial", 10, "bold")).pack(padx=15, pady=(15, 5), anchor=tk.W)
+        
+        listbox = tk.Listbox(dialog, selectmode=tk.EXTENDED, highlightthickness=0, bd=0)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
+        for number in drafts:
+            listbox.insert(tk.END, f"draft_{number:04d}.mp4")
+        
+        def open_drafts_folder():
+            drafts_folder = os.path.join(self.current_niche, "Meme-Drafts")
+            if sys.platform == 'darwin':
+                subprocess.run(['open', drafts_folder])
+            elif sys.platform == 'win32':
+                os.startfile(drafts_folder)
+            else:
+                subprocess.run(['xdg-open', drafts_folder])
+        
+        def promote():
+            selected = [drafts[i] for i in listbox.curselection()]
+            if not selected:
+                messagebox.showwarning("No Selection", "Select at least one draft.", parent=dialog)
+                return
+            dialog.destroy()
+            self.log(f"✅ Promoting {len(selected)} draft(s) to full renders...")
+            self.set_status(f"Promoting {len(selected)} draft(s)...", processing=True, cancellable=True)
+            
+            thread = threading.Thread(target=self._promote_thread, args=(selected,))
+            thread.daemon = True
+            thread.start()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill=tk.X, padx=15, pady=(5, 15))
+        ttk.Button(button_frame, text="Promote Selected", command=promote,
+                   style="Accent.TButton").pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="📁 Open Drafts", command=open_drafts_folder).pack(side=tk.LEFT)
+    
+    def _promote_thread(self, draft_numbers):
+        """Thread for promoting drafts to full renders."""
+        error_str = ""
+        created = []
+        cancelled = False
+        try:
+            from src.core import generator_engine
+            self.cancel_requested.clear()
+            created = generator_engine.promote_drafts(
+                self.current_niche, draft_numbers, video_settings=dict(self.video_settings),
+                cancel_event=self.cancel_requested
+            )
+            # A cancel between videos stops the batch without raising
+            cancelled = self.cancel_requested.is_set()
+        except JobCancelled:
+            cancelled = True
+        except Exception as e:
+            error_str = str(e)
+            self.logger.error(f"Draft promotion failed: {e}")
+        
+        def final_update():
+            self.set_status("Ready", processing=False)
+            self.refresh_assets()
+            if cancelled:
+                # Drafts whose promotion finished before the cancel are already removed
+                self.log("⚠️  Draft promotion cancelled by user")
+            elif error_str:
+                self.log(f"❌ Draft promotion failed: {error_str}")
+                messagebox.showerror("Error", f"Failed to promote drafts:\n{error_str}")
+            else:
+                self.log(f"✅ Promoted {len(created)} draft(s)")
+                messagebox.showinfo("Success", f"Rendered {len(created)} video(s) from drafts!")
+        
+        self.root.after(0, final_update)
+    
+    def update_output_preview(self, changed=None):
+        """
+        Update the output folder preview from the output index.
+        
+        Args:
+            changed: Names of outputs that changed; None rebuilds the whole strip
+        """
+        if not self.current_niche or not self.asset_catalog:
+            return
+
+        outputs = self.asset_catalog.sorted_outputs()
+
+        if changed is not None and self.preview_strip is not None and outputs:
+            try:
+                self._update_preview_cells(changed, outputs)
+            except Exception as e:
+                self.logger.error(f"Preview update failed: {e}")
             return
 
         for child in self.preview_content.winfo_children():
             child.destroy()
-        self.preview_thumbnails = []
+        self.preview_thumbnails = {}
+        self.preview_cells = {}
+        self.preview_strip = None
+        self.preview_header = None
 
         try:
             output_folder = os.path.join(self.current_niche, "Meme-Final")
@@ -633,10 +1051,7 @@ class MemeGeneratorGUI:
                 ).pack(anchor=tk.W)
                 return
             
-            files = [f for f in os.listdir(output_folder) if f.endswith('.mp4')]
-            files.sort(reverse=True)  # Most recent first
-            
-            if not files:
+            if not outputs:
                 ttk.Label(
                     self.preview_content,
                     text="No videos in output folder.",
@@ -644,85 +1059,110 @@ class MemeGeneratorGUI:
                     foreground=self.ui_colors["fg"]
                 ).pack(anchor=tk.W)
             else:
-                header = ttk.Label(
+                self.preview_header = ttk.Label(
                     self.preview_content,
-                    text=f"Output: Meme-Final/   Total: {len(files)}",
+                    text=f"Output: Meme-Final/   Total: {len(outputs)}",
                     font=("Arial", 10, "bold")
                 )
-                header.pack(anchor=tk.W, pady=(0, 8))
+                self.preview_header.pack(anchor=tk.W, pady=(0, 8))
 
-                meme_images_folder = os.path.join(self.current_niche, "Meme-Images")
                 try:
                     from PIL import Image, ImageTk, ImageOps
                 except Exception as e:
                     ttk.Label(self.preview_content, text=f"Preview unavailable: {e}").pack(anchor=tk.W)
                     return
 
-                strip_frame = ttk.Frame(self.preview_content)
-                strip_frame.pack(fill=tk.BOTH, expand=True)
+                self.preview_strip = ttk.Frame(self.preview_content)
+                self.preview_strip.pack(fill=tk.BOTH, expand=True)
 
-                thumb_width = 160
-                thumb_height = 284
-
-                for idx, file in enumerate(files):
-                    file_path = os.path.join(output_folder, file)
-                    size_mb = os.path.getsize(file_path) / (1024 * 1024)
-                    mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    base_name = os.path.splitext(file)[0]
-                    image_path = os.path.join(meme_images_folder, f"{base_name}.jpg")
+                for file, size, mtime in outputs:
+                    self.preview_cells[file] = self._create_preview_cell(file, size, mtime)
+                self._layout_preview_cells(outputs)
+        except Exception as e:
+            ttk.Label(self.preview_content, text=f"Error loading preview:\n{e}").pack(anchor=tk.W)
 
-                    cell = ttk.Frame(strip_frame)
-                    cell.grid(row=0, column=idx, padx=8, pady=6, sticky="n")
+        self.preview_canvas.xview_moveto(0)
 
-                    image_widget = None
+    def _update_preview_cells(self, changed, outputs):
+        """Replace, add or drop the preview cells of changed outputs."""
+        current = {file: (size, mtime) for file, size, mtime in outputs}
+        for file in changed:
+            cell = self.preview_cells.pop(file, None)
+            if cell is not None:
+                cell.destroy()
+                self.preview_thumbnails.pop(file, None)
+            if file in current:
+                size, mtime = current[file]
+                self.preview_cells[file] = self._create_preview_cell(file, size, mtime)
+
+        self.preview_header.config(text=f"Output: Meme-Final/   Total: {len(outputs)}")
+        self._layout_preview_cells(outputs)
+
+    def _layout_preview_cells(self, outputs):
+        """Grid the preview cells in output index order (most recent first)."""
+        for idx, (file, _size, _mtime) in enumerate(outputs):
+            cell = self.preview_cells.get(file)
+            if cell is not None:
+                cell.grid(row=0, column=idx, padx=8, pady=6, sticky="n")
+
+    def _create_preview_cell(self, file, size, mtime):
+        """Create the thumbnail and caption cell for one output video."""
+        from PIL import Image, ImageTk, ImageOps
+
+        thumb_width = 160
+        thumb_height = 284
+
+        file_path = os.path.join(self.current_niche, "Meme-Final", file)
+        meme_images_folder = os.path.join(self.current_niche, "Meme-Images")
+        size_mb = size / (1024 * 1024)
+        mod_time = datetime.fromtimestamp(mtime)
+        base_name = os.path.splitext(file)[0]
+        image_path = os.path.join(meme_images_folder, f"{base_name}.jpg")
+        thumb_path = thumbnail_path(self.current_niche, base_name)
+
+        cell = ttk.Frame(self.preview_strip)
+
+        image_widget = None
+        image = None
+
+        # The generator writes a thumbnail of the composited frame; older outputs use the meme JPEG
+        for path in (thumb_path, image_path):
+            if os.path.exists(path):
+                try:
+                    image = Image.open(path)
+                    image.draft('RGB', (thumb_width, thumb_height))
+                    break
+                except Exception:
                     image = None
 
-                    if os.path.exists(image_path):
-                        try:
-                            image = Image.open(image_path)
-                        except Exception:
-                            image = None
-                    else:
-                        try:
-                            from moviepy import VideoFileClip
-                            clip = VideoFileClip(file_path)
-                            frame = clip.get_frame(0.0)
-                            clip.close()
-                            image = Image.fromarray(frame)
-                        except Exception:
-                            image = None
-
-                    if image:
-                        image = ImageOps.pad(image, (thumb_width, thumb_height), color="black")
-                        photo = ImageTk.PhotoImage(image)
-                        image_widget = ttk.Label(cell, image=photo)
-                        self.preview_thumbnails.append(photo)
-                    else:
-                        canvas = tk.Canvas(cell, width=thumb_width, height=thumb_height, bg="#222", highlightthickness=1, highlightbackground="#444")
-                        canvas.create_text(thumb_width // 2, thumb_height // 2, text="No preview", fill="white")
-                        image_widget = canvas
-
-                    def open_in_finder(_event, path=file_path):
-                        if sys.platform == 'darwin':
-                            subprocess.run(['open', '-R', path])
-                        elif sys.platform == 'win32':
-                            os.startfile(os.path.dirname(path))
-                        else:
-                            subprocess.run(['xdg-open', os.path.dirname(path)])
-
-                    image_widget.bind("<Double-Button-1>", open_in_finder)
-                    image_widget.pack()
-
-                    caption = ttk.Label(
-                        cell,
-                        text=f"{file}\n{size_mb:.1f} MB | {mod_time.strftime('%H:%M %d/%m')}",
-                        justify="center"
-                    )
-                    caption.pack(pady=(4, 0))
-        except Exception as e:
-            ttk.Label(self.preview_content, text=f"Error loading preview:\n{e}").pack(anchor=tk.W)
+        if image:
+            image = ImageOps.pad(image, (thumb_width, thumb_height), color="black")
+            photo = ImageTk.PhotoImage(image)
+            image_widget = ttk.Label(cell, image=photo)
+            self.preview_thumbnails[file] = photo
+        else:
+            canvas = tk.Canvas(cell, width=thumb_width, height=thumb_height, bg="#222", highlightthickness=1, highlightbackground="#444")
+            canvas.create_text(thumb_width // 2, thumb_height // 2, text="No preview", fill="white")
+            image_widget = canvas
+
+        def open_in_finder(_event, path=file_path):
+            if sys.platform == 'darwin':
+                subprocess.run(['open', '-R', path])
+            elif sys.platform == 'win32':
+                os.startfile(os.path.dirname(path))
+            else:
+                subprocess.run(['xdg-open', os.path.dirname(path)])
 
-        self.preview_canvas.xview_moveto(0)
+        image_widget.bind("<Double-Button-1>", open_in_finder)
+        image_widget.pack()
+
+        caption = ttk.Label(
+            cell,
+            text=f"{file}\n{size_mb:.1f} MB | {mod_time.strftime('%H:%M %d/%m')}",
+            justify="center"
+        )
+        caption.pack(pady=(4, 0))
+        return cell
     
     def open_output_folder(self):
         """Open the output folder in file explorer."""
@@ -797,6 +1237,20 @@ class MemeGeneratorGUI:
         ttk.Combobox(font_frame, textvariable=pos_var, width=15,
                     values=['above', 'below'], state='readonly').grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
 
+        auto_fit_var = tk.BooleanVar(value=self.video_settings.get('auto_fit_text', False))
+        ttk.Checkbutton(font_frame, text="Auto-fit text size (Font Size is the maximum)",
+                       variable=auto_fit_var).grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=5)
+
+        ttk.Label(font_frame, text="Max Text Height:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        fit_height_var = tk.IntVar(value=self.video_settings.get('auto_fit_max_height', 480))
+        ttk.Spinbox(font_frame, from_=100, to=1200, increment=20, textvariable=fit_height_var,
+                   width=10).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(font_frame, text="Min Font Size:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        fit_min_var = tk.IntVar(value=self.video_settings.get('auto_fit_min_size', 32))
+        ttk.Spinbox(font_frame, from_=12, to=200, textvariable=fit_min_var,
+                   width=10).grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
+
         # Part Number Settings
         part_frame = ttk.LabelFrame(left_panel, text="Part Number", padding=15)
         part_frame.pack(fill=tk.X, pady=(0, 10))
@@ -855,6 +1309,32 @@ class MemeGeneratorGUI:
         ttk.Spinbox(fade_frame, from_=0.0, to=5.0, increment=0.1,
                    textvariable=sound_fade_var, width=10).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
         
+        loudness_var = tk.BooleanVar(value=self.video_settings.get('loudness_normalize', True))
+        ttk.Checkbutton(fade_frame, text="Normalize loudness (EBU R128)",
+                       variable=loudness_var).grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        motion_options = {
+            "None": "none",
+            "Slow zoom in": "zoom_in",
+            "Slow zoom out": "zoom_out",
+            "Pan left": "pan_left",
+            "Pan right": "pan_right",
+            "Pan up": "pan_up",
+            "Pan down": "pan_down"
+        }
+        ttk.Label(fade_frame, text="Motion:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        motion_value = self.video_settings.get('motion', 'none')
+        motion_var = tk.StringVar(value=next(
+            (label for label, value in motion_options.items() if value == motion_value), "None"
+        ))
+        ttk.Combobox(fade_frame, textvariable=motion_var, width=15,
+                    values=list(motion_options.keys()), state='readonly').grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        ttk.Label(fade_frame, text="Motion Intensity:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        motion_intensity_var = tk.DoubleVar(value=self.video_settings.get('motion_intensity', 0.1))
+        ttk.Spinbox(fade_frame, from_=0.02, to=0.5, increment=0.02,
+                   textvariable=motion_intensity_var, width=10).grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
+        
         # Background Settings
         bg_settings_frame = ttk.LabelFrame(left_panel, text="Background", padding=15)
         bg_settings_frame.pack(fill=tk.X, pady=(0, 10))
@@ -871,6 +1351,22 @@ class MemeGeneratorGUI:
         
         ttk.Button(bg_settings_frame, text="Choose", command=choose_bg_color).grid(row=0, column=2, padx=5)
         
+        bg_mode_options = {
+            "Solid color": "color",
+            "Blurred image": "blur"
+        }
+        ttk.Label(bg_settings_frame, text="Fill:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        bg_mode_value = self.video_settings.get('bg_mode', 'color')
+        bg_mode_var = tk.StringVar(value=next(
+            (label for label, value in bg_mode_options.items() if value == bg_mode_value), "Solid color"
+        ))
+        ttk.Combobox(bg_settings_frame, textvariable=bg_mode_var, width=15,
+                    values=list(bg_mode_options.keys()), state='readonly').grid(row=1, column=1, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        
+        smart_crop_var = tk.BooleanVar(value=self.video_settings.get('smart_crop', False))
+        ttk.Checkbutton(bg_settings_frame, text="Smart-crop wide images to fill the frame",
+                       variable=smart_crop_var).grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
         # Right panel - Live Preview
         preview_panel = ttk.LabelFrame(main_container, text="Live Preview (9:16 Portrait)", padding=15)
         preview_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -886,209 +1382,73 @@ class MemeGeneratorGUI:
         preview_info_label.pack()
         
         # Get sample image for realistic preview
-        sample_image_pil = None
+        sample_image_path = None
         if self.current_niche:
             images_folder = os.path.join(self.current_niche, 'Raw-Images')
             if os.path.exists(images_folder):
                 images = [f for f in os.listdir(images_folder) 
                          if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
                 if images:
-                    try:
-                        from PIL import Image, ImageTk, ImageDraw, ImageFont
-                        img_path = os.path.join(images_folder, images[0])
-                        img = Image.open(img_path)
-                        # Don't resize yet - we'll do it in the preview function
-                        sample_image_pil = img
-                    except Exception as e:
-                        print(f"Error loading sample image: {e}")
+                    sample_image_path = os.path.join(images_folder, images[0])
+        
+        def current_settings():
+            """Collect the settings currently shown in the dialog."""
+            return {
+                'font': font_var.get(),
+                'font_size': size_var.get(),
+                'font_color': color_options.get(color_var.get(), 'text_box_white'),
+                'fade_duration': fade_dur_var.get(),
+                'fade_in_start': fade_in_var.get(),
+                'fade_out_end': fade_out_var.get(),
+                'sound_fade': sound_fade_var.get(),
+                'loudness_normalize': loudness_var.get(),
+                'motion': motion_options.get(motion_var.get(), 'none'),
+                'motion_intensity': motion_intensity_var.get(),
+                'text_position': pos_var.get(),
+                'bg_color': bg_color_var.get(),
+                'bg_mode': bg_mode_options.get(bg_mode_var.get(), 'color'),
+                'smart_crop': smart_crop_var.get(),
+                'part_enabled': part_enabled_var.get(),
+                'part_start_number': part_start_var.get(),
+                'part_font': part_font_var.get(),
+                'part_font_size': part_size_var.get(),
+                'part_color': color_options.get(part_color_var.get(), 'white_outline'),
+                'part_text_position': part_pos_var.get(),
+                'auto_fit_text': auto_fit_var.get(),
+                'auto_fit_max_height': fit_height_var.get(),
+                'auto_fit_min_size': fit_min_var.get()
+            }
+        
+        # Portrait canvas: 360x640 (9:16 ratio, scaled from 1080x1920)
+        canvas_width = 360
+        canvas_height = 640
+        # Same render core as the generator; cached layers survive between updates
+        preview_scale = canvas_width / 1080
+        preview_renderer = MemeRenderer.from_settings(self.video_settings, scale=preview_scale)
         
         def update_preview(*args):
-            """Update preview to EXACTLY match generator: white text box + image on black background."""
+            """Update preview with the generator's render core at preview scale."""
             preview_canvas.delete("all")
             
-            # Portrait canvas: 360x640 (9:16 ratio, scaled from 1080x1920)
-            canvas_width = 360
-            canvas_height = 640
-            scale_factor = canvas_width / 1080
-            
-            if sample_image_pil:
+            if sample_image_path:
                 try:
-                    from PIL import Image, ImageTk, ImageDraw, ImageFont
-                    
-                    # Create background (matching user setting)
-                    bg_color_value = bg_color_var.get()
-                    try:
-                        bg = Image.new('RGB', (canvas_width, canvas_height), bg_color_value)
-                    except ValueError:
-                        bg_color_value = 'black'
-                        bg = Image.new('RGB', (canvas_width, canvas_height), bg_color_value)
-                    
-                    # Resize image to fit (matching generator: leave ~112px for text/spacing)
-                    img = sample_image_pil.copy()
-                    img.thumbnail((canvas_width, canvas_height - 112), Image.Resampling.LANCZOS)
+                    from PIL import ImageTk
                     
-                    # Create main text and font
-                    text = "Sample Meme Text"
-                    font_size = max(22, int(size_var.get() * scale_factor))
-                    
-                    # Load font
-                    try:
-                        font_name = font_var.get()
-                        font_paths = [
-                            f"/System/Library/Fonts/{font_name}.ttc",
-                            f"/System/Library/Fonts/{font_name}.ttf",
-                            f"/System/Library/Fonts/Supplemental/{font_name}.ttf",
-                        ]
-                        font = None
-                        for path in font_paths:
-                            if os.path.exists(path):
-                                font = ImageFont.truetype(path, font_size)
-                                break
-                        if not font:
-                            font = ImageFont.load_default()
-                    except:
-                        font = ImageFont.load_default()
-                    
-                    # Calculate text box dimensions
-                    temp_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
-                    bbox = temp_draw.textbbox((0, 0), text, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-
-                    box_padding = max(8, int(30 * scale_factor))
-                    box_height = text_height + 2 * box_padding
-                    text_box_width = img.width
-
-                    font_color_style = color_options.get(color_var.get(), 'text_box_white')
-                    stroke_width = max(1, int(2 * scale_factor))
-                    
-                    part_enabled = part_enabled_var.get()
-                    part_text = f"part {part_start_var.get()}" if part_enabled else ""
-                    part_font_size = max(14, int(part_size_var.get() * scale_factor))
-
-                    try:
-                        part_font_name = part_font_var.get()
-                        part_font = None
-                        for path in [
-                            f"/System/Library/Fonts/{part_font_name}.ttc",
-                            f"/System/Library/Fonts/{part_font_name}.ttf",
-                            f"/System/Library/Fonts/Supplemental/{part_font_name}.ttf",
-                        ]:
-                            if os.path.exists(path):
-                                part_font = ImageFont.truetype(path, part_font_size)
-                                break
-                        if not part_font:
-                            part_font = ImageFont.load_default()
-                    except Exception:
-                        part_font = ImageFont.load_default()
-
-                    part_color_style = color_options.get(part_color_var.get(), 'white_outline')
-                    part_padding = max(6, int(20 * scale_factor))
-
-                    if part_enabled:
-                        part_bbox = temp_draw.textbbox((0, 0), part_text, font=part_font)
-                        part_text_width = part_bbox[2] - part_bbox[0]
-                        part_text_height = part_bbox[3] - part_bbox[1]
-                        part_block_height = part_text_height + 2 * part_padding
-                    else:
-                        part_text_width = 0
-                        part_text_height = 0
-                        part_block_height = 0
-
-                    blocks_above = []
-                    blocks_below = []
-                    if pos_var.get() == 'above':
-                        blocks_above.append('main')
-                    else:
-                        blocks_below.append('main')
-
-                    if part_enabled:
-                        if part_pos_var.get() == 'above':
-                            blocks_above.append('part')
-                        else:
-                            blocks_below.append('part')
-
-                    total_content_height = box_height + img.height + part_block_height
-                    vertical_center = (canvas_height - total_content_height) // 2
-                    current_y = vertical_center
-
-                    def draw_main_text(y_pos):
-                        text_box_x = (canvas_width - text_box_width) // 2
-                        text_x = text_box_x + (text_box_width - text_width) // 2
-                        text_y = y_pos + box_padding
-
-                        if font_color_style == 'white_outline':
-                            draw = ImageDraw.Draw(bg)
-                            draw.text(
-                                (text_x, text_y),
-                                text,
-                                font=font,
-                                fill='white',
-                                stroke_width=stroke_width,
-                                stroke_fill='black'
-                            )
-                            return
-
-                        text_box_color = 'white' if font_color_style == 'text_box_white' else 'black'
-                        text_color = 'black' if text_box_color == 'white' else 'white'
-                        text_box = Image.new('RGB', (text_box_width, box_height), text_box_color)
-                        text_draw = ImageDraw.Draw(text_box)
-                        text_draw.text((text_x - text_box_x, text_y - y_pos), text, font=font, fill=text_color)
-                        bg.paste(text_box, (text_box_x, y_pos))
-
-                    def draw_part_text(y_pos):
-                        if not part_enabled:
-                            return
-                        draw = ImageDraw.Draw(bg)
-                        text_x = (canvas_width - part_text_width) // 2
-                        text_y = y_pos + part_padding
-
-                        if part_color_style == 'white_outline':
-                            draw.text(
-                                (text_x, text_y),
-                                part_text,
-                                font=part_font,
-                                fill='white',
-                                stroke_width=stroke_width,
-                                stroke_fill='black'
-                            )
-                            return
-
-                        part_box_color = 'white' if part_color_style == 'text_box_white' else 'black'
-                        part_text_color = 'black' if part_box_color == 'white' else 'white'
-                        part_box_width = part_text_width + 2 * part_padding
-                        part_box_height = part_text_height + 2 * part_padding
-                        part_box = Image.new('RGB', (part_box_width, part_box_height), part_box_color)
-                        part_box_draw = ImageDraw.Draw(part_box)
-                        part_box_draw.text((part_padding, part_padding), part_text, font=part_font, fill=part_text_color)
-                        bg.paste(part_box, (text_x - part_padding, y_pos))
-
-                    for block in blocks_above:
-                        if block == 'main':
-                            draw_main_text(current_y)
-                            current_y += box_height
-                        elif block == 'part':
-                            draw_part_text(current_y)
-                            current_y += part_block_height
-
-                    img_x = (canvas_width - img.width) // 2
-                    img_y = current_y
-                    bg.paste(img, (img_x, img_y))
-                    current_y += img.height
-
-                    for block in blocks_below:
-                        if block == 'main':
-                            draw_main_text(current_y)
-                            current_y += box_height
-                        elif block == 'part':
-                            draw_part_text(current_y)
-                            current_y += part_block_height
+                    plan = compile_render_plan(current_settings(), scale=preview_scale)
+                    preview_renderer.set_plan(plan)
+                    crop = None
+                    if plan.smart_crop and self.asset_catalog:
+                        crop = self.asset_catalog.crop_window(sample_image_path, plan.image_aspect)
+                    frame = preview_renderer.render(sample_image_path, "Sample Meme Text", crop=crop)
                     
                     # Convert and display
-                    photo = ImageTk.PhotoImage(bg)
+                    photo = ImageTk.PhotoImage(frame)
                     preview_canvas.create_image(canvas_width//2, canvas_height//2, image=photo)
                     preview_canvas.image = photo
                     
+                except (tk.TclError, ValueError):
+                    # Spinboxes mid-edit can hold invalid values; keep the last frame
+                    return
                 except Exception as e:
                     import traceback
                     print(f"Preview error: {e}")
@@ -1111,12 +1471,17 @@ class MemeGeneratorGUI:
         color_var.trace_add('write', update_preview)
         pos_var.trace_add('write', update_preview)
         bg_color_var.trace_add('write', update_preview)
+        bg_mode_var.trace_add('write', update_preview)
+        smart_crop_var.trace_add('write', update_preview)
         part_enabled_var.trace_add('write', update_preview)
         part_start_var.trace_add('write', update_preview)
         part_font_var.trace_add('write', update_preview)
         part_size_var.trace_add('write', update_preview)
         part_color_var.trace_add('write', update_preview)
         part_pos_var.trace_add('write', update_preview)
+        auto_fit_var.trace_add('write', update_preview)
+        fit_height_var.trace_add('write', update_preview)
+        fit_min_var.trace_add('write', update_preview)
         
         # Initial preview
         self.root.after(100, update_preview)
@@ -1126,23 +1491,7 @@ class MemeGeneratorGUI:
         button_frame.pack(fill=tk.X, padx=15, pady=(10, 15))
         
         def save_settings():
-            self.video_settings = {
-                'font': font_var.get(),
-                'font_size': size_var.get(),
-                'font_color': color_options.get(color_var.get(), 'white_stroke'),
-                'fade_duration': fade_dur_var.get(),
-                'fade_in_start': fade_in_var.get(),
-                'fade_out_end': fade_out_var.get(),
-                'sound_fade': sound_fade_var.get(),
-                'text_position': pos_var.get(),
-                'bg_color': bg_color_var.get(),
-                'part_enabled': part_enabled_var.get(),
-                'part_start_number': part_start_var.get(),
-                'part_font': part_font_var.get(),
-                'part_font_size': part_size_var.get(),
-                'part_color': color_options.get(part_color_var.get(), 'white_stroke'),
-                'part_text_position': part_pos_var.get()
-            }
+            self.video_settings = current_settings()
             
             # Save to niche folder
             if self.current_niche:
@@ -1397,20 +1746,30 @@ After creation, you can:
             try:
                 import yt_dlp
                 
+                from src.processors.audio_fingerprint import SoundFingerprintIndex, analyze_file
+                
                 audio_folder = os.path.join(self.current_niche, "TikTok-Sounds")
                 os.makedirs(audio_folder, exist_ok=True)
                 
+                # Fingerprint what is already in the library so re-imports are caught
+                fingerprints = SoundFingerprintIndex(audio_folder)
+                fingerprints.sync()
+                
                 success_count = 0
                 failed_count = 0
+                duplicate_count = 0
                 
                 for idx, url in enumerate(urls, 1):
                     self.root.after(0, lambda i=idx, total=len(urls): 
                                    self.log(f"📥 Downloading audio {i}/{total}..."))
                     
                     try:
+                        # Never reuse an existing number, earlier downloads would be overwritten
+                        sound_number = get_next_filename(audio_folder, 'sound_', '.mp3')
+                        sound_name = f'sound_{sound_number:03d}'
                         ydl_opts = {
                             'format': 'bestaudio/best',
-                            'outtmpl': os.path.join(audio_folder, f'sound_{idx:03d}.%(ext)s'),
+                            'outtmpl': os.path.join(audio_folder, f'{sound_name}.%(ext)s'),
                             'postprocessors': [{
                                 'key': 'FFmpegExtractAudio',
                                 'preferredcodec': 'mp3',
@@ -1423,6 +1782,20 @@ After creation, you can:
                         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                             ydl.download([url])
                         
+                        sound_file = f'{sound_name}.mp3'
+                        sound_path = os.path.join(audio_folder, sound_file)
+                        # One decode gives the fingerprint and the loudness used when encoding
+                        hashes, times, loudness = analyze_file(sound_path)
+                        duplicate_of = fingerprints.find_duplicate(hashes, times)
+                        if duplicate_of:
+                            os.remove(sound_path)
+                            duplicate_count += 1
+                            self.root.after(0, lambda i=idx, dup=duplicate_of:
+                                           self.log(f"⏭️  Audio {i} is a duplicate of {dup}, skipped"))
+                            continue
+                        fingerprints.add(sound_file, hashes, times, loudness)
+                        fingerprints.save()
+                        
                         success_count += 1
                         self.root.after(0, lambda i=idx: self.log(f"✅ Downloaded audio {i}"))
                     except Exception as e:
@@ -1435,8 +1808,16 @@ After creation, you can:
                     if success_count > 0:
                         messagebox.showinfo("Download Complete", 
                                           f"Successfully downloaded {success_count}/{len(urls)} audio files!\n"
+                                          f"Duplicates skipped: {duplicate_count}\n"
                                           f"Failed: {failed_count}")
-                        self.log(f"✅ Download complete: {success_count} successful, {failed_count} failed")
+                        self.log(f"✅ Download complete: {success_count} successful, "
+                                 f"{duplicate_count} duplicates, {failed_count} failed")
+                    elif duplicate_count > 0:
+                        messagebox.showinfo("Download Complete",
+                                          f"No new sounds added.\n"
+                                          f"Duplicates skipped: {duplicate_count}\n"
+                                          f"Failed: {failed_count}")
+                        self.log(f"✅ Download complete: {duplicate_count} duplicates skipped")
                     else:
                         messagebox.showerror("Download Failed", 
                                            "Failed to download any audio files.\n"
@@ -1494,6 +1875,46 @@ After creation, you can:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read sounds list:\n{e}")
     
+    def find_duplicate_sounds(self):
+        """Scan the sounds library for duplicate or near-identical tracks."""
+        if not self.current_niche:
+            messagebox.showwarning("No Niche", "Please select a niche first.")
+            return
+        
+        audio_folder = os.path.join(self.current_niche, "TikTok-Sounds")
+        if not os.path.exists(audio_folder):
+            messagebox.showinfo("No Sounds", "No TikTok-Sounds folder found.")
+            return
+        
+        self.log("🔍 Scanning sounds for duplicates...")
+        
+        def scan():
+            try:
+                from src.processors.audio_fingerprint import SoundFingerprintIndex
+                
+                fingerprints = SoundFingerprintIndex(audio_folder)
+                indexed, _ = fingerprints.sync()
+                groups = fingerprints.find_duplicate_groups()
+                
+                def show_result():
+                    self.log(f"🔍 Fingerprinted {indexed} new sound(s), found {len(groups)} duplicate group(s)")
+                    if not groups:
+                        messagebox.showinfo("Duplicate Sounds", "No duplicate sounds found.")
+                        return
+                    lines = [", ".join(group) for group in groups]
+                    for line in lines:
+                        self.log(f"   ♻️  {line}")
+                    messagebox.showinfo("Duplicate Sounds",
+                                        f"Found {len(groups)} group(s) of duplicate sounds:\n\n" +
+                                        "\n".join(lines[:20]))
+                self.root.after(0, show_result)
+            except Exception as e:
+                self.root.after(0, lambda err=str(e): self.log(f"❌ Duplicate scan failed: {err}"))
+        
+        thread = threading.Thread(target=scan)
+        thread.daemon = True
+        thread.start()
+    
     def show_about(self):
         """Show about dialog."""
         messagebox.showinfo("About", 
@@ -0,0 +1,256 @@
+"""
+Asset catalog for a niche.
+
+This module keeps an in-memory index of a niche's source images, sounds,
+quotes and generated outputs. It is filled by one directory scan and then
+kept current from filesystem change events, so the GUI never has to rescan
+the niche folders to refresh its counters or preview strip.
+
+Per-image analysis results (smart-crop windows) are kept in
+.cache/catalog.json so each image is analysed once, not once per render.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.processors.smart_crop import CropWindow, analyze_image
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+SOUND_EXTENSIONS = ('.mp3',)
+OUTPUT_EXTENSIONS = ('.mp4',)
+
+IMAGES_FOLDER = 'Raw-Images'
+SOUNDS_FOLDER = 'TikTok-Sounds'
+OUTPUT_FOLDER = 'Meme-Final'
+QUOTES_FILE = 'Quotes.txt'
+CACHE_FILE = os.path.join('.cache', 'catalog.json')
+
+# Change categories reported by AssetCatalog.apply_event
+IMAGES = 'images'
+SOUNDS = 'sounds'
+OUTPUTS = 'outputs'
+QUOTES = 'quotes'
+
+
+def count_quotes(quotes_file: str) -> int:
+    """
+    Count the quotes in a Quotes.txt file.
+
+    Args:
+        quotes_file: Path to Quotes.txt
+
+    Returns:
+        Number of non-empty, non-comment lines
+    """
+    if not os.path.exists(quotes_file):
+        return 0
+    with open(quotes_file, 'r') as f:
+        return len([l for l in f if l.strip() and not l.startswith('#')])
+
+
+class AssetCatalog:
+    """In-memory index of the assets and outputs of one niche."""
+
+    def __init__(self, niche_path: str):
+        """
+        Initialize the catalog.
+
+        Args:
+            niche_path: Path to niche directory
+        """
+        self.niche_path = niche_path
+        self.images: Dict[str, Tuple[int, float]] = {}
+        self.sounds: Dict[str, Tuple[int, float]] = {}
+        self.outputs: Dict[str, Tuple[int, float]] = {}
+        self.quotes_count = 0
+        self._crops: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def scan(self) -> None:
+        """Fill the catalog with a full scan of the niche folders."""
+        images = self._scan_folder(IMAGES_FOLDER, IMAGE_EXTENSIONS)
+        sounds = self._scan_folder(SOUNDS_FOLDER, SOUND_EXTENSIONS)
+        outputs = self._scan_folder(OUTPUT_FOLDER, OUTPUT_EXTENSIONS)
+        quotes_count = count_quotes(os.path.join(self.niche_path, QUOTES_FILE))
+
+        with self._lock:
+            self.images = images
+            self.sounds = sounds
+            self.outputs = outputs
+            self.quotes_count = quotes_count
+
+    def _scan_folder(self, folder: str, extensions: Tuple[str, ...]) -> Dict[str, Tuple[int, float]]:
+        entries = {}
+        path = os.path.join(self.niche_path, folder)
+        if not os.path.exists(path):
+            return entries
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(extensions):
+                    stat = entry.stat()
+                    entries[entry.name] = (stat.st_size, stat.st_mtime)
+        return entries
+
+    def classify(self, path: str) -> Optional[Tuple[str, str]]:
+        """
+        Work out which part of the catalog a path belongs to.
+
+        Args:
+            path: Absolute or niche-relative file path
+
+        Returns:
+            Tuple of (category, file name) or None if the path is not tracked
+        """
+        rel_path = os.path.relpath(os.path.abspath(path), os.path.abspath(self.niche_path))
+        parts = rel_path.split(os.sep)
+        name = parts[-1]
+        if name.startswith('.'):
+            return None
+
+        if len(parts) == 1 and name == QUOTES_FILE:
+            return QUOTES, name
+        if len(parts) != 2:
+            return None
+
+        folder = parts[0]
+        lower = name.lower()
+        if folder == IMAGES_FOLDER and lower.endswith(IMAGE_EXTENSIONS):
+            return IMAGES, name
+        if folder == SOUNDS_FOLDER and lower.endswith(SOUND_EXTENSIONS):
+            return SOUNDS, name
+        if folder == OUTPUT_FOLDER and lower.endswith(OUTPUT_EXTENSIONS):
+            return OUTPUTS, name
+        return None
+
+    def apply_event(self, path: str) -> Optional[Tuple[str, str]]:
+        """
+        Update the catalog for a created, modified or deleted path.
+
+        The path is stat'ed rather than trusting the event type, so bursts of
+        events for the same file collapse into its current state.
+
+        Args:
+            path: Path reported by the filesystem watcher
+
+        Returns:
+            Tuple of (category, file name) if the catalog changed, else None
+        """
+        classified = self.classify(path)
+        if not classified:
+            return None
+        category, name = classified
+
+        if category == QUOTES:
+            quotes_count = count_quotes(path)
+            with self._lock:
+                changed = quotes_count != self.quotes_count
+                self.quotes_count = quotes_count
+            return classified if changed else None
+
+        entries = getattr(self, category)
+        try:
+            stat = os.stat(path)
+            state = (stat.st_size, stat.st_mtime)
+        except OSError:
+            state = None
+
+        with self._lock:
+            if state is None:
+                if entries.pop(name, None) is None:
+                    return None
+            elif entries.get(name) == state:
+                return None
+            else:
+                entries[name] = state
+        return classified
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Get asset counts.
+
+        Returns:
+            Dictionary with quotes, images, sounds and outputs counts
+        """
+        with self._lock:
+            return {
+                QUOTES: self.quotes_count,
+                IMAGES: len(self.images),
+                SOUNDS: len(self.sounds),
+                OUTPUTS: len(self.outputs),
+            }
+
+    def sorted_outputs(self) -> List[Tuple[str, int, float]]:
+        """
+        Get the output index, most recent first.
+
+        Returns:
+            List of (file name, size in bytes, modification time)
+        """
+        with self._lock:
+            items = [(name, size, mtime) for name, (size, mtime) in self.outputs.items()]
+        items.sort(key=lambda item: item[0], reverse=True)
+        return items
+
+    def _read_cache(self) -> Dict[str, dict]:
+        cache_path = os.path.join(self.niche_path, CACHE_FILE)
+        if not os.path.exists(cache_path):
+            return {}
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f).get('crops', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if self._crops is None:
+            self._crops = self._read_cache()
+        return self._crops
+
+    def _save_cache(self, name: str) -> None:
+        """Write a new crop entry, keeping entries other catalogs wrote since the last read."""
+        # The GUI preview, the generator and cron runs each hold their own catalog
+        crops = dict(self._load_cache())
+        crops.update(self._read_cache())
+        crops[name] = self._crops[name]
+        self._crops = crops
+
+        cache_path = os.path.join(self.niche_path, CACHE_FILE)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'crops': crops}, f)
+        os.replace(tmp_path, cache_path)
+
+    def crop_window(self, image_path: str, aspect: float) -> Optional[CropWindow]:
+        """
+        Get the smart-crop window of a source image, analysing it on first use.
+
+        Args:
+            image_path: Path to an image in the niche's Raw-Images folder
+            aspect: Target width / height of the image area
+
+        Returns:
+            (left, top, right, bottom) as fractions of the image size, or None
+            if the image is used whole
+        """
+        name = os.path.basename(image_path)
+        stat = os.stat(image_path)
+        signature = [stat.st_size, stat.st_mtime, round(aspect, 4)]
+
+        with self._lock:
+            entry = self._load_cache().get(name)
+            if entry and entry['signature'] == signature:
+                window = entry['window']
+                return tuple(window) if window else None
+
+        window = analyze_image(image_path, aspect)
+        with self._lock:
+            self._load_cache()[name] = {'signature': signature, 'window': list(window) if window else None}
+            try:
+                self._save_cache(name)
+            except OSError:
+                pass
+        return window
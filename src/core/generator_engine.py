@@ -8,14 +8,34 @@ import textwrap
 import logging
 import json
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 # MoviePy 2.x imports
-from moviepy import VideoFileClip, ImageClip, AudioFileClip, concatenate_videoclips
-from moviepy.video.fx.FadeIn import FadeIn
+from moviepy import VideoFileClip, ImageClip, AudioFileClip
+from moviepy.audio.fx import AudioFadeIn, AudioFadeOut
 
 from utils import bold, red, green, cyan, shorten_path
+from src.core.asset_catalog import AssetCatalog
+from src.processors.animation import at_frame_rate, is_animated
+from src.processors.audio_fingerprint import LOUDNESS_TARGET, SoundFingerprintIndex
+from src.processors.covers import export_covers
+from src.processors.derivatives import DerivativeCache
+from src.processors.fade import LutFadeIn, LutFadeOut
+from src.processors.ffmpeg_encoder import (
+    OUTPUT_FPS, OUTPUT_PIX_FMT, OUTPUT_PRESET, OUTPUT_TIMESCALE,
+    RawVideoWriter, audio_filters, encode_slideshow, encode_still, get_encoder_threads, get_job_cores,
+    mux_looped_video, probe_duration, segment_count, video_fades
+)
+from src.processors.render_core import MemeRenderer
+from src.processors.render_plan import compile_render_plan, load_video_settings
+from src.utils import get_config
+from src.utils.autotune import ConcurrencyTuner, TuneSetting, machine_key
+from src.utils.encode_slots import encode_slot, get_encode_slots
+from src.utils.output_mover import MoveError, OutputMover
+from src.utils.resources import JobCancelled, get_resource_manager, track
+from src.utils.scratch import discard, scratch_path, temp_cleanup_enabled
 
 
 # Suppress specific warnings from MoviePy or general warnings
@@ -55,10 +75,32 @@ logging.getLogger('moviepy').setLevel(logging.ERROR)
 
 BASE_PATH = None
 
+# Video settings of the current batch and their compiled render plans (one per scale)
+batch_settings = None
+batch_plans = {}
+
+# Renderers keyed by render plan fingerprint, so layer caches survive across batches
+_renderers = {}
+
+# Downscaled/blurred copies of the current niche's images
+_derivatives = None
+
+# Catalog of the current niche, for cached per-image analysis (smart-crop windows)
+_catalog = None
+
+# Fingerprint index of the current niche's sounds, for their loudness measurements
+_sound_index = None
+
+# Moves finished outputs from the scratch directory to the niche folders in the background
+_output_mover = None
+
+# Concurrency tuners keyed by machine and profile, so tuning carries across batches of a session
+_tuners = {}
+
 
 def choose_random_image(folder):
     """Choose a random image from the specified folder."""
-    images = [f for f in os.listdir(folder) if f.lower().endswith(('jpg', 'jpeg', 'png'))]
+    images = [f for f in os.listdir(folder) if f.lower().endswith(('jpg', 'jpeg', 'png', 'gif', 'webp'))]
     if not images:
         logger.error(red("No images found in the folder"))
     return os.path.join(folder, random.choice(images))
@@ -86,8 +128,7 @@ def get_next_filename(folder, prefix, extension):
 def create_description_file(number, description, hashtags, output_folder):
     """Create a JSON file with the meme description and hashtags."""
     description_folder = os.path.join(os.path.dirname(output_folder), 'Meme-Description')
-    if not os.path.exists(description_folder):
-        os.makedirs(description_folder)
+    os.makedirs(description_folder, exist_ok=True)
     
     description_filename = f"meme_{number:04d}.json"
     description_path = os.path.join(description_folder, description_filename)
@@ -105,211 +146,234 @@ def create_description_file(number, description, hashtags, output_folder):
     return description_path
 
 
-def get_text_dimensions(text_string, font):
-    ascent, descent = font.getmetrics()
-    text_width = font.getmask(text_string).getbbox()[2]
-    text_height = font.getmask(text_string).getbbox()[3] + descent
-    return (text_width, text_height)
+# Encoding profiles: full renders for publishing, drafts for eyeballing a batch
+FULL_PROFILE = {
+    'name': 'full',
+    'scale': 1.0,
+    'fps': OUTPUT_FPS,  # Uniform output parameters keep compilations stream-copyable
+    'preset': OUTPUT_PRESET,  # Fastest encoding
+    'crf': '28',  # Lower quality for speed
+    'max_duration': None
+}
+
+# Slideshow reels: memes per video and crossfade length
+MAX_SLIDES = 5
+SLIDE_TRANSITION = 0.5  # seconds
+
+DRAFT_PROFILE = {
+    'name': 'draft',
+    'scale': 0.5,  # 540x960
+    'fps': 12,
+    'preset': 'ultrafast',
+    'crf': '35',
+    'max_duration': 6  # seconds
+}
+
+
+def get_renderer(plan):
+    """Get the renderer for a render plan, reusing it while the plan is unchanged."""
+    renderer = _renderers.get(plan.fingerprint)
+    if renderer is None:
+        # Keep at most the full and draft renderers around
+        if len(_renderers) >= 2:
+            _renderers.pop(next(iter(_renderers)))
+        renderer = _renderers[plan.fingerprint] = MemeRenderer(plan)
+    return renderer
+
+def create_meme_with_text(image_path, text, output_folder, number, video_number, renderer, prefix="meme", crop=None):
+    """Create a meme image with text and video number, staged for the output folder."""
+    # Composited into this worker's reusable canvas buffer
+    frame = renderer.render_array(image_path, text, part_number=video_number, crop=crop)
+
+    # Save the meme to the scratch directory; the output mover puts it in the output folder
+    meme_filename = os.path.join(output_folder, f"{prefix}_{number:04d}.jpg")
+    staged_filename = scratch_path(os.path.basename(meme_filename))
+    Image.frombuffer('RGB', (frame.shape[1], frame.shape[0]), frame, 'raw', 'RGB', 0, 1).save(staged_filename, quality=95)
 
-def create_meme_with_text(image_path, text, output_folder, number, video_number):
-    """Create a meme image with text and video number, save it to the output folder."""
-    background_width = 1080
-    background_height = 1920
+    short_path = shorten_path(meme_filename)
+    return short_path, meme_filename, staged_filename, frame
+
+
+def choose_selection():
+    """Choose the image, quote and sound for one meme."""
+    random_image_path = choose_random_image(raw_images_folder)
+    if not random_image_path:
+        logger.error("Failed to choose random image")
+        return None
+
+    random_quote, description = choose_random_quote(quotes_file)
+    if not random_quote:
+        logger.error("Failed to choose random quote")
+        return None
+
+    # Select random audio file
+    audio_files = [f for f in os.listdir(audio_folder) if f.endswith('.mp3')]
+    if not audio_files:
+        logger.error(red("No audio files found in the specified folder."))
+        return None
+
+    selection = {
+        'image': random_image_path,
+        'quote': random_quote,
+        'description': description,
+        'audio': os.path.join(audio_folder, random.choice(audio_files))
+    }
 
-    # Create black background
-    black_background = Image.new('RGB', (background_width, background_height), color='black')
-    
-    # Open the input image
-    with Image.open(image_path) as original_img:
-        img = original_img.copy()
-        img.thumbnail((background_width, background_height - 300))  # Leave space for text and video number
-    
-    # Set up font for the quote text
-    font_size = 60
-    try:
-        # Custom font stored in assets/fonts at project root
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        font_path = os.path.join(project_root, 'assets', 'fonts', 'Proxima_Nova_Semibold.otf')
-        font = ImageFont.truetype(font_path, font_size)
-    except IOError as e:
-        logger.warning(red(f"Custom font not found: {e}. Trying system fonts."))
-        # Try system fonts as fallback (Pillow 10+ doesn't have load_default)
-        try:
-            # Try Arial on macOS/Windows or DejaVu on Linux
-            system_fonts = [
-                "/System/Library/Fonts/Helvetica.ttc",
-                "/System/Library/Fonts/Supplemental/Arial.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                "C:\\Windows\\Fonts\\Arial.ttf"
-            ]
-            font = None
-            for font_path in system_fonts:
-                if os.path.exists(font_path):
-                    font = ImageFont.truetype(font_path, font_size)
-                    logger.info(f"Using system font: {font_path}")
-                    break
-            if not font:
-                raise IOError("No suitable font found")
-        except Exception as e2:
-            logger.error(red(f"Failed to load any font: {e2}"))
-            raise
+    plan = get_profile_renderer(FULL_PROFILE).plan
+    if plan.smart_crop:
+        # Analysed once per image; later renders read the window from the catalog cache
+        selection['crop'] = get_catalog().crop_window(random_image_path, plan.image_aspect)
+    return selection
 
-    # Calculate maximum text width
-    max_text_width = img.width - 60
-
-    # Wrap text
-    wrapped_lines = []
-    current_line = []
-    words = text.split()
-    for word in words:
-        current_line.append(word)
-        line = ' '.join(current_line)
-        width, _ = get_text_dimensions(line, font)
-        if width > max_text_width:
-            if len(current_line) == 1:
-                wrapped_lines.append(line)
-                current_line = []
-            else:
-                wrapped_lines.append(' '.join(current_line[:-1]))
-                current_line = [word]
-    if current_line:
-        wrapped_lines.append(' '.join(current_line))
-
-    # Calculate text box dimensions
-    line_heights = [get_text_dimensions(line, font)[1] for line in wrapped_lines]
-    total_text_height = sum(line_heights) + (len(wrapped_lines) - 1) * 10  # 10px line spacing
-    box_padding = 30
-    box_height = total_text_height + 2 * box_padding
-    text_box_width = img.width
-
-    # Create text box
-    text_box = Image.new('RGB', (text_box_width, box_height), color='white')
-    draw = ImageDraw.Draw(text_box)
-
-    # Draw quote text on the text box
-    y_position = box_padding
-    for line in wrapped_lines:
-        text_width, text_height = get_text_dimensions(line, font)
-        text_x = (text_box_width - text_width) // 2
-        draw.text((text_x, y_position), line, font=font, fill='black')
-        y_position += text_height + 10
-
-    # Calculate positions
-    total_height = box_height + img.height
-    vertical_center = (background_height - total_height) // 2
-    text_box_position = ((background_width - text_box_width) // 2, vertical_center)
-    meme_position = ((background_width - img.width) // 2, text_box_position[1] + box_height)
-
-    # Paste text box and image onto background
-    black_background.paste(text_box, text_box_position)
-    black_background.paste(img, meme_position)
-
-    # Set up font for the video number (half the size of the quote text)
-    part_font_size = font_size // 2
+
+def render_meme_video(selection, number, video_number, profile, images_folder, videos_folder, prefix="meme"):
+    """Render the meme image and video for a selection with an encoding profile."""
+    audio_clip = None
+    if get_encoder() == 'ffmpeg' or is_animated(selection['image']):
+        # ffmpeg reads the sound itself; only the duration is needed here
+        video_duration = probe_duration(selection['audio'])
+    else:
+        audio_clip = track(AudioFileClip(selection['audio']))
+        video_duration = audio_clip.duration
+    if profile['max_duration'] and video_duration > profile['max_duration']:
+        video_duration = profile['max_duration']
+        if audio_clip is not None:
+            audio_clip = track(audio_clip.subclipped(0, video_duration))
+    logger.info(f"Audio duration: {video_duration}s")
+    get_resource_manager().current().expect(video_duration)
+
+    # Create meme image
+    renderer = get_profile_renderer(profile)
+    meme_short_path, meme_filename, staged_image, meme_frame = create_meme_with_text(
+        selection['image'], selection['quote'], images_folder, number, video_number, renderer,
+        prefix=prefix, crop=selection.get('crop')
+    )
+    logger.info(green(f"Meme image: {meme_short_path}"))
+
+    # Stills go first so the video never shows up without them
+    moves = [(staged_image, meme_filename)]
+    if profile is FULL_PROFILE:
+        # Covers and the GUI thumbnail come from the frame in memory, never from the video
+        moves += export_covers(meme_frame, BASE_PATH, f"{prefix}_{number:04d}", stage=True)
+
+    # Save single output video, encoded in the scratch directory
+    output_filename = f"{prefix}_{number:04d}.mp4"
+    work_path = scratch_path(output_filename)
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        font_path = os.path.join(project_root, 'assets', 'fonts', 'Proxima_Nova_Semibold.otf')
-        part_font = ImageFont.truetype(font_path, part_font_size)
-    except IOError:
-        # Use same fallback logic as main font
-        system_fonts = [
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/System/Library/Fonts/Supplemental/Arial.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-            "C:\\Windows\\Fonts\\Arial.ttf"
-        ]
-        part_font = None
-        for font_path in system_fonts:
-            if os.path.exists(font_path):
-                part_font = ImageFont.truetype(font_path, part_font_size)
-                break
-        if not part_font:
-            raise IOError("No suitable font found for part number")
+        encode_meme_video(selection, video_number, profile, renderer, meme_frame, audio_clip, work_path, video_duration)
+    except BaseException:
+        for staged, _ in moves + [(work_path, None)]:
+            discard(staged)
+        raise
+    finally:
+        if audio_clip is not None:
+            audio_clip.close()
+    moves.append((work_path, os.path.join(videos_folder, output_filename)))
 
-    # Add the video number ("part") below the meme image with the smaller font
-    video_number_text = f"part {video_number}"
-    video_number_width, video_number_height = get_text_dimensions(video_number_text, part_font)
-    
-    # Calculate the position to center the part text below the meme
-    part_text_x_position = (background_width - video_number_width) // 2
-    video_number_y_position = meme_position[1] + img.height + 20
+    # The next video encodes while the mover writes this one to the niche folders
+    get_output_mover().submit(moves, owner=get_resource_manager().current().name)
+    logger.info(green(f"Video created: {output_filename}"))
+    return output_filename
 
-    # Draw the part text on the black background in white
-    draw = ImageDraw.Draw(black_background)
-    draw.text((part_text_x_position, video_number_y_position), video_number_text, font=part_font, fill='white')
 
-    # Save the meme
-    meme_filename = os.path.join(output_folder, f"meme_{number:04d}.jpg")
-    black_background.save(meme_filename, quality=95)
+def encode_meme_video(selection, video_number, profile, renderer, meme_frame, audio_clip, output_path, video_duration):
+    """Encode the video of a rendered meme with the configured encoder."""
+    if is_animated(selection['image']):
+        render_animated_video(selection, video_number, profile, renderer, output_path, video_duration)
+        return
 
-    short_path = shorten_path(meme_filename)
-    return short_path, meme_filename
+    if get_encoder() == 'ffmpeg':
+        # Fades and loudness normalization run in ffmpeg's filter graph on the composited canvas
+        encode_still(
+            meme_frame, selection['audio'], output_path, video_duration,
+            fps=profile['fps'], preset=profile['preset'], crf=profile['crf'],
+            video_filters=get_video_fades(video_duration),
+            audio_chain=get_audio_filters(selection['audio'], video_duration),
+            motion=batch_settings['motion'],
+            motion_intensity=batch_settings['motion_intensity'],
+            # Long sounds are encoded as parallel segments
+            segments=segment_count(video_duration, workers=get_job_cores()) if profile is FULL_PROFILE else 1
+        )
+        return
 
+    # MoviePy fallback: the same fades, without loudness normalization or motion
+    fade_in, fade_out = get_fade_lengths(video_duration)
+    effects = []
+    if fade_in:
+        effects.append(LutFadeIn(fade_in))
+    if fade_out:
+        effects.append(LutFadeOut(fade_out))
+    image_clip = track(ImageClip(meme_frame, duration=video_duration).with_effects(effects))
 
+    sound_fade = min(batch_settings['sound_fade'], video_duration / 2)
+    if sound_fade > 0:
+        audio_clip = track(audio_clip.with_effects([AudioFadeIn(sound_fade), AudioFadeOut(sound_fade)]))
 
+    # Add audio
+    final_clip = track(image_clip.with_audio(audio_clip))
 
-def process_single_meme(number, hashtags, video_number):
-    """Process the creation of a single meme video - lightweight and fast."""
+    # MoviePy would otherwise write its temp audio into the working directory
+    temp_audio = scratch_path(f"{os.path.splitext(os.path.basename(output_path))[0]}.m4a")
     try:
-        # Select random image and quote
-        random_image_path = choose_random_image(raw_images_folder)
-        if not random_image_path:
-            logger.error("Failed to choose random image")
-            return []
-
-        random_quote, description = choose_random_quote(quotes_file)
-        if not random_quote:
-            logger.error("Failed to choose random quote")
-            return []
-        
-        # Select random audio file
-        audio_files = [f for f in os.listdir(audio_folder) if f.endswith('.mp3')]
-        if not audio_files:
-            logger.error(red("No audio files found in the specified folder."))
-            return []
-
-        random_audio = os.path.join(audio_folder, random.choice(audio_files))
-        audio_clip = AudioFileClip(random_audio)
-        video_duration = audio_clip.duration
-        logger.info(f"Audio duration: {video_duration}s")
-        
-        # Create meme image
-        meme_short_path, meme_filename = create_meme_with_text(random_image_path, random_quote, meme_images_folder, number, video_number)
-        logger.info(green(f"Meme image: {meme_short_path}"))
-
-        # Create single video with fade-in effect (duration = audio length)
-        fade_duration = min(3, video_duration / 2)  # Fade for 3 sec or half the audio duration
-        image_clip = ImageClip(meme_filename, duration=video_duration).with_effects([FadeIn(fade_duration)])
-        
-        # Add audio
-        final_clip = image_clip.with_audio(audio_clip)
-        
-        # Save single output video
-        output_filename = f"meme_{number:04d}.mp4"
-        output_path = os.path.join(output_folder, output_filename)
-        
         final_clip.write_videofile(
             output_path,
             codec='libx264',
             audio_codec='aac',
-            fps=24,
+            fps=profile['fps'],
             logger=None,
-            threads=4,
-            preset='ultrafast',  # Fastest encoding
-            ffmpeg_params=["-crf", "28"]  # Lower quality for speed
+            threads=get_encoder_threads() or 4,
+            preset=profile['preset'],
+            audio_fps=44100,
+            temp_audiofile=temp_audio,
+            remove_temp=temp_cleanup_enabled(),
+            ffmpeg_params=["-crf", profile['crf'], "-pix_fmt", OUTPUT_PIX_FMT,
+                           "-video_track_timescale", OUTPUT_TIMESCALE]
+        )
+    finally:
+        final_clip.close()
+        discard(temp_audio)
+
+
+def render_animated_video(selection, video_number, profile, renderer, output_path, video_duration):
+    """Stream the frames of an animated source into one loop, then let ffmpeg loop it to the audio length."""
+    loop_path = scratch_path(f"{os.path.splitext(os.path.basename(output_path))[0]}.loop.mp4")
+    try:
+        frames = renderer.render_animation(
+            selection['image'], selection['quote'], part_number=video_number, crop=selection.get('crop')
+        )
+        with RawVideoWriter(loop_path, (renderer.width, renderer.height), profile['fps']) as writer:
+            for frame in at_frame_rate(frames, profile['fps']):
+                writer.write(frame)
+
+        mux_looped_video(
+            loop_path, selection['audio'], output_path, video_duration,
+            fps=profile['fps'], preset=profile['preset'], crf=profile['crf'],
+            video_filters=get_video_fades(video_duration),
+            audio_chain=get_audio_filters(selection['audio'], video_duration)
+        )
+    finally:
+        discard(loop_path)
+
+
+def process_single_meme(number, hashtags, video_number, selection=None):
+    """Process the creation of a single meme video - lightweight and fast."""
+    try:
+        if selection is None:
+            selection = choose_selection()
+            if not selection:
+                return []
+
+        output_filename = render_meme_video(
+            selection, number, video_number, FULL_PROFILE, meme_images_folder, output_folder
         )
-        
-        logger.info(green(f"Video created: {output_filename}"))
 
         # Create description file
-        description_path = create_description_file(number, description, hashtags, output_folder)
+        description_path = create_description_file(number, selection['description'], hashtags, output_folder)
         logger.info(green(f"Description: {shorten_path(description_path)}"))
-        
-        # Clean up
-        audio_clip.close()
-        final_clip.close()
 
         return [output_filename]
+    except JobCancelled:
+        raise
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -319,52 +383,525 @@ def process_single_meme(number, hashtags, video_number):
         raise
 
 
+def process_slideshow(number, hashtags, video_number, slide_count):
+    """Render several memes into one reel with crossfades and a single sound."""
+    try:
+        selections = []
+        for _ in range(slide_count):
+            selection = choose_selection()
+            if not selection:
+                return []
+            selections.append(selection)
+
+        video_duration = probe_duration(selections[0]['audio'])
+        logger.info(f"Audio duration: {video_duration}s, {slide_count} slides")
+        get_resource_manager().current().expect(video_duration)
+
+        # Slides are rendered once at full size; ffmpeg only crossfades them
+        renderer = get_profile_renderer(FULL_PROFILE)
+        slide_paths = []
+        moves = []
+        try:
+            for index, selection in enumerate(selections):
+                get_resource_manager().current().raise_if_cancelled()
+                if index == 0:
+                    meme_short_path, meme_filename, slide_path, frame = create_meme_with_text(
+                        selection['image'], selection['quote'], meme_images_folder, number, video_number,
+                        renderer, crop=selection.get('crop')
+                    )
+                    logger.info(green(f"Meme image: {meme_short_path}"))
+                    moves.append((slide_path, meme_filename))
+                    # Export before the next slide reuses the canvas buffer
+                    moves += export_covers(frame, BASE_PATH, f"meme_{number:04d}", stage=True)
+                else:
+                    frame = renderer.render_array(selection['image'], selection['quote'],
+                                                  part_number=video_number, crop=selection.get('crop'))
+                    slide_path = scratch_path(f"meme_{number:04d}_slide{index}.jpg")
+                    Image.frombuffer('RGB', (frame.shape[1], frame.shape[0]), frame, 'raw', 'RGB', 0, 1).save(slide_path, quality=95)
+                slide_paths.append(slide_path)
+
+            output_filename = f"meme_{number:04d}.mp4"
+            work_path = scratch_path(output_filename)
+            moves.append((work_path, os.path.join(output_folder, output_filename)))
+            encode_slideshow(
+                slide_paths,
+                selections[0]['audio'],
+                work_path,
+                video_duration,
+                fps=FULL_PROFILE['fps'],
+                preset=FULL_PROFILE['preset'],
+                crf=FULL_PROFILE['crf'],
+                transition=SLIDE_TRANSITION,
+                video_filters=get_video_fades(video_duration),
+                audio_chain=get_audio_filters(selections[0]['audio'], video_duration)
+            )
+        except BaseException:
+            for staged, _ in moves:
+                discard(staged)
+            raise
+        finally:
+            for slide_path in slide_paths[1:]:
+                discard(slide_path)
+
+        # The next video encodes while the mover writes this one to the niche folders
+        get_output_mover().submit(moves, owner=get_resource_manager().current().name)
+
+        logger.info(green(f"Video created: {output_filename}"))
+
+        description = ' '.join(s['description'] for s in selections if s['description'])
+        description_path = create_description_file(number, description, hashtags, output_folder)
+        logger.info(green(f"Description: {shorten_path(description_path)}"))
+
+        return [output_filename]
+    except JobCancelled:
+        raise
+    except Exception as e:
+        import traceback
+        logger.error(red(f"Error processing slideshow: {e}"))
+        logger.error(traceback.format_exc())
+        raise
+
+
+def process_single_draft(number, video_number, selection=None):
+    """Render a low-resolution draft and record its selection for promotion."""
+    try:
+        if selection is None:
+            selection = choose_selection()
+            if not selection:
+                return []
+
+        output_filename = render_meme_video(
+            selection, number, video_number, DRAFT_PROFILE, drafts_folder, drafts_folder, prefix="draft"
+        )
+
+        manifest_path = os.path.join(drafts_folder, f"draft_{number:04d}.json")
+        with open(manifest_path, 'w') as f:
+            json.dump(selection, f, indent=2)
+
+        return [output_filename]
+    except JobCancelled:
+        raise
+    except Exception as e:
+        import traceback
+        logger.error(red(f"Error processing draft: {e}"))
+        logger.error(traceback.format_exc())
+        raise
+
+
+def setup_paths(base_path):
+    """Define the niche paths used by the generator."""
+    global BASE_PATH, raw_images_folder, quotes_file, meme_images_folder, meme_fade_folder, audio_folder, output_folder, drafts_folder
+    BASE_PATH = base_path
+    raw_images_folder = os.path.join(BASE_PATH, 'Raw-Images')
+    quotes_file = os.path.join(BASE_PATH, 'Quotes.txt')
+    meme_images_folder = os.path.join(BASE_PATH, 'Meme-Images')
+    meme_fade_folder = os.path.join(BASE_PATH, 'Meme-Fade')
+    audio_folder = os.path.join(BASE_PATH, 'TikTok-Sounds')
+    output_folder = os.path.join(BASE_PATH, 'Meme-Final')
+    drafts_folder = os.path.join(BASE_PATH, 'Meme-Drafts')
+
+    # Create the output folders if they don't exist
+    for folder in (meme_images_folder, output_folder):
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+
+def load_hashtags():
+    """Read the niche hashtags from Credentials.json."""
+    credentials_path = os.path.join(BASE_PATH, 'Credentials.json')
+    with open(credentials_path, 'r') as f:
+        credentials = json.load(f)
+    return credentials.get('hashtags', '')
+
+
+def list_drafts(base_path):
+    """List the draft numbers waiting in a niche's Meme-Drafts folder."""
+    folder = os.path.join(base_path, 'Meme-Drafts')
+    if not os.path.exists(folder):
+        return []
+    numbers = []
+    for f in os.listdir(folder):
+        match = re.match(r'draft_(\d+)\.json$', f)
+        if match and os.path.exists(os.path.join(folder, f"draft_{match.group(1)}.mp4")):
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+
+def promote_drafts(base_path, draft_numbers, video_settings=None, on_progress=None, cancel_event=None):
+    """
+    Render approved drafts at full quality, reusing their selections.
+    
+    Args:
+        base_path: Path to niche folder
+        draft_numbers: Draft numbers to promote
+        video_settings: Video settings (if None, loaded from the niche's video_settings.json)
+        on_progress: Called with the JobProgress of each video on ffmpeg progress updates
+        cancel_event: Stop starting videos once this threading.Event is set
+    
+    Returns:
+        List of created output filenames
+    """
+    setup_paths(base_path)
+    load_settings(video_settings)
+    hashtags = load_hashtags()
+
+    log_file_path = os.path.join(BASE_PATH, 'upload_log.json')
+    with open(log_file_path, 'r') as log_file:
+        log_data = json.load(log_file)
+    video_number = log_data.get('video_number', batch_settings.get('part_start_number', 1))
+
+    start_number = get_next_filename(output_folder, "meme_", ".mp4")
+
+    def make_job(i, draft_number):
+        manifest_path = os.path.join(drafts_folder, f"draft_{draft_number:04d}.json")
+        with open(manifest_path, 'r') as f:
+            selection = json.load(f)
+
+        def job():
+            logger.info(bold(f"Promoting draft {draft_number} ({i + 1}/{len(draft_numbers)})"))
+            return process_single_meme(start_number + i, hashtags, video_number + i, selection=selection)
+        return f"meme {start_number + i:04d}", job
+
+    def job_done(index, name, outcome):
+        if isinstance(outcome, BaseException):
+            return
+        # Promoted drafts are done with
+        for ext in ('.json', '.mp4', '.jpg'):
+            draft_file = os.path.join(drafts_folder, f"draft_{draft_numbers[index]:04d}{ext}")
+            if os.path.exists(draft_file):
+                os.remove(draft_file)
+
+        log_data['video_number'] = max(log_data.get('video_number', video_number), video_number + index + 1)
+        with open(log_file_path, 'w') as log_file:
+            json.dump(log_data, log_file, indent=2)
+        report_mover_backlog()
+
+    try:
+        results = run_batch(
+            [make_job(i, draft_number) for i, draft_number in enumerate(draft_numbers)], FULL_PROFILE,
+            on_progress=on_progress, on_job_done=job_done, cancel_event=cancel_event
+        )
+    finally:
+        failures = wait_for_mover()
+    if failures:
+        # The drafts of undelivered videos are kept, so they can be promoted again
+        raise MoveError(failures)
+    return [name for created in results for name in created or []]
 
-def main(*args, auto_count=None):
+
+def plan_batch(base_path, count, video_settings=None):
+    """
+    Choose the image, quote, sound and part number of the next memes without rendering them.
+    
+    Args:
+        base_path: Path to niche folder
+        count: Number of memes to plan
+        video_settings: Video settings (if None, loaded from the niche's video_settings.json)
+    
+    Returns:
+        List of selections, each with a 'part_number' key
+    """
+    setup_paths(base_path)
+    load_settings(video_settings)
+
+    log_file_path = os.path.join(BASE_PATH, 'upload_log.json')
+    with open(log_file_path, 'r') as log_file:
+        log_data = json.load(log_file)
+    video_number = log_data.get('video_number', batch_settings.get('part_start_number', 1))
+
+    selections = []
+    for i in range(count):
+        selection = choose_selection()
+        if not selection:
+            break
+        selection['part_number'] = video_number + i
+        selections.append(selection)
+    return selections
+
+
+def load_settings(settings=None):
+    """Set the batch video settings, loading them from the niche if not given."""
+    global batch_settings, batch_plans
+    batch_settings = settings if settings is not None else load_video_settings(BASE_PATH)
+    batch_plans = {}
+
+
+def get_derivative_cache():
+    """Get the derivative cache of the current niche."""
+    global _derivatives
+    if _derivatives is None or _derivatives.niche_path != BASE_PATH:
+        _derivatives = DerivativeCache(BASE_PATH)
+    return _derivatives
+
+
+def get_catalog():
+    """Get the asset catalog of the current niche."""
+    global _catalog
+    if _catalog is None or _catalog.niche_path != BASE_PATH:
+        _catalog = AssetCatalog(BASE_PATH)
+    return _catalog
+
+
+def get_output_mover():
+    """Get the background mover for finished outputs."""
+    global _output_mover
+    if _output_mover is None:
+        _output_mover = OutputMover()
+    return _output_mover
+
+
+def report_mover_backlog():
+    """Log how far the output mover is behind, if at all."""
+    files, size = get_output_mover().backlog()
+    if files:
+        logger.info(cyan(f"Output mover: {files} file(s), {size / (1024 * 1024):.1f} MB still to write"))
+    # Jobs reap their own resources, so anything live here is held outside a job
+    counts = get_resource_manager().counts()
+    if counts['clips'] or counts['processes']:
+        logger.info(cyan(f"Live resources: {counts['clips']} clip(s), {counts['processes']} ffmpeg process(es)"))
+
+
+def wait_for_mover():
+    """Wait for the output mover to finish, logging and returning failed moves."""
+    files, _ = get_output_mover().backlog()
+    if files:
+        logger.info(f"Waiting for the output mover to write {files} file(s)")
+    failures = get_output_mover().wait()
+    for failure in failures:
+        logger.error(red(failure.message))
+    return failures
+
+
+def get_sound_index():
+    """Get the sound fingerprint index of the current niche."""
+    global _sound_index
+    if _sound_index is None or _sound_index.sounds_folder != audio_folder:
+        _sound_index = SoundFingerprintIndex(audio_folder)
+    return _sound_index
+
+
+def get_encoder():
+    """Get the configured encoder for still memes ("ffmpeg" or "moviepy")."""
+    try:
+        return get_config().get('video.encoder', 'ffmpeg')
+    except FileNotFoundError:
+        return 'ffmpeg'
+
+
+def get_fade_lengths(video_duration):
+    """Get the fade-in and fade-out lengths of a video from the batch settings."""
+    fade = min(batch_settings['fade_duration'], video_duration / 2)
+    fade_in = fade if batch_settings['fade_in_start'] else 0.0
+    fade_out = fade if batch_settings['fade_out_end'] else 0.0
+    return fade_in, fade_out
+
+
+def get_video_fades(video_duration):
+    """Get the ffmpeg fade filters of a video from the batch settings."""
+    fade_in, fade_out = get_fade_lengths(video_duration)
+    return video_fades(video_duration, fade_in, fade_out)
+
+
+def get_audio_filters(audio_path, video_duration):
+    """Get the ffmpeg audio filters (loudness normalization, sound fades) of a video."""
+    loudness = None
+    if batch_settings['loudness_normalize']:
+        # Measured when the sound was fingerprinted (or by warm_up), so no extra analysis pass is needed
+        loudness = get_sound_index().get_loudness(os.path.basename(audio_path))
+    return audio_filters(video_duration, batch_settings['sound_fade'], loudness, LOUDNESS_TARGET)
+
+
+def get_profile_renderer(profile):
+    """Get the renderer for an encoding profile, compiling its plan once per batch."""
+    plan = batch_plans.get(profile['scale'])
+    if plan is None:
+        plan = batch_plans[profile['scale']] = compile_render_plan(batch_settings, scale=profile['scale'])
+    renderer = get_renderer(plan)
+    renderer.derivatives = get_derivative_cache()
+    return renderer
+
+
+def get_generation_workers():
+    """Get the configured number of parallel generations ("auto" to autotune)."""
+    try:
+        return get_config().get('performance.generation_workers', 'auto')
+    except FileNotFoundError:
+        return 'auto'
+
+
+def get_tuner(profile):
+    """Get the concurrency tuner of a profile on this machine, resuming its saved state."""
+    key = machine_key(profile['name'], profile['preset'], get_encoder())
+    tuner = _tuners.get(key)
+    if tuner is None:
+        cpu_count = os.cpu_count() or 1
+        slots = get_encode_slots().slots
+        # Workers beyond the machine-wide encode slots would only queue
+        max_workers = min(cpu_count, slots) if slots > 0 else cpu_count
+        tuner = _tuners[key] = ConcurrencyTuner(key, max_workers, cpu_count)
+    return tuner
+
+
+def warm_up(profile):
+    """Create the shared caches of the niche before parallel workers use them."""
+    get_output_mover()
+    get_derivative_cache()
+    get_catalog()
+    get_profile_renderer(profile)
+    if batch_settings['loudness_normalize']:
+        # Sounds added by hand are analysed once here, not by every worker that picks them
+        indexed, _ = get_sound_index().sync()
+        if indexed:
+            logger.info(f"Measured the loudness of {indexed} new sound(s)")
+
+
+def run_batch(jobs, profile, on_progress=None, on_wait=None, on_job_done=None, keep_going=False, cancel_event=None):
+    """
+    Run generation jobs on parallel workers, each in its own scope and encode slot.
+
+    With performance.generation_workers set to "auto", the worker count and
+    encoder threads are autotuned while the batch runs.
+
+    Args:
+        jobs: (job name, function returning the created filenames) pairs
+        profile: Encoding profile of the jobs
+        on_progress: Passed to each job's resource scope
+        on_wait: Called with the queue position while a job waits for an encode slot
+        on_job_done: Called on the calling thread with (index, job name, created
+            filenames or the exception) as each job ends; a job whose outputs
+            could not be moved to the niche ends with a MoveError
+        keep_going: Keep starting jobs after one failed
+        cancel_event: Stop starting jobs once this threading.Event is set
+
+    Returns:
+        Created filenames of each job in job order (None for failed jobs)
+    """
+    warm_up(profile)
+    configured = get_generation_workers()
+    tuner = get_tuner(profile) if configured == 'auto' else None
+    setting = tuner.setting if tuner else TuneSetting(max(1, int(configured)), 0)
+    cpu_count = os.cpu_count() or 1
+
+    def run_job(name, job, job_setting):
+        with get_resource_manager().scope(name, on_progress) as scope:
+            # The setting the job was submitted under holds for all of its encodes,
+            # even after the tuner moves on to the next trial
+            scope.encoder_threads = job_setting.threads
+            scope.cores = max(1, cpu_count // job_setting.workers)
+            # A cancel that came in while this job was being submitted missed its scope
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled(f"{name} cancelled")
+            with encode_slot(on_wait):
+                return job()
+
+    results = [None] * len(jobs)
+    running = {}
+    # Jobs count as done once the mover has delivered their outputs
+    delivering = {}
+    next_index = 0
+    error = None
+    cancelled = None
+    pool_size = tuner.max_workers if tuner else setting.workers
+    with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='generator') as pool:
+        while True:
+            stopping = (cancelled is not None or (error is not None and not keep_going)
+                        or (cancel_event is not None and cancel_event.is_set()))
+            while not stopping and next_index < len(jobs) and len(running) < setting.workers:
+                name, job = jobs[next_index]
+                trial = tuner.job_started() if tuner else 0
+                running[pool.submit(run_job, name, job, setting)] = (next_index, name, trial)
+                next_index += 1
+            if not running and not delivering:
+                break
+
+            moving = [future for _, futures, _ in delivering.values() for future in futures]
+            done, _ = wait(list(running) + moving, return_when=FIRST_COMPLETED)
+            for name, (index, futures, outcome) in list(delivering.items()):
+                if not all(future.done() for future in futures):
+                    continue
+                del delivering[name]
+                failures = [failure for future in futures for failure in future.result()]
+                if failures:
+                    results[index] = None
+                    outcome = MoveError(failures)
+                if on_job_done:
+                    on_job_done(index, name, outcome)
+
+            for future in done:
+                if future not in running:
+                    continue
+                index, name, trial = running.pop(future)
+                futures = get_output_mover().take(name)
+                try:
+                    outcome = results[index] = future.result()
+                except JobCancelled as e:
+                    outcome = cancelled = e
+                except Exception as e:
+                    outcome = e
+                    error = error or e
+                else:
+                    changed = tuner.job_finished(trial) if tuner else None
+                    if changed:
+                        setting = changed
+                    if futures:
+                        delivering[name] = (index, futures, outcome)
+                        continue
+                if on_job_done:
+                    on_job_done(index, name, outcome)
+
+    if cancelled is not None:
+        raise cancelled
+    if error is not None and not keep_going:
+        raise error
+    return results
+
+
+def main(*args, auto_count=None, video_settings=None, draft=False, selections=None, slides=1, on_progress=None,
+         on_wait=None, on_job_done=None, keep_going=False, cancel_event=None):
     """
     Main function to generate meme videos.
     
     Args:
         *args: Path to niche folder
         auto_count: Number of videos to generate (if None, will prompt for input)
+        video_settings: Video settings (if None, loaded from the niche's video_settings.json)
+        draft: Render low-resolution drafts into Meme-Drafts instead of final videos
+        selections: Approved selections from plan_batch() to render instead of random ones
+        slides: Memes per video; more than one makes crossfaded slideshow reels
+            (full renders of random selections only)
+        on_progress: Called with the JobProgress of the current video on every
+            ffmpeg progress update (from worker threads)
+        on_wait: Called with the queue position while the video waits for a
+            machine-wide encode slot
+        on_job_done: Called with (index, job name, created filenames or the
+            exception) as each video ends
+        keep_going: Keep generating after a failed video instead of stopping
+        cancel_event: Stop starting videos once this threading.Event is set
     """
-    global BASE_PATH
-
     # Check if BASE_PATH is provided as an argument
     if args and isinstance(args[0], str):
-        BASE_PATH = args[0]
+        setup_paths(args[0])
     elif len(sys.argv) > 1:
-        BASE_PATH = sys.argv[1]
+        setup_paths(sys.argv[1])
     else:
         print("Please provide the niche path as an argument.")
         return
 
-    # Now define the paths that depend on BASE_PATH
-    global raw_images_folder, quotes_file, meme_images_folder, meme_fade_folder, audio_folder, output_folder
-    raw_images_folder = os.path.join(BASE_PATH, 'Raw-Images')
-    quotes_file = os.path.join(BASE_PATH, 'Quotes.txt')
-    meme_images_folder = os.path.join(BASE_PATH, 'Meme-Images')
-    meme_fade_folder = os.path.join(BASE_PATH, 'Meme-Fade')
-    audio_folder = os.path.join(BASE_PATH, 'TikTok-Sounds')
-    output_folder = os.path.join(BASE_PATH, 'Meme-Final')
-    credentials_path = os.path.join(BASE_PATH, 'Credentials.json')
-
-    with open(credentials_path, 'r') as f:
-        credentials = json.load(f)
-    hashtags = credentials.get('hashtags', '')
+    hashtags = load_hashtags()
 
-    # Create the Meme-Images folder if it doesn't exist
-    if not os.path.exists(meme_images_folder):
-        os.makedirs(meme_images_folder)
+    # The batch-wide layout is compiled once per profile; same render core as the GUI live preview
+    load_settings(video_settings)
 
     # Read the video number from the upload_log.json
     log_file_path = os.path.join(BASE_PATH, 'upload_log.json')
     with open(log_file_path, 'r+') as log_file:
         log_data = json.load(log_file)
-        video_number = log_data.get('video_number', 1)
+        video_number = log_data.get('video_number', batch_settings.get('part_start_number', 1))
 
     # Get number of videos to generate
-    if auto_count is not None:
+    if selections is not None:
+        num_videos = len(selections)
+    elif auto_count is not None:
         num_videos = auto_count
     else:
         print("How many videos would you like to generate?")
@@ -374,21 +911,52 @@ def main(*args, auto_count=None):
     start_time = datetime.now()
     created_videos = []
 
-    # Get the next available number based on existing outputs
-    start_number = get_next_filename(output_folder, "meme_", ".mp4")
+    if draft:
+        if not os.path.exists(drafts_folder):
+            os.makedirs(drafts_folder)
+        start_number = get_next_filename(drafts_folder, "draft_", ".mp4")
+    else:
+        # Get the next available number based on existing outputs
+        start_number = get_next_filename(output_folder, "meme_", ".mp4")
 
-    for i in range(num_videos):
+    def make_job(i):
+        # Numbers are fixed up front, so parallel videos finish in any order
         current_number = start_number + i
-        logger.info(bold(f"Processing video {i + 1}/{num_videos}"))
-        
-        # Process the meme with the current video number
-        created_videos += process_single_meme(current_number, hashtags, video_number)
-        
-        # Increment the video number and update the log
-        video_number += 1
-        log_data['video_number'] = video_number
-        with open(log_file_path, 'w') as log_file:
-            json.dump(log_data, log_file, indent=2)
+        selection = selections[i] if selections is not None else None
+
+        def job():
+            logger.info(bold(f"Processing {'draft' if draft else 'video'} {i + 1}/{num_videos}"))
+            if draft:
+                # Drafts preview the part number they would get but do not consume it
+                return process_single_draft(current_number, video_number + i, selection=selection)
+            if slides > 1 and selection is None:
+                return process_slideshow(current_number, hashtags, video_number + i, min(slides, MAX_SLIDES))
+            return process_single_meme(current_number, hashtags, video_number + i, selection=selection)
+        return f"{'draft' if draft else 'meme'} {current_number:04d}", job
+
+    def job_done(index, name, outcome):
+        if not draft and not isinstance(outcome, BaseException):
+            # The log holds the part number after the highest one used
+            log_data['video_number'] = max(log_data.get('video_number', video_number), video_number + index + 1)
+            with open(log_file_path, 'w') as log_file:
+                json.dump(log_data, log_file, indent=2)
+            report_mover_backlog()
+        if on_job_done:
+            on_job_done(index, name, outcome)
+
+    # Clips and ffmpeg processes of each job are reaped when it ends, also on errors;
+    # encode slots keep GUI, CLI and cron runs from oversubscribing the machine
+    try:
+        results = run_batch(
+            [make_job(i) for i in range(num_videos)], DRAFT_PROFILE if draft else FULL_PROFILE,
+            on_progress=on_progress, on_wait=on_wait, on_job_done=job_done,
+            keep_going=keep_going, cancel_event=cancel_event
+        )
+    finally:
+        # Outputs count as created once they are in the niche folders
+        failures = wait_for_mover()
+    for created in results:
+        created_videos += created or []
 
     # Print summary
     print("----------")
@@ -404,8 +972,10 @@ def main(*args, auto_count=None):
     minutes, seconds = divmod(total_time.total_seconds(), 60)
     print(f"Total time taken: {cyan(bold(f'{int(minutes)} minutes and {int(seconds)} seconds'))}")
 
+    if failures and not keep_going:
+        # Encoded but not delivered; the files are in the mover's fallback folder
+        raise MoveError(failures)
 
-    
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
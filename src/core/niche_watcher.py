@@ -0,0 +1,123 @@
+"""
+Filesystem watcher for niche folders.
+
+This module forwards inotify (or the platform equivalent) change events from
+a niche folder into its AssetCatalog through watchdog. watchdog is optional;
+without it the watcher reports itself unavailable and callers keep doing
+explicit rescans.
+"""
+
+import threading
+from typing import Callable, Optional, Set, Tuple
+
+from src.core.asset_catalog import AssetCatalog
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+
+class _CatalogEventHandler(FileSystemEventHandler):
+    """Feeds watchdog events into the watcher."""
+
+    def __init__(self, watcher: 'NicheWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self.watcher._queue_path(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.watcher._queue_path(dest_path)
+
+
+class NicheWatcher:
+    """Watches a niche folder and applies changes to its asset catalog."""
+
+    def __init__(
+        self,
+        catalog: AssetCatalog,
+        on_change: Callable[[Set[Tuple[str, str]]], None],
+        debounce_seconds: float = 0.3
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            catalog: Catalog to keep up to date
+            on_change: Called from the watcher thread with the set of
+                (category, file name) pairs that changed in a debounce window
+            debounce_seconds: Delay used to coalesce bursts of events
+        """
+        self.catalog = catalog
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self._observer = None
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """Return True if watchdog is installed."""
+        return WATCHDOG_AVAILABLE
+
+    def start(self) -> bool:
+        """
+        Start watching the niche folder.
+
+        Returns:
+            True if the watcher is running
+        """
+        if not WATCHDOG_AVAILABLE or self._observer is not None:
+            return self._observer is not None
+
+        observer = Observer()
+        observer.schedule(_CatalogEventHandler(self), self.catalog.niche_path, recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return True
+
+    def stop(self) -> None:
+        """Stop watching and drop pending events."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+    def _queue_path(self, path: str) -> None:
+        with self._lock:
+            self._pending.add(path)
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_seconds, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            paths = self._pending
+            self._pending = set()
+            self._timer = None
+
+        changes = set()
+        for path in paths:
+            changed = self.catalog.apply_event(path)
+            if changed:
+                changes.add(changed)
+
+        if changes:
+            self.on_change(changes)
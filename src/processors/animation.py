@@ -0,0 +1,75 @@
+"""
+Lazy frame access for animated GIF and WebP sources.
+
+Frames are decoded one at a time from the open file and resampled to a
+constant frame rate on the fly, so only the current frame is ever held in
+memory regardless of how long the animation is.
+"""
+
+from typing import Iterable, Iterator, Tuple
+
+from PIL import Image, ImageSequence
+
+
+ANIMATED_EXTENSIONS = ('.gif', '.webp')
+DEFAULT_FRAME_DURATION = 0.1  # seconds, for frames without a duration
+
+
+def is_animated(path: str) -> bool:
+    """
+    Check whether an image file has more than one frame.
+
+    Args:
+        path: Image path
+
+    Returns:
+        True for animated GIF/WebP files
+    """
+    if not path.lower().endswith(ANIMATED_EXTENSIONS):
+        return False
+    try:
+        with Image.open(path) as image:
+            return bool(getattr(image, 'is_animated', False))
+    except OSError:
+        return False
+
+
+def iter_frames(image: Image.Image) -> Iterator[Tuple[Image.Image, float]]:
+    """
+    Decode the frames of an open animated image.
+
+    Args:
+        image: Open animated image
+
+    Yields:
+        Tuples of (RGB frame, display duration in seconds)
+    """
+    for frame in ImageSequence.Iterator(image):
+        duration = frame.info.get('duration') or 0
+        yield frame.convert('RGB'), (duration / 1000.0) or DEFAULT_FRAME_DURATION
+
+
+def at_frame_rate(frames: Iterable[Tuple[object, float]], fps: float) -> Iterator[object]:
+    """
+    Resample variable-duration frames to a constant frame rate.
+
+    Each frame is repeated (or dropped) so that its on-screen time matches
+    its duration; the error is carried over so the loop length stays exact.
+
+    Args:
+        frames: Iterable of (frame, duration in seconds)
+        fps: Output frame rate
+
+    Yields:
+        Frames at the output rate
+    """
+    elapsed = 0.0
+    emitted = 0
+    frame = None
+    for frame, duration in frames:
+        elapsed += duration
+        while emitted < round(elapsed * fps):
+            emitted += 1
+            yield frame
+    if emitted == 0 and frame is not None:
+        yield frame
@@ -0,0 +1,543 @@
+"""
+Audio fingerprinting for the TikTok-Sounds library.
+
+Sounds are decoded to mono PCM, turned into a log spectrogram and reduced to
+a constellation of spectral peaks. Pairs of nearby peaks are hashed into
+(anchor frequency, target frequency, time delta) keys and stored in an
+inverted index, so a new sound is matched against the whole library with a
+handful of dictionary lookups instead of comparing every pair of files.
+
+The same ffmpeg decode also runs an EBU R128 loudness measurement, stored
+with the fingerprint, so the encoder can normalize loudness in one pass.
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.ffmpeg import get_ffmpeg_binary
+from src.utils.resources import run_process
+
+
+SAMPLE_RATE = 11025
+WINDOW_SIZE = 1024
+HOP_SIZE = 512
+
+# Peak picking neighbourhood (frames, bins) and pair fan-out
+PEAK_TIME_RADIUS = 10
+PEAK_FREQ_RADIUS = 10
+FAN_OUT = 5
+MAX_PAIR_DELTA = 63  # frames, fits in 6 bits of the hash
+
+# Matching thresholds
+MIN_MATCH_HASHES = 20
+DUPLICATE_RATIO = 0.2
+
+INDEX_FILENAME = '.fingerprints.npz'
+
+# Loudness normalization target (EBU R128, short-form platforms)
+LOUDNESS_TARGET = {'I': -14.0, 'TP': -1.5, 'LRA': 11.0}
+LOUDNESS_KEYS = ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset')
+_LOUDNORM_JSON = re.compile(r'\{[^{}]*"input_i"[^{}]*\}', re.S)
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.wav', '.aac', '.ogg')
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file to mono float32 samples with ffmpeg.
+
+    Args:
+        path: Audio file path
+        sample_rate: Target sample rate
+
+    Returns:
+        1-D array of samples in [-1, 1]
+    """
+    command = [
+        get_ffmpeg_binary(), '-v', 'error', '-i', path,
+        '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'
+    ]
+    returncode, stdout, stderr = run_process(command, capture_stdout=True)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stdout, stderr)
+    samples = np.frombuffer(stdout, dtype=np.int16)
+    return samples.astype(np.float32) / 32768.0
+
+
+def loudnorm_analysis_filter() -> str:
+    """Get the loudnorm filter that measures a file against LOUDNESS_TARGET."""
+    target = LOUDNESS_TARGET
+    return f"loudnorm=I={target['I']}:TP={target['TP']}:LRA={target['LRA']}:print_format=json"
+
+
+def decode_audio_with_loudness(
+    path: str,
+    sample_rate: int = SAMPLE_RATE
+) -> Tuple[np.ndarray, Optional[Dict[str, float]]]:
+    """
+    Decode an audio file for fingerprinting and measure its loudness in the same pass.
+
+    Args:
+        path: Audio file path
+        sample_rate: Target sample rate of the decoded samples
+
+    Returns:
+        Tuple of (mono samples in [-1, 1], loudness measurement or None)
+    """
+    command = [
+        get_ffmpeg_binary(), '-hide_banner', '-nostats', '-v', 'info', '-i', path,
+        '-map', '0:a:0', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', 'pipe:1',
+        '-map', '0:a:0', '-af', loudnorm_analysis_filter(), '-f', 'null', '-'
+    ]
+    returncode, stdout, stderr = run_process(command, capture_stdout=True)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stdout, stderr)
+    samples = np.frombuffer(stdout, dtype=np.int16).astype(np.float32) / 32768.0
+    return samples, parse_loudness(stderr.decode('utf-8', errors='replace'))
+
+
+def parse_loudness(output: str) -> Optional[Dict[str, float]]:
+    """
+    Extract the loudnorm measurement from ffmpeg's log output.
+
+    Args:
+        output: ffmpeg stderr
+
+    Returns:
+        Dictionary with LOUDNESS_KEYS, or None if not found or not finite
+    """
+    match = _LOUDNORM_JSON.search(output)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+        loudness = {key: float(data[key]) for key in LOUDNESS_KEYS}
+    except (ValueError, KeyError):
+        return None
+    # Silent files measure as -inf
+    if not all(np.isfinite(value) for value in loudness.values()):
+        return None
+    return loudness
+
+
+def spectrogram(samples: np.ndarray) -> np.ndarray:
+    """
+    Compute a log-magnitude spectrogram (frames x frequency bins).
+
+    Args:
+        samples: Mono samples
+
+    Returns:
+        2-D float32 array
+    """
+    if len(samples) < WINDOW_SIZE:
+        samples = np.pad(samples, (0, WINDOW_SIZE - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, WINDOW_SIZE)[::HOP_SIZE]
+    window = np.hanning(WINDOW_SIZE).astype(np.float32)
+    magnitude = np.abs(np.fft.rfft(frames * window, axis=1))
+    return np.log1p(magnitude * 100.0).astype(np.float32)
+
+
+def _sliding_max(values: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Maximum over a (2 * radius + 1) window along one axis."""
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (radius, radius)
+    padded = np.pad(values, pad, mode='constant', constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis=axis)
+    return windows.max(axis=-1)
+
+
+def find_peaks(spec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find local maxima of a spectrogram.
+
+    Args:
+        spec: Spectrogram from spectrogram()
+
+    Returns:
+        Tuple of (frame indices, frequency bins), sorted by frame
+    """
+    neighbourhood = _sliding_max(_sliding_max(spec, PEAK_TIME_RADIUS, 0), PEAK_FREQ_RADIUS, 1)
+    threshold = spec.mean() + spec.std()
+    mask = (spec == neighbourhood) & (spec > threshold)
+    times, freqs = np.nonzero(mask)
+    order = np.lexsort((freqs, times))
+    return times[order], freqs[order]
+
+
+def hash_peaks(times: np.ndarray, freqs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash peak pairs into integer keys.
+
+    Each peak is paired with the next FAN_OUT peaks in time order.
+
+    Args:
+        times: Peak frame indices (sorted)
+        freqs: Peak frequency bins
+
+    Returns:
+        Tuple of (hashes, anchor frame indices)
+    """
+    hashes = []
+    anchors = []
+    for offset in range(1, FAN_OUT + 1):
+        if len(times) <= offset:
+            break
+        delta = times[offset:] - times[:-offset]
+        valid = (delta > 0) & (delta <= MAX_PAIR_DELTA)
+        f1 = freqs[:-offset][valid].astype(np.uint32)
+        f2 = freqs[offset:][valid].astype(np.uint32)
+        dt = delta[valid].astype(np.uint32)
+        hashes.append((f1 << 16) | (f2 << 6) | dt)
+        anchors.append(times[:-offset][valid].astype(np.int32))
+
+    if not hashes:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int32)
+    return np.concatenate(hashes), np.concatenate(anchors)
+
+
+def fingerprint_file(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fingerprint an audio file.
+
+    Args:
+        path: Audio file path
+
+    Returns:
+        Tuple of (hashes, anchor frame indices)
+    """
+    spec = spectrogram(decode_audio(path))
+    return hash_peaks(*find_peaks(spec))
+
+
+def analyze_file(path: str) -> Tuple[np.ndarray, np.ndarray, Optional[Dict[str, float]]]:
+    """
+    Fingerprint an audio file and measure its loudness from one decode.
+
+    Args:
+        path: Audio file path
+
+    Returns:
+        Tuple of (hashes, anchor frame indices, loudness measurement or None)
+    """
+    samples, loudness = decode_audio_with_loudness(path)
+    hashes, times = hash_peaks(*find_peaks(spectrogram(samples)))
+    return hashes, times, loudness
+
+
+class SoundFingerprintIndex:
+    """Inverted fingerprint index for a niche's TikTok-Sounds folder."""
+
+    def __init__(self, sounds_folder: str):
+        """
+        Initialize the index and load it from disk if present.
+
+        Args:
+            sounds_folder: Path to the TikTok-Sounds folder
+        """
+        self.sounds_folder = sounds_folder
+        self.index_path = os.path.join(sounds_folder, INDEX_FILENAME)
+        self.tracks: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.signatures: Dict[str, Tuple[int, int]] = {}
+        self.loudness: Dict[str, Dict[str, float]] = {}
+        # Sounds whose loudness could not be measured (silent or undecodable),
+        # with the file signature they were tried at, so they are not retried
+        self.unmeasured: Dict[str, Tuple[int, int]] = {}
+        self.inverted: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        # Guards get_loudness() updates from parallel generation workers
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the index file, ignoring it if it is missing or unreadable."""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with np.load(self.index_path) as data:
+                names = [str(name) for name in data['names']]
+                offsets = data['offsets']
+                hashes = data['hashes']
+                times = data['times']
+                signatures = data['signatures']
+                # Indexes written before loudness was measured have no loudness array
+                loudness = data['loudness'] if 'loudness' in data.files else None
+                unmeasured_names = data['unmeasured_names'] if 'unmeasured_names' in data.files else []
+                unmeasured_signatures = data['unmeasured_signatures'] if 'unmeasured_names' in data.files else []
+        except Exception:
+            return
+
+        for name, signature in zip(unmeasured_names, unmeasured_signatures):
+            self.unmeasured[str(name)] = (int(signature[0]), int(signature[1]))
+
+        for i, name in enumerate(names):
+            start, end = offsets[i], offsets[i + 1]
+            self._insert(name, hashes[start:end], times[start:end])
+            self.signatures[name] = (int(signatures[i][0]), int(signatures[i][1]))
+            if loudness is not None and not np.isnan(loudness[i]).any():
+                self.loudness[name] = dict(zip(LOUDNESS_KEYS, loudness[i].tolist()))
+
+    def save(self) -> None:
+        """Write the index to disk."""
+        names = sorted(self.tracks)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        for i, name in enumerate(names):
+            offsets[i + 1] = offsets[i] + len(self.tracks[name][0])
+        hashes = [self.tracks[name][0] for name in names]
+        times = [self.tracks[name][1] for name in names]
+
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                names=np.array(names, dtype=str),
+                offsets=offsets,
+                hashes=np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint32),
+                times=np.concatenate(times) if times else np.empty(0, dtype=np.int32),
+                signatures=np.array([self.signatures[n] for n in names], dtype=np.int64).reshape(-1, 2),
+                loudness=np.array(
+                    [[self.loudness[n][k] for k in LOUDNESS_KEYS] if n in self.loudness
+                     else [np.nan] * len(LOUDNESS_KEYS) for n in names],
+                    dtype=np.float64
+                ).reshape(-1, len(LOUDNESS_KEYS)),
+                unmeasured_names=np.array(sorted(self.unmeasured), dtype=str),
+                unmeasured_signatures=np.array(
+                    [self.unmeasured[n] for n in sorted(self.unmeasured)], dtype=np.int64
+                ).reshape(-1, 2),
+            )
+        os.replace(tmp_path, self.index_path)
+
+    def _insert(self, name: str, hashes: np.ndarray, times: np.ndarray) -> None:
+        self.tracks[name] = (hashes, times)
+        for h, t in zip(hashes.tolist(), times.tolist()):
+            self.inverted[h].append((name, t))
+
+    def add(
+        self,
+        name: str,
+        hashes: np.ndarray,
+        times: np.ndarray,
+        loudness: Optional[Dict[str, float]] = None
+    ) -> None:
+        """
+        Add or replace a track in the index.
+
+        Args:
+            name: File name inside the sounds folder
+            hashes: Fingerprint hashes
+            times: Anchor frame indices
+            loudness: Loudness measurement from analyze_file()
+        """
+        if name in self.tracks:
+            self.remove(name)
+        self._insert(name, hashes, times)
+        self.signatures[name] = self._file_signature(name)
+        if loudness:
+            self.loudness[name] = loudness
+            self.unmeasured.pop(name, None)
+        else:
+            self.unmeasured[name] = self.signatures[name]
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a track from the index.
+
+        Args:
+            name: File name inside the sounds folder
+        """
+        if name not in self.tracks:
+            return
+        hashes, _ = self.tracks.pop(name)
+        self.signatures.pop(name, None)
+        self.loudness.pop(name, None)
+        self.unmeasured.pop(name, None)
+        for h in set(hashes.tolist()):
+            postings = [p for p in self.inverted.get(h, []) if p[0] != name]
+            if postings:
+                self.inverted[h] = postings
+            else:
+                self.inverted.pop(h, None)
+
+    def match(
+        self,
+        hashes: np.ndarray,
+        times: np.ndarray,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Match a fingerprint against the index.
+
+        Candidates are scored by the largest number of hashes that agree on
+        a single time offset, which is robust to trimmed or shifted copies.
+
+        Args:
+            hashes: Query hashes
+            times: Query anchor frame indices
+            exclude: Track name to ignore (used for library-wide scans)
+
+        Returns:
+            List of (name, score, ratio) sorted by score, best first
+        """
+        names: List[str] = []
+        offsets: List[int] = []
+        for h, t in zip(hashes.tolist(), times.tolist()):
+            for name, db_time in self.inverted.get(h, ()):
+                if name != exclude:
+                    names.append(name)
+                    offsets.append(db_time - t)
+        if not names:
+            return []
+
+        unique_names, name_ids = np.unique(np.array(names), return_inverse=True)
+        offsets_arr = np.array(offsets, dtype=np.int64)
+        offsets_arr -= offsets_arr.min()
+        keys = name_ids.astype(np.int64) * (int(offsets_arr.max()) + 1) + offsets_arr
+        key_values, counts = np.unique(keys, return_counts=True)
+        best = np.zeros(len(unique_names), dtype=np.int64)
+        np.maximum.at(best, key_values // (int(offsets_arr.max()) + 1), counts)
+
+        results = []
+        for i, name in enumerate(unique_names.tolist()):
+            score = int(best[i])
+            smaller = max(1, min(len(hashes), len(self.tracks[name][0])))
+            results.append((name, score, score / smaller))
+        results.sort(key=lambda r: r[1], reverse=True)
+        return results
+
+    def find_duplicate(
+        self,
+        hashes: np.ndarray,
+        times: np.ndarray,
+        exclude: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Return the name of an indexed duplicate of the given fingerprint.
+
+        Args:
+            hashes: Query hashes
+            times: Query anchor frame indices
+            exclude: Track name to ignore
+
+        Returns:
+            Matching track name or None
+        """
+        for name, score, ratio in self.match(hashes, times, exclude=exclude):
+            if score >= MIN_MATCH_HASHES and ratio >= DUPLICATE_RATIO:
+                return name
+        return None
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        Bring the index up to date with the sounds folder.
+
+        Only new or modified files (and files never measured for loudness)
+        are analysed.
+
+        Returns:
+            Tuple of (files indexed, files removed)
+        """
+        if not os.path.exists(self.sounds_folder):
+            return 0, 0
+
+        present = {
+            f for f in os.listdir(self.sounds_folder)
+            if f.lower().endswith(AUDIO_EXTENSIONS)
+        }
+        removed = [name for name in self.tracks if name not in present]
+        for name in removed:
+            self.remove(name)
+        stale = [name for name in self.unmeasured if name not in present]
+        for name in stale:
+            self.unmeasured.pop(name)
+
+        indexed = 0
+        failed = 0
+        for name in sorted(present):
+            if self._is_current(name):
+                continue
+            try:
+                hashes, times, loudness = analyze_file(os.path.join(self.sounds_folder, name))
+            except Exception:
+                self.unmeasured[name] = self._file_signature(name)
+                failed += 1
+                continue
+            self.add(name, hashes, times, loudness)
+            indexed += 1
+
+        if indexed or removed or stale or failed:
+            self.save()
+        return indexed, len(removed)
+
+    def get_loudness(self, name: str) -> Optional[Dict[str, float]]:
+        """
+        Get the loudness measurement of a sound, analysing it if it is missing or stale.
+
+        Safe to call from parallel workers: the analysis runs outside the
+        index lock, which is held only to read, update and save the index.
+
+        Args:
+            name: File name inside the sounds folder
+
+        Returns:
+            Loudness measurement, or None if it could not be measured
+        """
+        with self._lock:
+            if self._is_current(name):
+                return self.loudness.get(name)
+        try:
+            hashes, times, loudness = analyze_file(os.path.join(self.sounds_folder, name))
+        except Exception:
+            hashes = None
+            loudness = None
+        with self._lock:
+            if hashes is None:
+                self.unmeasured[name] = self._file_signature(name)
+            else:
+                self.add(name, hashes, times, loudness)
+            self.save()
+        return loudness
+
+    def _is_current(self, name: str) -> bool:
+        """Whether a sound was analysed at its current file signature (with or without loudness)."""
+        signature = self._file_signature(name)
+        if self.unmeasured.get(name) == signature:
+            return True
+        return self.signatures.get(name) == signature and name in self.loudness
+
+    def find_duplicate_groups(self) -> List[List[str]]:
+        """
+        Group duplicate or near-identical sounds across the whole library.
+
+        Returns:
+            List of groups (each with two or more file names)
+        """
+        parent = {name: name for name in self.tracks}
+
+        def root(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for name, (hashes, times) in self.tracks.items():
+            for other, score, ratio in self.match(hashes, times, exclude=name):
+                if score >= MIN_MATCH_HASHES and ratio >= DUPLICATE_RATIO:
+                    parent[root(other)] = root(name)
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for name in self.tracks:
+            groups[root(name)].append(name)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
+
+    def _file_signature(self, name: str) -> Tuple[int, int]:
+        path = os.path.join(self.sounds_folder, name)
+        try:
+            stat = os.stat(path)
+            return int(stat.st_mtime), stat.st_size
+        except OSError:
+            return 0, 0
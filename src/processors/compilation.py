@@ -0,0 +1,241 @@
+"""
+Compilations of existing Meme-Final outputs.
+
+Outputs share one set of encoding parameters (see ffmpeg_encoder), so the
+last N of them can be joined with ffmpeg's concat demuxer and stream copy,
+without re-encoding. Outputs that do not match (older renders, mono sounds)
+are normalized once into .cache/normalized and reused afterwards, so a
+50-clip compilation takes seconds. Clips that do need normalizing are
+re-encoded in parallel.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from src.processors.ffmpeg_encoder import (
+    OUTPUT_AUDIO_CHANNELS, OUTPUT_AUDIO_RATE, OUTPUT_FPS, OUTPUT_PIX_FMT,
+    OUTPUT_PRESET, OUTPUT_SIZE, OUTPUT_TIMESCALE, concat_copy, output_args, run_ffmpeg
+)
+from src.utils.encode_slots import encode_slot
+from src.utils.ffmpeg import get_ffmpeg_binary
+from src.utils.resources import get_resource_manager, run_process
+from src.utils.scratch import discard, move_into_place, scratch_path
+
+
+OUTPUT_FOLDER = 'Meme-Final'
+COMPILATIONS_FOLDER = 'Compilations'
+NORMALIZED_FOLDER = os.path.join('.cache', 'normalized')
+NORMALIZE_CRF = '23'
+
+_VIDEO_STREAM = re.compile(
+    r'Stream #0:\d+.*?: Video: (?P<codec>\w+)(?: \((?P<profile>[^)]*)\))?.*?, '
+    r'(?P<pix_fmt>[a-z0-9]+)(?:\([^)]*\))?, (?P<width>\d+)x(?P<height>\d+)'
+    r'(?:.*?, (?P<fps>[\d.]+) fps)?(?:.*?, (?P<tbn>[\d.]+k?) tbn)?'
+)
+_AUDIO_STREAM = re.compile(
+    r'Stream #0:\d+.*?: Audio: (?P<codec>\w+).*?, (?P<rate>\d+) Hz, (?P<layout>[\w.()]+)'
+)
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """Encoding parameters of a video file that matter for stream copy."""
+
+    video_codec: str
+    video_profile: str
+    pix_fmt: str
+    width: int
+    height: int
+    fps: str
+    timescale: str
+    audio_codec: Optional[str]
+    audio_rate: Optional[str]
+    audio_layout: Optional[str]
+
+
+def probe(path: str) -> Optional[StreamInfo]:
+    """
+    Read the stream parameters of a video with ffmpeg.
+
+    Args:
+        path: Video path
+
+    Returns:
+        StreamInfo, or None if no video stream was found
+    """
+    _, _, stderr = run_process([get_ffmpeg_binary(), '-hide_banner', '-i', path])
+    output = stderr.decode('utf-8', errors='replace')
+    video = _VIDEO_STREAM.search(output)
+    if not video:
+        return None
+    audio = _AUDIO_STREAM.search(output)
+    return StreamInfo(
+        video_codec=video.group('codec'),
+        video_profile=video.group('profile') or '',
+        pix_fmt=video.group('pix_fmt'),
+        width=int(video.group('width')),
+        height=int(video.group('height')),
+        fps=video.group('fps') or '',
+        timescale=video.group('tbn') or '',
+        audio_codec=audio.group('codec') if audio else None,
+        audio_rate=audio.group('rate') if audio else None,
+        audio_layout=audio.group('layout') if audio else None
+    )
+
+
+def is_uniform(info: Optional[StreamInfo], reference: Optional[StreamInfo] = None) -> bool:
+    """
+    Check whether a file matches the uniform output parameters.
+
+    Args:
+        info: Parameters of the file
+        reference: Parameters of the first clip; its x264 profile must match too
+
+    Returns:
+        True if the file can be stream-copied into a compilation
+    """
+    if info is None:
+        return False
+    uniform = (
+        info.video_codec == 'h264'
+        and info.pix_fmt == OUTPUT_PIX_FMT
+        and (info.width, info.height) == OUTPUT_SIZE
+        and info.fps == str(OUTPUT_FPS)
+        and info.timescale == OUTPUT_TIMESCALE
+        and info.audio_codec == 'aac'
+        and info.audio_rate == OUTPUT_AUDIO_RATE
+        and info.audio_layout == ('stereo' if OUTPUT_AUDIO_CHANNELS == '2' else 'mono')
+    )
+    if uniform and reference is not None:
+        uniform = info.video_profile == reference.video_profile
+    return uniform
+
+
+def normalize(path: str, output_path: str, has_audio: bool = True) -> None:
+    """
+    Re-encode a video to the uniform output parameters.
+
+    Args:
+        path: Source video
+        output_path: Normalized video path
+        has_audio: Whether the source has an audio stream
+    """
+    width, height = OUTPUT_SIZE
+    video_filter = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={OUTPUT_FPS}"
+    )
+    if has_audio:
+        inputs = ['-i', path, '-map', '0:v:0', '-map', '0:a:0']
+    else:
+        # Clips without sound get a silent track so every clip has the same streams
+        inputs = ['-i', path, '-f', 'lavfi', '-i', f"anullsrc=r={OUTPUT_AUDIO_RATE}:cl=stereo",
+                  '-map', '0:v:0', '-map', '1:a:0', '-shortest']
+
+    work_path = scratch_path(os.path.basename(output_path))
+    try:
+        run_ffmpeg(inputs + ['-vf', video_filter] + output_args(OUTPUT_PRESET, NORMALIZE_CRF) + [work_path])
+        move_into_place(work_path, output_path)
+    finally:
+        discard(work_path)
+
+
+def latest_outputs(niche_path: str, count: int) -> List[str]:
+    """
+    Get the last N Meme-Final outputs in publishing order.
+
+    Args:
+        niche_path: Path to niche directory
+        count: Number of outputs
+
+    Returns:
+        Output paths, oldest first
+    """
+    folder = os.path.join(niche_path, OUTPUT_FOLDER)
+    if not os.path.exists(folder):
+        return []
+    names = sorted(f for f in os.listdir(folder) if f.endswith('.mp4') and not f.startswith('.'))
+    return [os.path.join(folder, name) for name in names[-count:]]
+
+
+def build_compilation(
+    niche_path: str,
+    count: int,
+    output_path: Optional[str] = None,
+    on_progress: Optional[Callable[[str], None]] = None
+) -> str:
+    """
+    Join the last N outputs into one video with the concat demuxer.
+
+    Args:
+        niche_path: Path to niche directory
+        count: Number of outputs to include
+        output_path: Output path (next compilation_NNNN.mp4 in Compilations if None)
+        on_progress: Called with a short message for each step
+
+    Returns:
+        Path of the compilation
+    """
+    clips = latest_outputs(niche_path, count)
+    if not clips:
+        raise ValueError("No outputs to compile in Meme-Final")
+
+    report = on_progress or (lambda message: None)
+    normalized_folder = os.path.join(niche_path, NORMALIZED_FOLDER)
+
+    parts = []
+    pending = []
+    reference = None
+    for clip in clips:
+        info = probe(clip)
+        if is_uniform(info, reference):
+            reference = reference or info
+            parts.append(clip)
+            continue
+
+        stat = os.stat(clip)
+        normalized = os.path.join(
+            normalized_folder, f"{os.path.splitext(os.path.basename(clip))[0]}_{int(stat.st_mtime)}.mp4"
+        )
+        if not os.path.exists(normalized):
+            pending.append((clip, normalized, bool(info and info.audio_codec)))
+        parts.append(normalized)
+
+    if pending:
+        os.makedirs(normalized_folder, exist_ok=True)
+        # x264 threads well within a clip, so run a few encoders rather than one per core
+        workers = max(1, min(len(pending), (os.cpu_count() or 1) // 2))
+        scope = get_resource_manager().current()
+
+        def normalize_in_scope(clip, normalized, has_audio):
+            with get_resource_manager().bind(scope):
+                normalize(clip, normalized, has_audio)
+
+        # Normalizing is a full encode, so it takes a machine-wide slot like generation
+        with encode_slot(lambda position: report(f"Waiting for an encode slot (position {position})")), \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for clip, normalized, has_audio in pending:
+                report(f"Normalizing {os.path.basename(clip)}")
+                futures.append(pool.submit(normalize_in_scope, clip, normalized, has_audio))
+            for future in futures:
+                future.result()
+
+    if output_path is None:
+        folder = os.path.join(niche_path, COMPILATIONS_FOLDER)
+        os.makedirs(folder, exist_ok=True)
+        existing = [int(m.group(1)) for m in
+                    (re.match(r'compilation_(\d+)\.mp4$', f) for f in os.listdir(folder)) if m]
+        output_path = os.path.join(folder, f"compilation_{max(existing, default=0) + 1:04d}.mp4")
+
+    report(f"Joining {len(parts)} clips")
+    work_path = scratch_path(os.path.basename(output_path))
+    try:
+        concat_copy(parts, work_path)
+        move_into_place(work_path, output_path)
+    finally:
+        discard(work_path)
+    return output_path
@@ -0,0 +1,181 @@
+"""
+Contact sheet of planned memes.
+
+Lays out the next N planned memes (image, quote and part number) as one
+image so bad pairings can be rejected before any video is encoded. Tiles are
+rendered by the shared render core at thumbnail scale from downscaled
+derivatives and copied straight into one sheet array, so a sheet of 100
+candidates takes seconds.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.processors.derivatives import DerivativeCache
+from src.processors.render_core import MemeRenderer
+from src.processors.render_plan import compile_render_plan, load_font, resolve_font_path
+
+
+TILE_SCALE = 0.2  # 216x384 tiles
+TILE_GAP = 8
+LABEL_SIZE = 18
+SHEET_BACKGROUND = (32, 32, 32)
+
+
+def sheet_grid(count: int, columns: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Work out the grid for a number of tiles.
+
+    Args:
+        count: Number of tiles
+        columns: Fixed number of columns (roughly square sheet if None)
+
+    Returns:
+        Tuple of (columns, rows)
+    """
+    if count <= 0:
+        return 0, 0
+    if not columns:
+        columns = min(10, max(1, math.ceil(math.sqrt(count * 16 / 9))))
+    return columns, math.ceil(count / columns)
+
+
+def tile_origin(index: int, columns: int, tile_size: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Get the top-left corner of a tile on the sheet.
+
+    Args:
+        index: Tile index
+        columns: Number of columns
+        tile_size: (width, height) of a tile
+
+    Returns:
+        (x, y) position on the sheet
+    """
+    row, column = divmod(index, columns)
+    return (TILE_GAP + column * (tile_size[0] + TILE_GAP),
+            TILE_GAP + row * (tile_size[1] + TILE_GAP))
+
+
+def render_contact_sheet(
+    niche_path: str,
+    candidates: Sequence[Dict[str, Any]],
+    video_settings: Optional[Dict[str, Any]] = None,
+    columns: Optional[int] = None,
+    scale: float = TILE_SCALE,
+    rejected: Sequence[int] = (),
+    labels: bool = True
+) -> Tuple[Image.Image, int, Tuple[int, int]]:
+    """
+    Render candidate memes as one contact sheet.
+
+    Args:
+        niche_path: Path to niche directory (holds the derivative cache)
+        candidates: Selections with 'image', 'quote', 'part_number' and optional 'crop' keys
+        video_settings: Video settings of the batch
+        columns: Fixed number of columns (roughly square sheet if None)
+        scale: Tile scale relative to 1080x1920
+        rejected: Indexes of candidates to mark as rejected
+        labels: Number the tiles (callers that redraw labels pass False)
+
+    Returns:
+        Tuple of (sheet image, columns, tile size)
+    """
+    derivatives = DerivativeCache(niche_path)
+    renderer = MemeRenderer(compile_render_plan(video_settings, scale=scale), derivatives)
+    tile_size = (renderer.width, renderer.height)
+    columns, rows = sheet_grid(len(candidates), columns)
+    sheet = np.empty((TILE_GAP + rows * (tile_size[1] + TILE_GAP),
+                      TILE_GAP + max(columns, 1) * (tile_size[0] + TILE_GAP), 3), dtype=np.uint8)
+    sheet[:, :] = SHEET_BACKGROUND
+
+    max_size = renderer.plan.image_max_size
+    for index, candidate in enumerate(candidates):
+        try:
+            image = derivatives.get(candidate['image'], max_size)
+        except OSError:
+            continue
+        tile = renderer.render_array(image, candidate['quote'], part_number=candidate.get('part_number'),
+                                     crop=candidate.get('crop'))
+        x, y = tile_origin(index, columns, tile_size)
+        sheet[y:y + tile_size[1], x:x + tile_size[0]] = tile
+
+    sheet_image = Image.fromarray(sheet)
+    if labels:
+        draw_labels(sheet_image, len(candidates), columns, tile_size, rejected)
+    return sheet_image, columns, tile_size
+
+
+def draw_labels(
+    sheet: Image.Image,
+    count: int,
+    columns: int,
+    tile_size: Tuple[int, int],
+    rejected: Sequence[int] = ()
+) -> None:
+    """
+    Number the tiles and cross out rejected ones.
+
+    Args:
+        sheet: Contact sheet image (modified in place)
+        count: Number of tiles
+        columns: Number of columns
+        tile_size: (width, height) of a tile
+        rejected: Indexes of rejected tiles
+    """
+    font = load_font(resolve_font_path('Arial'), LABEL_SIZE)
+    draw = ImageDraw.Draw(sheet)
+    rejected = set(rejected)
+    for index in range(count):
+        x, y = tile_origin(index, columns, tile_size)
+        label = f"#{index + 1}"
+        right, bottom = draw.textbbox((x + 6, y + 4), label, font=font)[2:]
+        draw.rectangle((x, y, right + 6, bottom + 4), fill=(0, 0, 0))
+        draw.text((x + 6, y + 4), label, font=font, fill=(255, 255, 255))
+        if index in rejected:
+            x1, y1 = x + tile_size[0] - 1, y + tile_size[1] - 1
+            draw.rectangle((x, y, x1, y1), outline=(220, 40, 40), width=4)
+            draw.line((x, y, x1, y1), fill=(220, 40, 40), width=4)
+            draw.line((x, y1, x1, y), fill=(220, 40, 40), width=4)
+
+
+def tile_at(position: Tuple[int, int], count: int, columns: int, tile_size: Tuple[int, int]) -> Optional[int]:
+    """
+    Find the tile under a point on the sheet.
+
+    Args:
+        position: (x, y) in sheet pixels
+        count: Number of tiles
+        columns: Number of columns
+        tile_size: (width, height) of a tile
+
+    Returns:
+        Tile index, or None if the point is in a gap or past the last tile
+    """
+    x, y = position[0] - TILE_GAP, position[1] - TILE_GAP
+    if x < 0 or y < 0 or columns <= 0:
+        return None
+    column, x_in = divmod(x, tile_size[0] + TILE_GAP)
+    row, y_in = divmod(y, tile_size[1] + TILE_GAP)
+    if column >= columns or x_in >= tile_size[0] or y_in >= tile_size[1]:
+        return None
+    index = int(row * columns + column)
+    return index if index < count else None
+
+
+def approved(candidates: Sequence[Dict[str, Any]], rejected: Sequence[int]) -> List[Dict[str, Any]]:
+    """
+    Drop rejected candidates.
+
+    Args:
+        candidates: Planned selections
+        rejected: Indexes of rejected candidates
+
+    Returns:
+        Approved selections, in order
+    """
+    rejected = set(rejected)
+    return [candidate for index, candidate in enumerate(candidates) if index not in rejected]
@@ -0,0 +1,125 @@
+"""
+Cover images and preview thumbnails for generated videos.
+
+Covers are cut from the composited meme frame while it is still in memory,
+in the same pass that encodes the video, so neither the uploaders nor the
+GUI ever have to decode an MP4 to get a still. They can be staged in the
+scratch directory for the output mover instead of written in place.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from src.processors.derivatives import make_blurred
+from src.utils.scratch import scratch_path
+
+
+COVERS_FOLDER = 'Meme-Covers'
+THUMBS_FOLDER = os.path.join('.cache', 'thumbs')
+
+# Platform cover sizes: TikTok uses the portrait frame, YouTube a 16:9 thumbnail
+COVER_SIZES: Dict[str, Tuple[int, int]] = {
+    'tiktok': (1080, 1920),
+    'youtube': (1280, 720),
+}
+# Matches the GUI preview strip cells
+THUMB_SIZE = (160, 284)
+COVER_QUALITY = 90
+THUMB_QUALITY = 80
+
+
+def cover_path(niche_path: str, base_name: str, platform: str) -> str:
+    """
+    Get the cover image path of a video for a platform.
+
+    Args:
+        niche_path: Path to niche directory
+        base_name: Video file name without extension (e.g. meme_0001)
+        platform: Key of COVER_SIZES
+
+    Returns:
+        Path of the cover JPEG
+    """
+    return os.path.join(niche_path, COVERS_FOLDER, f"{base_name}_{platform}.jpg")
+
+
+def thumbnail_path(niche_path: str, base_name: str) -> str:
+    """
+    Get the preview thumbnail path of a video.
+
+    Args:
+        niche_path: Path to niche directory
+        base_name: Video file name without extension
+
+    Returns:
+        Path of the thumbnail JPEG
+    """
+    return os.path.join(niche_path, THUMBS_FOLDER, f"{base_name}.jpg")
+
+
+def fit_cover(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    Fit a frame into a cover size, filling any margin with a blurred copy.
+
+    Args:
+        image: Composited frame
+        size: Cover (width, height)
+
+    Returns:
+        RGB image of exactly the cover size
+    """
+    if image.size == size:
+        return image
+    if abs(image.width / image.height - size[0] / size[1]) < 0.01:
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    cover = make_blurred(image, (max(1, size[0] // 8), max(1, size[1] // 8)))
+    cover = cover.resize(size, Image.Resampling.BILINEAR)
+    fitted = ImageOps.contain(image, size, Image.Resampling.LANCZOS)
+    cover.paste(fitted, ((size[0] - fitted.width) // 2, (size[1] - fitted.height) // 2))
+    return cover
+
+
+def export_covers(frame: np.ndarray, niche_path: str, base_name: str,
+                  platforms: Optional[Tuple[str, ...]] = None,
+                  stage: bool = False) -> List[Tuple[str, str]]:
+    """
+    Write the platform covers and the preview thumbnail of a video.
+
+    Args:
+        frame: (height, width, 3) uint8 composited frame
+        niche_path: Path to niche directory
+        base_name: Video file name without extension
+        platforms: Keys of COVER_SIZES to export (all if None)
+        stage: Write into the scratch directory instead of the niche
+
+    Returns:
+        List of (written path, destination path); the paths are equal
+        unless staged
+    """
+    # The frame buffer is reused by the renderer, so copy it into the image once
+    image = Image.fromarray(np.ascontiguousarray(frame), 'RGB')
+    written = []
+
+    def target(destination):
+        if stage:
+            return scratch_path(os.path.basename(destination))
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        return destination
+
+    for platform in platforms or tuple(COVER_SIZES):
+        destination = cover_path(niche_path, base_name, platform)
+        path = target(destination)
+        fit_cover(image, COVER_SIZES[platform]).save(path, 'JPEG', quality=COVER_QUALITY)
+        written.append((path, destination))
+
+    destination = thumbnail_path(niche_path, base_name)
+    path = target(destination)
+    thumb = image.copy()
+    thumb.thumbnail(THUMB_SIZE, Image.Resampling.BILINEAR)
+    ImageOps.pad(thumb, THUMB_SIZE, color='black').save(path, 'JPEG', quality=THUMB_QUALITY)
+    written.append((path, destination))
+    return written
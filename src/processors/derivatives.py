@@ -0,0 +1,168 @@
+"""
+Downscaled derivatives of niche source images.
+
+Previews such as the contact sheet only need small copies of the source
+images. Decoding a full-resolution photo for every thumbnail dominates their
+cost, so each image is downscaled once and stored under the niche's
+.cache/derivatives folder, keyed by source path, modification time and size.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+
+CACHE_FOLDER = os.path.join('.cache', 'derivatives')
+MEMORY_CACHE_SIZE = 256
+DERIVATIVE_QUALITY = 90
+
+# Blurred backgrounds are blurred at this size and scaled up to the frame
+BLUR_SIZE = (90, 160)
+BLUR_RADIUS = 3
+BLUR_BRIGHTNESS = 0.7
+
+
+def make_blurred(image: Image.Image, size: Tuple[int, int] = BLUR_SIZE) -> Image.Image:
+    """
+    Make a small blurred, dimmed copy of an image that covers a frame shape.
+
+    Blurring at this size and scaling up afterwards looks the same as a large
+    radius blur at full resolution for a fraction of the cost.
+
+    Args:
+        image: Source image (any size)
+        size: Size of the blurred copy, with the frame's aspect ratio
+
+    Returns:
+        Small RGB image
+    """
+    small = ImageOps.fit(image.convert('RGB'), size, Image.Resampling.BILINEAR)
+    small = small.filter(ImageFilter.GaussianBlur(BLUR_RADIUS))
+    return ImageEnhance.Brightness(small).enhance(BLUR_BRIGHTNESS)
+
+
+class DerivativeCache:
+    """Disk and memory cache of downscaled source images for one niche."""
+
+    def __init__(self, niche_path: str, memory_size: int = MEMORY_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            niche_path: Path to niche directory
+            memory_size: Number of derivatives kept decoded in memory
+        """
+        self.niche_path = niche_path
+        self.folder = os.path.join(niche_path, CACHE_FOLDER)
+        self.memory_size = memory_size
+        self._images: 'OrderedDict[Tuple, Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _derivative_path(self, source: str, mtime: float, max_size: Tuple[int, int], suffix: str) -> str:
+        key = f"{os.path.abspath(source)}|{mtime}|{max_size[0]}x{max_size[1]}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.folder, f"{digest}{suffix}.jpg")
+
+    def _remember(self, key: Tuple, image: Image.Image) -> Image.Image:
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.memory_size:
+                self._images.popitem(last=False)
+        return image
+
+    def get(self, source: str, max_size: Tuple[int, int]) -> Image.Image:
+        """
+        Get a copy of an image that fits within max_size.
+
+        Args:
+            source: Source image path
+            max_size: Maximum (width, height) of the derivative
+
+        Returns:
+            RGB PIL image (shared; do not modify)
+        """
+        mtime = os.stat(source).st_mtime
+        key = (source, mtime, max_size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+
+        path = self._derivative_path(source, mtime, max_size, '')
+        if os.path.exists(path):
+            try:
+                with Image.open(path) as cached:
+                    return self._remember(key, cached.convert('RGB'))
+            except OSError:
+                pass
+
+        with Image.open(source) as original:
+            # JPEG draft mode decodes at 1/2, 1/4 or 1/8 scale directly
+            original.draft('RGB', max_size)
+            image = original.convert('RGB')
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        self.store(path, image)
+        return self._remember(key, image)
+
+    def blurred(self, source: str, size: Tuple[int, int] = BLUR_SIZE) -> Image.Image:
+        """
+        Get the small blurred background of an image.
+
+        Args:
+            source: Source image path
+            size: Size of the blurred copy
+
+        Returns:
+            Small RGB image (shared; do not modify)
+        """
+        mtime = os.stat(source).st_mtime
+        key = ('blur', source, mtime, size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+
+        path = self._derivative_path(source, mtime, size, '_blur')
+        if os.path.exists(path):
+            try:
+                with Image.open(path) as cached:
+                    return self._remember(key, cached.convert('RGB'))
+            except OSError:
+                pass
+
+        with Image.open(source) as original:
+            original.draft('RGB', (size[0] * 4, size[1] * 4))
+            image = make_blurred(original, size)
+
+        self.store(path, image)
+        return self._remember(key, image)
+
+    def store(self, path: str, image: Image.Image) -> None:
+        """
+        Write a derivative atomically.
+
+        Args:
+            path: Derivative path inside the cache folder
+            image: Image to store
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp_path, 'JPEG', quality=DERIVATIVE_QUALITY)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self) -> None:
+        """Drop the in-memory derivatives (files on disk are kept)."""
+        with self._lock:
+            self._images.clear()
@@ -0,0 +1,142 @@
+"""
+Lookup-table fades for MoviePy clips.
+
+MoviePy's FadeIn/FadeOut build a new float image per frame and multiply the
+whole 1080x1920x3 frame. These effects precompute one 256-entry uint8 lookup
+table per fade step and write each faded frame into a reused output buffer,
+so a fading frame is a single np.take with no temporary arrays.
+
+The returned frame buffer is reused by the next frame. That is safe for
+clips that are written out frame by frame (write_videofile), which is how
+the generator uses them.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+from moviepy.Effect import Effect
+
+
+FADE_STEPS = 256
+
+
+def build_fade_luts(color: Sequence[int] = (0, 0, 0), steps: int = FADE_STEPS) -> np.ndarray:
+    """
+    Build fade lookup tables.
+
+    Row k maps a pixel value v to v * k / (steps - 1) + color * (1 - k / (steps - 1)).
+
+    Args:
+        color: RGB colour faded from/to
+        steps: Number of fade steps
+
+    Returns:
+        (steps, channels, 256) uint8 array; channels is 1 for grey colours
+    """
+    color = np.asarray(color, dtype=np.float32).reshape(-1)
+    if np.all(color == color[0]):
+        color = color[:1]
+    weights = np.linspace(0.0, 1.0, steps, dtype=np.float32)[:, None, None]
+    values = np.arange(256, dtype=np.float32)[None, None, :]
+    luts = values * weights + color[None, :, None] * (1.0 - weights)
+    return np.clip(np.rint(luts), 0, 255).astype(np.uint8)
+
+
+class _LutFade:
+    """Shared frame filter for the LUT fade effects."""
+
+    def __init__(self, color: Sequence[int]):
+        self.luts = build_fade_luts(color)
+        self.buffer: Optional[np.ndarray] = None
+        self.plane: Optional[np.ndarray] = None
+
+    def apply_level(self, frame: np.ndarray, level: float) -> np.ndarray:
+        """
+        Fade a frame.
+
+        Args:
+            frame: uint8 frame
+            level: 0.0 (fully faded) to 1.0 (original)
+
+        Returns:
+            Faded frame in the reused buffer
+        """
+        step = int(round(min(1.0, max(0.0, level)) * (FADE_STEPS - 1)))
+        if step == FADE_STEPS - 1:
+            return frame
+
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        if self.buffer is None or self.buffer.shape != frame.shape:
+            self.buffer = np.empty(frame.shape, dtype=np.uint8)
+
+        # mode='clip' lets np.take write into out directly (mode='raise' always
+        # buffers it); uint8 indices are always inside the 256-entry tables
+        lut = self.luts[step]
+        if lut.shape[0] == 1 or frame.ndim == 2:
+            np.take(lut[0], frame, out=self.buffer, mode='clip')
+        else:
+            # take() only writes straight into C-contiguous outputs, so each
+            # channel goes through a reused plane instead of a strided view
+            if self.plane is None or self.plane.shape != frame.shape[:2]:
+                self.plane = np.empty(frame.shape[:2], dtype=np.uint8)
+            for channel in range(frame.shape[2]):
+                np.take(lut[channel], frame[..., channel], out=self.plane, mode='clip')
+                self.buffer[..., channel] = self.plane
+        return self.buffer
+
+
+@dataclass
+class LutFadeIn(Effect):
+    """
+    Fade in from a colour using lookup tables.
+
+    Args:
+        duration: Duration of the fade in seconds
+        initial_color: RGB colour to fade from (black by default)
+    """
+
+    duration: float
+    initial_color: list = None
+
+    def apply(self, clip):
+        """Apply the effect to the clip."""
+        fade = _LutFade(self.initial_color or [0, 0, 0])
+
+        def filter(get_frame, t):
+            frame = get_frame(t)
+            if t >= self.duration:
+                return frame
+            return fade.apply_level(frame, t / self.duration)
+
+        return clip.transform(filter)
+
+
+@dataclass
+class LutFadeOut(Effect):
+    """
+    Fade out to a colour using lookup tables.
+
+    Args:
+        duration: Duration of the fade in seconds
+        final_color: RGB colour to fade to (black by default)
+    """
+
+    duration: float
+    final_color: list = None
+
+    def apply(self, clip):
+        """Apply the effect to the clip."""
+        if clip.duration is None:
+            raise ValueError("Attribute 'duration' not set")
+        fade = _LutFade(self.final_color or [0, 0, 0])
+
+        def filter(get_frame, t):
+            frame = get_frame(t)
+            remaining = clip.duration - t
+            if remaining >= self.duration:
+                return frame
+            return fade.apply_level(frame, remaining / self.duration)
+
+        return clip.transform(filter)
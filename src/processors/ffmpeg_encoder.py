@@ -0,0 +1,726 @@
+"""
+Direct FFmpeg encoding.
+
+Frames are piped to an ffmpeg process as raw RGB, one at a time, so memory
+stays flat however long the clip is. Clips that repeat (animated sources)
+are encoded once and looped by ffmpeg itself with -stream_loop while muxing
+the audio, instead of materializing every repeated frame. Slideshows are one
+ffmpeg run: still slides chained by xfade in a single filter graph.
+
+Fades, audio fades and loudness normalization are filters in the same
+graphs, so they cost next to nothing compared with per-frame Python work.
+Ken Burns motion on still memes is a zoompan filter over the single
+composited frame, so moving videos encode at close to still-image cost.
+Long stills are split into keyframe-aligned segments encoded by parallel
+ffmpeg processes and joined by stream copy.
+"""
+
+import math
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.ffmpeg import get_ffmpeg_binary
+from src.utils.progress import FfmpegProgress
+from src.utils.resources import get_resource_manager, run_process
+from src.utils.scratch import discard, scratch_path
+
+
+# Near-lossless settings for intermediates that are encoded again
+INTERMEDIATE_PRESET = 'ultrafast'
+INTERMEDIATE_CRF = '18'
+
+# Every Meme-Final output uses these parameters so outputs can be joined by
+# the concat demuxer without re-encoding
+OUTPUT_SIZE = (1080, 1920)
+OUTPUT_FPS = 24
+OUTPUT_PRESET = 'ultrafast'
+OUTPUT_PIX_FMT = 'yuv420p'
+OUTPUT_TIMESCALE = '12288'
+OUTPUT_AUDIO_RATE = '44100'
+OUTPUT_AUDIO_CHANNELS = '2'
+
+# Ken Burns motion kinds for still memes
+MOTIONS = ('none', 'zoom_in', 'zoom_out', 'pan_left', 'pan_right', 'pan_up', 'pan_down')
+# zoompan crops at whole input pixels; oversampling the single input frame
+# once keeps slow motion from stepping visibly
+MOTION_OVERSAMPLE = 2
+
+# Segment-parallel encoding of long outputs
+PARALLEL_MIN_DURATION = 60.0  # seconds; shorter outputs encode in one process
+MIN_SEGMENT_DURATION = 10.0  # seconds
+KEYFRAME_SECONDS = 2.0  # GOP length of segmented encodes; segments start on this grid
+
+_DURATION = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+
+def get_encoder_threads() -> int:
+    """
+    Get the x264 thread count of the current job's encodes.
+
+    The batch runner sets it per job (see ResourceScope.encoder_threads), so
+    parallel jobs keep the setting they were started with.
+
+    Returns:
+        Threads per ffmpeg process (0 for ffmpeg's default)
+    """
+    return get_resource_manager().current().encoder_threads
+
+
+def get_job_cores() -> int:
+    """
+    Get the cores the current job may use for its encodes.
+
+    Returns:
+        The job's share of the machine (all cores outside a batch)
+    """
+    return get_resource_manager().current().cores or os.cpu_count() or 1
+
+
+def output_args(preset: str, crf: str, threads: Optional[int] = None) -> List[str]:
+    """
+    Get the encoding arguments shared by all video outputs.
+
+    Args:
+        preset: x264 preset
+        crf: x264 constant rate factor
+        threads: x264 threads (the current job's get_encoder_threads() if None)
+
+    Returns:
+        ffmpeg output arguments for video and audio
+    """
+    threads = get_encoder_threads() if threads is None else threads
+    return [
+        '-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-pix_fmt', OUTPUT_PIX_FMT,
+        '-video_track_timescale', OUTPUT_TIMESCALE
+    ] + (['-threads', str(threads)] if threads else []) + [
+        '-c:a', 'aac', '-ar', OUTPUT_AUDIO_RATE, '-ac', OUTPUT_AUDIO_CHANNELS
+    ]
+
+
+class EncoderError(RuntimeError):
+    """Raised when an ffmpeg process fails."""
+
+
+def run_ffmpeg(args: List[str], input_data: Optional[memoryview] = None, progress: bool = False) -> None:
+    """
+    Run ffmpeg with arguments and wait for it.
+
+    Args:
+        args: Arguments after the ffmpeg binary
+        input_data: Data written to ffmpeg's stdin
+        progress: Report -progress updates to the current job's scope
+
+    Raises:
+        EncoderError: If ffmpeg exits with an error
+        JobCancelled: If the job was cancelled during the encode
+    """
+    command = [get_ffmpeg_binary(), '-y', '-v', 'error'] + args
+    on_line = None
+    if progress:
+        command[1:1] = ['-progress', 'pipe:1', '-nostats']
+        scope = get_resource_manager().current()
+        parser = FfmpegProgress()
+
+        def on_line(line):
+            event = parser.feed(line)
+            if event is not None:
+                scope.report_progress(id(parser), event)
+
+    returncode, _, stderr = run_process(command, input_data=input_data, on_line=on_line)
+    if returncode != 0:
+        message = stderr.decode('utf-8', errors='replace').strip()
+        raise EncoderError(f"ffmpeg failed ({returncode}): {message[-500:]}")
+
+
+def probe_duration(path: str) -> float:
+    """
+    Read the duration of a media file from its header.
+
+    ffmpeg without an output only prints the input's stream information, so
+    nothing is decoded (the bundled ffmpeg comes without ffprobe).
+
+    Args:
+        path: Media file path
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        EncoderError: If ffmpeg reports no duration
+    """
+    _, _, stderr = run_process([get_ffmpeg_binary(), '-hide_banner', '-i', path])
+    match = _DURATION.search(stderr.decode('utf-8', errors='replace'))
+    if match is None:
+        raise EncoderError(f"Could not read the duration of {path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def video_fades(duration: float, fade_in: float = 0.0, fade_out: float = 0.0) -> List[str]:
+    """
+    Build fade filters from and to black.
+
+    Args:
+        duration: Clip duration in seconds
+        fade_in: Fade-in length (0 for none)
+        fade_out: Fade-out length (0 for none)
+
+    Returns:
+        List of filter strings
+    """
+    filters = []
+    if fade_in > 0:
+        filters.append(f"fade=t=in:st=0:d={fade_in:.3f}")
+    if fade_out > 0:
+        filters.append(f"fade=t=out:st={max(0.0, duration - fade_out):.3f}:d={fade_out:.3f}")
+    return filters
+
+
+def audio_filters(
+    duration: float,
+    sound_fade: float = 0.0,
+    loudness: Optional[Dict[str, float]] = None,
+    target: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """
+    Build the audio filter chain: loudness normalization, then fades.
+
+    With a measurement from the sound's pre-analysis, loudnorm runs in its
+    linear mode, which is a single pass with a constant gain.
+
+    Args:
+        duration: Clip duration in seconds
+        sound_fade: Audio fade-in/out length (0 for none)
+        loudness: Measurement from audio_fingerprint.analyze_file()
+        target: Loudness target with 'I', 'TP' and 'LRA' keys
+
+    Returns:
+        List of filter strings
+    """
+    filters = []
+    if loudness and target:
+        filters.append(
+            f"loudnorm=I={target['I']}:TP={target['TP']}:LRA={target['LRA']}"
+            f":measured_I={loudness['input_i']}:measured_TP={loudness['input_tp']}"
+            f":measured_LRA={loudness['input_lra']}:measured_thresh={loudness['input_thresh']}"
+            f":offset={loudness['target_offset']}:linear=true"
+        )
+        # loudnorm outputs 192 kHz
+        filters.append(f"aresample={OUTPUT_AUDIO_RATE}")
+    if sound_fade > 0:
+        sound_fade = min(sound_fade, duration / 2)
+        filters.append(f"afade=t=in:st=0:d={sound_fade:.3f}")
+        filters.append(f"afade=t=out:st={max(0.0, duration - sound_fade):.3f}:d={sound_fade:.3f}")
+    return filters
+
+
+def motion_filters(
+    motion: str,
+    intensity: float,
+    duration: float,
+    fps: float,
+    size: Tuple[int, int],
+    first_frame: int = 0,
+    frame_count: Optional[int] = None
+) -> List[str]:
+    """
+    Build the filters that turn a single frame into a Ken Burns clip.
+
+    Args:
+        motion: One of MOTIONS
+        intensity: Extra zoom at the peak of the motion (0.1 = 10%)
+        duration: Clip duration in seconds
+        fps: Output frame rate
+        size: Output (width, height)
+        first_frame: First frame of the clip to generate (for segments)
+        frame_count: Number of frames to generate (rest of the clip if None)
+
+    Returns:
+        List of filter strings, empty for no motion
+    """
+    if motion not in MOTIONS or motion == 'none' or intensity <= 0:
+        return []
+
+    width, height = size
+    frames = max(1, math.ceil(duration * fps))
+    if frame_count is None:
+        frame_count = frames - first_frame
+    progress = f"(on+{first_frame})/{max(1, frames - 1)}"
+    center_x = 'iw/2-iw/zoom/2'
+    center_y = 'ih/2-ih/zoom/2'
+
+    if motion == 'zoom_in':
+        zoom, x, y = f"1+{intensity}*{progress}", center_x, center_y
+    elif motion == 'zoom_out':
+        zoom, x, y = f"1+{intensity}*(1-{progress})", center_x, center_y
+    else:
+        # Pans hold the peak zoom and slide the window across the spare margin
+        zoom = f"{1 + intensity}"
+        forward = f"(iw-iw/zoom)*{progress}"
+        backward = f"(iw-iw/zoom)*(1-{progress})"
+        x, y = {
+            'pan_left': (backward, center_y),
+            'pan_right': (forward, center_y),
+            'pan_up': (center_x, backward.replace('iw', 'ih')),
+            'pan_down': (center_x, forward.replace('iw', 'ih')),
+        }[motion]
+
+    return [
+        f"scale=iw*{MOTION_OVERSAMPLE}:ih*{MOTION_OVERSAMPLE}:flags=lanczos",
+        f"zoompan=z='{zoom}':x='{x}':y='{y}':d={frame_count}:s={width}x{height}:fps={fps}",
+    ]
+
+
+def still_frames(
+    duration: float,
+    fps: float,
+    size: Tuple[int, int],
+    motion: str = 'none',
+    motion_intensity: float = 0.0,
+    first_frame: int = 0,
+    frame_count: Optional[int] = None
+) -> List[str]:
+    """
+    Build the filters that generate frames of a still clip from one input frame.
+
+    Timestamps are those of the whole clip, so fades given in clip time can
+    follow directly, also when only a segment is generated.
+
+    Args:
+        duration: Clip duration in seconds
+        fps: Output frame rate
+        size: Output (width, height)
+        motion: One of MOTIONS
+        motion_intensity: Extra zoom at the peak of the motion
+        first_frame: First frame to generate
+        frame_count: Number of frames to generate (rest of the clip if None)
+
+    Returns:
+        List of filter strings
+    """
+    if frame_count is None:
+        frame_count = max(1, math.ceil(duration * fps)) - first_frame
+    motion_chain = motion_filters(motion, motion_intensity, duration, fps, size, first_frame, frame_count)
+    if motion_chain:
+        return motion_chain + [f"setpts=PTS+{first_frame / fps:.6f}/TB"]
+    return [
+        'loop=loop=-1:size=1:start=0',
+        'setpts=N/FRAME_RATE/TB',
+        f"trim=start_frame={first_frame}:end_frame={first_frame + frame_count}"
+    ]
+
+
+def segment_count(duration: float, workers: Optional[int] = None) -> int:
+    """
+    Choose how many segments to encode a clip in.
+
+    Args:
+        duration: Clip duration in seconds
+        workers: Cores available to the clip (the job's cores if None); with
+            a fixed encoder thread count, each segment takes that many
+
+    Returns:
+        Number of segments (1 for a single-process encode)
+    """
+    workers = (workers or get_job_cores()) // max(1, get_encoder_threads())
+    if duration < PARALLEL_MIN_DURATION or workers < 2:
+        return 1
+    return max(1, min(workers, int(duration // MIN_SEGMENT_DURATION)))
+
+
+def segment_bounds(total_frames: int, count: int, keyframe_interval: int) -> List[Tuple[int, int]]:
+    """
+    Split a clip into segments that start on the keyframe grid.
+
+    Args:
+        total_frames: Frames in the clip
+        count: Requested number of segments
+        keyframe_interval: GOP length in frames
+
+    Returns:
+        List of (first frame, end frame) pairs covering the clip
+    """
+    gops = max(1, math.ceil(total_frames / keyframe_interval))
+    count = max(1, min(count, gops))
+    starts = sorted({round(gops * i / count) * keyframe_interval for i in range(count)})
+    ends = starts[1:] + [total_frames]
+    return list(zip(starts, ends))
+
+
+def concat_copy(paths: List[str], output_path: str, audio_path: Optional[str] = None) -> None:
+    """
+    Join encoded parts with the concat demuxer and stream copy.
+
+    Args:
+        paths: Parts with identical encoding parameters, in order
+        output_path: Output video path
+        audio_path: Encoded audio to mux in instead of the parts' own audio
+    """
+    list_path = scratch_path(f"{os.path.basename(output_path)}.txt")
+    with open(list_path, 'w') as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    args = ['-f', 'concat', '-safe', '0', '-i', list_path]
+    if audio_path:
+        args += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+    args += ['-c', 'copy', '-video_track_timescale', OUTPUT_TIMESCALE, '-movflags', '+faststart', output_path]
+    try:
+        run_ffmpeg(args)
+    finally:
+        discard(list_path)
+
+
+def encode_still(
+    frame: np.ndarray,
+    audio_path: str,
+    output_path: str,
+    duration: float,
+    fps: float,
+    preset: str,
+    crf: str,
+    video_filters: Optional[List[str]] = None,
+    audio_chain: Optional[List[str]] = None,
+    motion: str = 'none',
+    motion_intensity: float = 0.0,
+    segments: int = 1
+) -> None:
+    """
+    Encode a still frame with audio.
+
+    The frame is sent once as raw RGB and repeated by the loop filter (or
+    animated by zoompan), so motion, fades, audio fades and loudness
+    normalization all happen in ffmpeg's filter graph.
+
+    Args:
+        frame: (height, width, 3) uint8 frame
+        audio_path: Audio file
+        output_path: Output video path
+        duration: Output duration in seconds
+        fps: Output frame rate
+        preset: x264 preset
+        crf: x264 constant rate factor
+        video_filters: Filters applied to the frames (e.g. video_fades())
+        audio_chain: Audio filters (e.g. audio_filters())
+        motion: One of MOTIONS
+        motion_intensity: Extra zoom at the peak of the motion
+        segments: Encode in this many parallel segments (see segment_count())
+    """
+    if segments > 1:
+        encode_still_segments(frame, audio_path, output_path, duration, fps, preset, crf,
+                              video_filters, audio_chain, motion, motion_intensity, segments)
+        return
+
+    height, width = frame.shape[:2]
+    video_chain = still_frames(duration, fps, (width, height), motion, motion_intensity) + (video_filters or [])
+    graph = f"[0:v]{','.join(video_chain)}[vout]"
+    audio_map = '1:a:0'
+    if audio_chain:
+        graph += f";[1:a:0]{','.join(audio_chain)}[aout]"
+        audio_map = '[aout]'
+
+    args = [
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-framerate', str(fps), '-i', '-',
+        '-i', audio_path,
+        '-filter_complex', graph,
+        '-map', '[vout]', '-map', audio_map,
+        '-t', f"{duration:.3f}",
+        '-r', str(fps)
+    ] + output_args(preset, crf) + [output_path]
+    run_ffmpeg(args, input_data=memoryview(np.ascontiguousarray(frame)).cast('B'), progress=True)
+
+
+def encode_still_segments(
+    frame: np.ndarray,
+    audio_path: str,
+    output_path: str,
+    duration: float,
+    fps: float,
+    preset: str,
+    crf: str,
+    video_filters: Optional[List[str]],
+    audio_chain: Optional[List[str]],
+    motion: str,
+    motion_intensity: float,
+    segments: int
+) -> None:
+    """
+    Encode a still clip as parallel segments joined by stream copy.
+
+    Each segment is its own ffmpeg process generating a range of frames on
+    the keyframe grid; the audio is encoded once alongside them. Arguments
+    are those of encode_still().
+    """
+    height, width = frame.shape[:2]
+    total_frames = max(1, math.ceil(duration * fps))
+    keyframe_interval = max(1, round(fps * KEYFRAME_SECONDS))
+    bounds = segment_bounds(total_frames, segments, keyframe_interval)
+    # Threads are per process; without a setting the job's cores are shared by its segments
+    threads = get_encoder_threads() or max(1, get_job_cores() // len(bounds))
+    data = memoryview(np.ascontiguousarray(frame)).cast('B')
+
+    name = os.path.splitext(os.path.basename(output_path))[0]
+    part_paths = [scratch_path(f"{name}.part{i}.mp4") for i in range(len(bounds))]
+    audio_part = scratch_path(f"{name}.audio.m4a")
+
+    # Segments run on pool threads but belong to the calling job
+    scope = get_resource_manager().current()
+
+    def encode_segment(index):
+        with get_resource_manager().bind(scope):
+            encode_segment_frames(index)
+
+    def encode_segment_frames(index):
+        first, end = bounds[index]
+        chain = (still_frames(duration, fps, (width, height), motion, motion_intensity, first, end - first)
+                 + (video_filters or []) + ['setpts=PTS-STARTPTS'])
+        run_ffmpeg([
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-framerate', str(fps), '-i', '-',
+            '-filter_complex', f"[0:v]{','.join(chain)}[vout]",
+            '-map', '[vout]', '-an', '-r', str(fps),
+            '-g', str(keyframe_interval)
+        ] + output_args(preset, crf, threads) + [part_paths[index]], input_data=data, progress=True)
+
+    def encode_audio():
+        with get_resource_manager().bind(scope):
+            encode_audio_track()
+
+    def encode_audio_track():
+        args = ['-i', audio_path, '-map', '0:a:0', '-t', f"{duration:.3f}"]
+        if audio_chain:
+            args += ['-af', ','.join(audio_chain)]
+        run_ffmpeg(args + ['-c:a', 'aac', '-ar', OUTPUT_AUDIO_RATE, '-ac', OUTPUT_AUDIO_CHANNELS, audio_part])
+
+    try:
+        # The work happens in the ffmpeg processes; threads only wait on them
+        with ThreadPoolExecutor(max_workers=len(bounds) + 1) as pool:
+            futures = [pool.submit(encode_segment, i) for i in range(len(bounds))]
+            futures.append(pool.submit(encode_audio))
+            for future in futures:
+                future.result()
+        concat_copy(part_paths, output_path, audio_part)
+    finally:
+        for path in part_paths + [audio_part]:
+            discard(path)
+
+
+class RawVideoWriter:
+    """Streams RGB frames into an ffmpeg H.264 encode."""
+
+    def __init__(
+        self,
+        output_path: str,
+        size: Tuple[int, int],
+        fps: float,
+        preset: str = INTERMEDIATE_PRESET,
+        crf: str = INTERMEDIATE_CRF
+    ):
+        """
+        Start the encoder.
+
+        Args:
+            output_path: Output video path
+            size: (width, height) of the frames
+            fps: Frame rate
+            preset: x264 preset
+            crf: x264 constant rate factor
+        """
+        self.output_path = output_path
+        self.size = size
+        command = [
+            get_ffmpeg_binary(), '-y', '-v', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f"{size[0]}x{size[1]}", '-r', str(fps), '-i', '-',
+            '-an', '-c:v', 'libx264', '-preset', preset, '-crf', str(crf),
+            '-pix_fmt', 'yuv420p', output_path
+        ]
+        self._scope = get_resource_manager().current()
+        self._process: Optional[subprocess.Popen] = self._scope.track_process(subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        ))
+
+    def write(self, frame: np.ndarray) -> None:
+        """
+        Send one frame to the encoder.
+
+        Args:
+            frame: (height, width, 3) uint8 array
+        """
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+        except (BrokenPipeError, ValueError):
+            # ValueError: the pipe was closed by a cancel
+            self._scope.raise_if_cancelled()
+            self.close()
+
+    def close(self) -> None:
+        """
+        Finish the encode.
+
+        Raises:
+            EncoderError: If ffmpeg exits with an error
+        """
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        try:
+            process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        try:
+            stderr = process.stderr.read()
+            returncode = process.wait()
+        except ValueError:
+            stderr, returncode = b'', process.wait()
+        finally:
+            self._scope.release_process(process)
+        self._scope.raise_if_cancelled()
+        if returncode != 0:
+            message = stderr.decode('utf-8', errors='replace').strip()
+            raise EncoderError(f"ffmpeg failed ({returncode}): {message[-500:]}")
+
+    def abort(self) -> None:
+        """Stop the encode without waiting for it to finish."""
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        self._scope.release_process(process)
+
+    def __enter__(self) -> 'RawVideoWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def mux_looped_video(
+    loop_path: str,
+    audio_path: str,
+    output_path: str,
+    duration: float,
+    fps: float,
+    preset: str,
+    crf: str,
+    video_filters: Optional[List[str]] = None,
+    audio_chain: Optional[List[str]] = None
+) -> None:
+    """
+    Loop a short clip to the audio length and mux it with the audio.
+
+    Args:
+        loop_path: Video holding one loop
+        audio_path: Audio file
+        output_path: Output video path
+        duration: Output duration in seconds
+        fps: Output frame rate
+        preset: x264 preset
+        crf: x264 constant rate factor
+        video_filters: Filters applied to the looped video (e.g. video_fades())
+        audio_chain: Audio filters (e.g. audio_filters())
+    """
+    args = [
+        '-stream_loop', '-1', '-i', loop_path,
+        '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-t', f"{duration:.3f}",
+    ]
+    if video_filters:
+        args += ['-vf', ','.join(video_filters)]
+    if audio_chain:
+        args += ['-af', ','.join(audio_chain)]
+    args += ['-r', str(fps)] + output_args(preset, crf) + [output_path]
+    run_ffmpeg(args, progress=True)
+
+
+def slideshow_filter(
+    count: int,
+    slide_duration: float,
+    transition: float,
+    video_filters: Optional[List[str]] = None
+) -> str:
+    """
+    Build the filter graph that chains slides with xfade transitions.
+
+    Each input is expected to last slide_duration + transition seconds, so
+    transition k starts at k * slide_duration and the output lasts
+    count * slide_duration + transition seconds.
+
+    Args:
+        count: Number of slide inputs
+        slide_duration: Time between transition starts
+        transition: Crossfade duration
+        video_filters: Filters applied to the whole reel (e.g. video_fades())
+
+    Returns:
+        filter_complex string with the video output labelled [vout]
+    """
+    chains = [f"[{i}:v]format=yuv420p,settb=AVTB[s{i}]" for i in range(count)]
+    previous = 's0'
+    for i in range(1, count):
+        chains.append(
+            f"[{previous}][s{i}]xfade=transition=fade:duration={transition:.3f}"
+            f":offset={i * slide_duration:.3f}[x{i}]"
+        )
+        previous = f"x{i}"
+    chains.append(f"[{previous}]{','.join(video_filters or ['null'])}[vout]")
+    return ';'.join(chains)
+
+
+def encode_slideshow(
+    slide_paths: List[str],
+    audio_path: str,
+    output_path: str,
+    duration: float,
+    fps: float,
+    preset: str,
+    crf: str,
+    transition: float = 0.5,
+    video_filters: Optional[List[str]] = None,
+    audio_chain: Optional[List[str]] = None
+) -> None:
+    """
+    Encode still slides with crossfades and one audio track in a single ffmpeg run.
+
+    Args:
+        slide_paths: Pre-rendered full-frame slide images, in order
+        audio_path: Audio file
+        output_path: Output video path
+        duration: Output duration in seconds
+        fps: Output frame rate
+        preset: x264 preset
+        crf: x264 constant rate factor
+        transition: Crossfade duration in seconds
+        video_filters: Filters applied to the whole reel (e.g. video_fades())
+        audio_chain: Audio filters (e.g. audio_filters())
+    """
+    count = len(slide_paths)
+    transition = min(transition, duration / (2 * count)) if count > 1 else 0.0
+    slide_duration = (duration - transition) / count
+
+    args = []
+    for path in slide_paths:
+        args += ['-loop', '1', '-framerate', str(fps),
+                 '-t', f"{slide_duration + transition:.3f}", '-i', path]
+    graph = slideshow_filter(count, slide_duration, transition, video_filters)
+    audio_map = f"{count}:a:0"
+    if audio_chain:
+        graph += f";[{count}:a:0]{','.join(audio_chain)}[aout]"
+        audio_map = '[aout]'
+    args += [
+        '-i', audio_path,
+        '-filter_complex', graph,
+        '-map', '[vout]', '-map', audio_map,
+        '-t', f"{duration:.3f}",
+        '-r', str(fps)
+    ] + output_args(preset, crf) + [output_path]
+    run_ffmpeg(args, progress=True)
@@ -0,0 +1,171 @@
+"""
+Sprite cache for repeated overlay text.
+
+Labels such as "part 12", watermarks or handles repeat across a batch with
+at most a changing number. Static runs of a label are rasterized once per
+style and digits come from a per-style atlas, so composing a new label is a
+few alpha pastes instead of a FreeType (and stroke) render.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw
+
+from src.processors.render_plan import TextStyle
+
+
+DIGITS = '0123456789'
+SPRITE_CACHE_SIZE = 256
+_DIGIT_RUN = re.compile(r'(\d+)')
+
+
+class Sprite:
+    """A pre-rendered run of text with its placement relative to the pen."""
+
+    __slots__ = ('image', 'offset', 'advance')
+
+    def __init__(self, image: Image.Image, offset: Tuple[int, int], advance: float):
+        self.image = image
+        self.offset = offset
+        self.advance = advance
+
+
+def render_sprite(text: str, style: TextStyle) -> Sprite:
+    """
+    Rasterize text (with its stroke) into a tight RGBA sprite.
+
+    Args:
+        text: Text to render
+        style: Resolved text style
+
+    Returns:
+        Sprite positioned relative to a pen at the text origin
+    """
+    font = style.font
+    left, top, right, bottom = font.getbbox(text, stroke_width=style.stroke_width)
+    size = (max(1, right - left), max(1, bottom - top))
+    image = Image.new('RGBA', size, (0, 0, 0, 0))
+    ImageDraw.Draw(image).text(
+        (-left, -top),
+        text,
+        font=font,
+        fill=style.fill,
+        stroke_width=style.stroke_width,
+        stroke_fill=style.stroke_fill
+    )
+    return Sprite(image, (left, top), font.getlength(text))
+
+
+class GlyphAtlas:
+    """Pre-rendered digit sprites for one text style."""
+
+    def __init__(self, style: TextStyle, charset: str = DIGITS):
+        """
+        Render the atlas.
+
+        Args:
+            style: Resolved text style
+            charset: Characters to pre-render
+        """
+        self.style = style
+        self.glyphs: Dict[str, Sprite] = {char: render_sprite(char, style) for char in charset}
+
+
+class LabelSpriteCache:
+    """Composes labels from cached static runs and digit atlases."""
+
+    def __init__(self, max_size: int = SPRITE_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached static runs
+        """
+        self.max_size = max_size
+        self._runs: 'OrderedDict[Tuple[str, TextStyle], Sprite]' = OrderedDict()
+        self._atlases: Dict[TextStyle, GlyphAtlas] = {}
+        self._lock = threading.Lock()
+
+    def atlas(self, style: TextStyle) -> GlyphAtlas:
+        """Get (building on first use) the digit atlas for a style."""
+        with self._lock:
+            atlas = self._atlases.get(style)
+        if atlas is None:
+            atlas = GlyphAtlas(style)
+            with self._lock:
+                atlas = self._atlases.setdefault(style, atlas)
+        return atlas
+
+    def run(self, text: str, style: TextStyle) -> Sprite:
+        """Get (rendering on first use) the sprite for a static run of text."""
+        key = (text, style)
+        with self._lock:
+            sprite = self._runs.get(key)
+            if sprite is not None:
+                self._runs.move_to_end(key)
+                return sprite
+
+        sprite = render_sprite(text, style)
+        with self._lock:
+            self._runs[key] = sprite
+            while len(self._runs) > self.max_size:
+                self._runs.popitem(last=False)
+        return sprite
+
+    def _sprites_for(self, text: str, style: TextStyle) -> List[Sprite]:
+        sprites = []
+        for i, segment in enumerate(_DIGIT_RUN.split(text)):
+            if not segment:
+                continue
+            if i % 2:
+                glyphs = self.atlas(style).glyphs
+                sprites.extend(glyphs[char] for char in segment)
+            else:
+                sprites.append(self.run(segment, style))
+        return sprites
+
+    def label(self, text: str, style: TextStyle) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        Compose a label.
+
+        Args:
+            text: Label text
+            style: Resolved text style
+
+        Returns:
+            Tuple of (RGBA image, offset of the image relative to the text origin)
+        """
+        placements = []
+        pen_x = 0.0
+        for sprite in self._sprites_for(text, style):
+            placements.append((sprite, int(round(pen_x)) + sprite.offset[0], sprite.offset[1]))
+            pen_x += sprite.advance
+
+        if not placements:
+            return Image.new('RGBA', (1, 1), (0, 0, 0, 0)), (0, 0)
+
+        min_x = min(x for _, x, _ in placements)
+        min_y = min(y for _, _, y in placements)
+        max_x = max(x + sprite.image.width for sprite, x, _ in placements)
+        max_y = max(y + sprite.image.height for sprite, _, y in placements)
+
+        label = Image.new('RGBA', (max_x - min_x, max_y - min_y), (0, 0, 0, 0))
+        for sprite, x, y in placements:
+            label.alpha_composite(sprite.image, dest=(x - min_x, y - min_y))
+        return label, (min_x, min_y)
+
+
+_default_cache = LabelSpriteCache()
+
+
+def get_label_cache() -> LabelSpriteCache:
+    """
+    Get the process-wide label sprite cache.
+
+    Returns:
+        LabelSpriteCache instance
+    """
+    return _default_cache
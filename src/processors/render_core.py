@@ -0,0 +1,475 @@
+"""
+Shared meme render core.
+
+This module lays out a meme frame (background, fitted image, quote text and
+optional part number) from a compiled RenderPlan at any scale. The GUI live
+preview renders at 360x640 and the generator at 1080x1920 through the same
+code, so the preview always matches the output.
+
+Unchanged layers are cached: changing the background colour does not refit
+the image, and changing the font does not touch the background. Blurred
+backgrounds are blurred at thumbnail size (cached per source image in the
+niche's derivative cache) and only scaled up here.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src.processors.animation import iter_frames
+from src.processors.compositor import LayerArrays, get_compositor
+from src.processors.derivatives import DerivativeCache, make_blurred
+from src.processors.glyph_atlas import get_label_cache
+from src.processors.render_plan import RenderPlan, TextStyle, compile_render_plan
+from src.processors.smart_crop import CropWindow, apply_crop
+from src.processors.text_fit import fit_font_size
+
+
+LAYER_CACHE_SIZE = 32
+
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
+    """
+    Wrap text into lines no wider than max_width (single long words overflow).
+
+    Args:
+        text: Text to wrap
+        font: Font used to measure
+        max_width: Maximum line width in pixels
+
+    Returns:
+        List of lines
+    """
+    wrapped_lines = []
+    current_line: List[str] = []
+    for word in text.split():
+        current_line.append(word)
+        if font.getlength(' '.join(current_line)) > max_width:
+            if len(current_line) == 1:
+                wrapped_lines.append(word)
+                current_line = []
+            else:
+                wrapped_lines.append(' '.join(current_line[:-1]))
+                current_line = [word]
+    if current_line:
+        wrapped_lines.append(' '.join(current_line))
+    return wrapped_lines
+
+
+class _LayerCache:
+    """Small LRU cache for rendered layers, shared by parallel generation workers."""
+
+    def __init__(self, max_size: int = LAYER_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class MemeRenderer:
+    """Renders meme frames from a compiled render plan."""
+
+    def __init__(self, plan: RenderPlan, derivatives: Optional[DerivativeCache] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            plan: Compiled render plan
+            derivatives: Derivative cache of the niche (blurred backgrounds are
+                computed in memory only if None)
+        """
+        self.plan = plan
+        self.derivatives = derivatives
+        self._backgrounds = _LayerCache(8)
+        self._fitted_images = _LayerCache()
+        self._text_layers = _LayerCache()
+        self._part_layers = _LayerCache()
+        self._arrays = _LayerCache(4 * LAYER_CACHE_SIZE)
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None, scale: float = 1.0) -> 'MemeRenderer':
+        """
+        Create a renderer by compiling video settings.
+
+        Args:
+            settings: Video settings
+            scale: Output scale relative to 1080x1920
+
+        Returns:
+            MemeRenderer instance
+        """
+        return cls(compile_render_plan(settings, scale))
+
+    @property
+    def width(self) -> int:
+        return self.plan.width
+
+    @property
+    def height(self) -> int:
+        return self.plan.height
+
+    def set_plan(self, plan: RenderPlan) -> None:
+        """
+        Switch to a new plan.
+
+        Layers are cached by the plan values they depend on, so only layers
+        whose inputs changed are rendered again.
+
+        Args:
+            plan: Compiled render plan
+        """
+        self.plan = plan
+
+    def background(self, image: Union[str, Image.Image, None] = None) -> Image.Image:
+        """
+        Get the background layer.
+
+        Args:
+            image: Image path or PIL image the blurred background is made from
+                (ignored for flat backgrounds)
+
+        Returns:
+            RGB layer of the frame size
+        """
+        size = (self.plan.width, self.plan.height)
+        if self.plan.background_mode != 'blur' or image is None:
+            key = (self.plan.background, size)
+            layer = self._backgrounds.get(key)
+            if layer is None:
+                layer = self._backgrounds.put(key, Image.new('RGB', size, self.plan.background))
+            return layer
+
+        # PIL inputs are not cached: their id() can be reused by a different image
+        # once the caller drops them (e.g. evicted derivatives)
+        key = ('blur', image, os.stat(image).st_mtime, size) if isinstance(image, str) else None
+        layer = self._backgrounds.get(key) if key is not None else None
+        if layer is not None:
+            return layer
+
+        if isinstance(image, str) and self.derivatives is not None:
+            small = self.derivatives.blurred(image)
+        elif isinstance(image, str):
+            with Image.open(image) as original:
+                original.draft('RGB', (size[0] // 4, size[1] // 4))
+                small = make_blurred(original)
+        else:
+            small = make_blurred(image)
+        layer = small.resize(size, Image.Resampling.BILINEAR)
+        return self._backgrounds.put(key, layer) if key is not None else layer
+
+    def fitted_image(self, image: Union[str, Image.Image], crop: Optional[CropWindow] = None) -> Image.Image:
+        """
+        Get the source image scaled to fit the frame above/below the text.
+
+        Args:
+            image: Image path or PIL image
+            crop: Smart-crop window (used only if smart crop is enabled in the plan)
+
+        Returns:
+            Fitted RGB image
+        """
+        max_size = self.plan.image_max_size
+        crop = tuple(crop) if crop and self.plan.smart_crop else None
+        # Only paths are cached; see background()
+        key = (image, os.stat(image).st_mtime, max_size, crop) if isinstance(image, str) else None
+        fitted = self._fitted_images.get(key) if key is not None else None
+        if fitted is not None:
+            return fitted
+
+        if isinstance(image, str):
+            with Image.open(image) as original_img:
+                # Cropped images keep a smaller share of the pixels, so decode larger
+                if crop:
+                    original_img.draft('RGB', (int(max_size[0] / (crop[2] - crop[0])),
+                                               int(max_size[1] / (crop[3] - crop[1]))))
+                else:
+                    original_img.draft('RGB', max_size)
+                fitted = apply_crop(original_img.convert('RGB'), crop)
+        else:
+            fitted = apply_crop(image.convert('RGB'), crop)
+        fitted.thumbnail(max_size, Image.Resampling.LANCZOS)
+        return self._fitted_images.put(key, fitted) if key is not None else fitted
+
+    def _new_layer(self, style: TextStyle, size) -> Image.Image:
+        if style.box_fill is None:
+            return Image.new('RGBA', size, (0, 0, 0, 0))
+        return Image.new('RGB', size, style.box_fill)
+
+    def text_style(self, text: str, box_width: int) -> TextStyle:
+        """
+        Get the style of a quote, auto-fitting the font size if enabled.
+
+        Args:
+            text: Quote text
+            box_width: Width of the text box (the fitted image width)
+
+        Returns:
+            Text style to render the quote with
+        """
+        style = self.plan.text
+        if self.plan.text_max_height is None:
+            return style
+        font_size = fit_font_size(
+            text,
+            style.font_path,
+            box_width,
+            self.plan.text_max_height,
+            style.padding,
+            self.plan.line_spacing,
+            min(self.plan.text_min_size, style.font_size),
+            style.font_size
+        )
+        return style.resized(font_size)
+
+    def text_layer(self, text: str, box_width: int) -> Image.Image:
+        """
+        Get the quote text block.
+
+        Args:
+            text: Quote text
+            box_width: Width of the text box (the fitted image width)
+
+        Returns:
+            RGB box for boxed styles or RGBA layer for the outline style
+        """
+        key = (text, self.plan.text, self.plan.text_max_height, self.plan.text_min_size,
+               self.plan.line_spacing, box_width)
+        layer = self._text_layers.get(key)
+        if layer is not None:
+            return layer
+
+        style = self.text_style(text, box_width)
+
+        font = style.font
+        lines = wrap_text(text, font, box_width - 2 * style.padding)
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
+        line_spacing = self.plan.line_spacing
+        text_height = len(lines) * line_height + (len(lines) - 1) * line_spacing
+
+        layer = self._new_layer(style, (box_width, text_height + 2 * style.padding))
+        draw = ImageDraw.Draw(layer)
+        y_position = style.padding
+        for line in lines:
+            draw.text(
+                ((box_width - font.getlength(line)) // 2, y_position),
+                line,
+                font=font,
+                fill=style.fill,
+                stroke_width=style.stroke_width,
+                stroke_fill=style.stroke_fill
+            )
+            y_position += line_height + line_spacing
+
+        return self._text_layers.put(key, layer)
+
+    def part_layer(self, part_number: int) -> Image.Image:
+        """
+        Get the "part N" block.
+
+        Args:
+            part_number: Part number to display
+
+        Returns:
+            RGB box for boxed styles or RGBA layer for the outline style
+        """
+        style = self.plan.part
+        text = f"part {part_number}"
+        key = (text, style)
+        layer = self._part_layers.get(key)
+        if layer is not None:
+            return layer
+
+        # Composed from cached sprites: "part " once per style, digits from the atlas
+        label, (_, offset_y) = get_label_cache().label(text, style)
+        ascent, descent = style.font.getmetrics()
+        origin_y = style.padding + style.stroke_width
+        size = (label.width + 2 * style.padding,
+                origin_y + ascent + descent + style.stroke_width + style.padding)
+
+        layer = self._new_layer(style, size)
+        if layer.mode == 'RGBA':
+            layer.alpha_composite(label, dest=(style.padding, origin_y + offset_y))
+        else:
+            layer.paste(label, (style.padding, origin_y + offset_y), label)
+        return self._part_layers.put(key, layer)
+
+    def layout(
+        self,
+        image: Union[str, Image.Image],
+        text: str,
+        part_number: Optional[int] = None,
+        crop: Optional[CropWindow] = None
+    ) -> List[Tuple[Image.Image, int, int]]:
+        """
+        Place the layers of a meme frame.
+
+        Args:
+            image: Image path or PIL image
+            text: Quote text
+            part_number: Part number (only drawn if enabled in the plan)
+            crop: Smart-crop window of the image
+
+        Returns:
+            List of (layer, x, y) in drawing order, excluding the background
+        """
+        plan = self.plan
+        img = self.fitted_image(image, crop)
+
+        layers = {'main': self.text_layer(text, img.width)}
+        if plan.part is not None:
+            if part_number is None:
+                part_number = plan.part_start_number
+            layers['part'] = self.part_layer(part_number)
+
+        blocks = plan.blocks_above + plan.blocks_below
+        total_height = img.height + sum(layers[block].height for block in blocks)
+        current_y = (plan.height - total_height) // 2
+
+        placements = []
+        for block in plan.blocks_above:
+            placements.append((layers[block], (plan.width - layers[block].width) // 2, current_y))
+            current_y += layers[block].height
+
+        placements.append((img, (plan.width - img.width) // 2, current_y))
+        current_y += img.height
+
+        for block in plan.blocks_below:
+            placements.append((layers[block], (plan.width - layers[block].width) // 2, current_y))
+            current_y += layers[block].height
+
+        return placements
+
+    def render(
+        self,
+        image: Union[str, Image.Image],
+        text: str,
+        part_number: Optional[int] = None,
+        crop: Optional[CropWindow] = None
+    ) -> Image.Image:
+        """
+        Render a complete meme frame as a new PIL image.
+
+        Args:
+            image: Image path or PIL image
+            text: Quote text
+            part_number: Part number (only drawn if enabled in the plan)
+            crop: Smart-crop window of the image
+
+        Returns:
+            RGB frame of size (width, height)
+        """
+        frame = self.background(image).copy()
+        for layer, x, y in self.layout(image, text, part_number, crop):
+            if layer.mode == 'RGBA':
+                frame.paste(layer, (x, y), layer)
+            else:
+                frame.paste(layer, (x, y))
+        return frame
+
+    def _layer_arrays(self, layer: Image.Image) -> LayerArrays:
+        # Keyed by id(); the cached tuple keeps the layer alive so ids are not reused
+        cached = self._arrays.get(id(layer))
+        if cached is None or cached[0] is not layer:
+            cached = self._arrays.put(id(layer), (layer, LayerArrays(layer)))
+        return cached[1]
+
+    def render_array(
+        self,
+        image: Union[str, Image.Image],
+        text: str,
+        part_number: Optional[int] = None,
+        crop: Optional[CropWindow] = None
+    ) -> np.ndarray:
+        """
+        Render a complete meme frame into the calling worker's canvas buffer.
+
+        The returned array is reused by the next render on the same thread;
+        copy it if it has to outlive that.
+
+        Args:
+            image: Image path or PIL image
+            text: Quote text
+            part_number: Part number (only drawn if enabled in the plan)
+            crop: Smart-crop window of the image
+
+        Returns:
+            (height, width, 3) uint8 canvas
+        """
+        compositor = get_compositor(self.plan.width, self.plan.height)
+        if self.plan.background_mode == 'blur':
+            # One copy per frame; full-frame backgrounds are not worth an array cache entry
+            compositor.fill(np.asarray(self.background(image)))
+        else:
+            compositor.clear(self.plan.background)
+        for layer, x, y in self.layout(image, text, part_number, crop):
+            compositor.draw(self._layer_arrays(layer), x, y)
+        return compositor.buffer
+
+    def render_animation(
+        self,
+        image_path: str,
+        text: str,
+        part_number: Optional[int] = None,
+        crop: Optional[CropWindow] = None
+    ) -> Iterator[Tuple[np.ndarray, float]]:
+        """
+        Render the frames of an animated source one at a time.
+
+        The layout is computed once from the first frame; each source frame
+        is then decoded, fitted and drawn over the cached static layers. Each
+        yielded array is the worker's canvas and is overwritten by the next
+        frame.
+
+        Args:
+            image_path: Animated GIF/WebP path
+            text: Quote text
+            part_number: Part number (only drawn if enabled in the plan)
+            crop: Smart-crop window of the image
+
+        Yields:
+            Tuples of ((height, width, 3) uint8 canvas, frame duration in seconds)
+        """
+        placements = self.layout(image_path, text, part_number, crop)
+        first_frame = self.fitted_image(image_path, crop)
+        crop = tuple(crop) if crop and self.plan.smart_crop else None
+        static = [(self._layer_arrays(layer), x, y, layer is first_frame) for layer, x, y in placements]
+        background = None
+        if self.plan.background_mode == 'blur':
+            background = np.asarray(self.background(image_path))
+
+        compositor = get_compositor(self.plan.width, self.plan.height)
+        with Image.open(image_path) as source:
+            for frame, duration in iter_frames(source):
+                if background is not None:
+                    compositor.fill(background)
+                else:
+                    compositor.clear(self.plan.background)
+                for arrays, x, y, is_image in static:
+                    if is_image:
+                        fitted = apply_crop(frame, crop).resize(first_frame.size, Image.Resampling.BILINEAR)
+                        arrays = LayerArrays(fitted)
+                    compositor.draw(arrays, x, y)
+                yield compositor.buffer, duration
@@ -0,0 +1,301 @@
+"""
+Render plans compiled from video settings.
+
+Every value in video_settings.json is constant for a whole batch, so the
+settings are compiled once into an immutable RenderPlan: fonts resolved to
+files, colours parsed, sizes scaled and block order decided. Renders then
+only fit the quote text and paste the image. Each plan carries a stable
+fingerprint that caches use as a key.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import ImageColor, ImageFont
+
+
+FRAME_WIDTH = 1080
+FRAME_HEIGHT = 1920
+
+# Vertical space reserved for text blocks when fitting the image (full scale)
+RESERVED_TEXT_HEIGHT = 300
+BOX_PADDING = 30
+LINE_SPACING = 10
+PART_PADDING = 20
+
+DEFAULT_VIDEO_SETTINGS: Dict[str, Any] = {
+    'font': 'Arial',
+    'font_size': 72,
+    'font_color': 'text_box_white',
+    'fade_duration': 0.5,
+    'fade_in_start': True,
+    'fade_out_end': True,
+    'sound_fade': 0.3,
+    'loudness_normalize': True,
+    'motion': 'none',
+    'motion_intensity': 0.1,
+    'text_position': 'above',
+    'bg_color': '#000000',
+    'bg_mode': 'color',
+    'smart_crop': False,
+    'part_enabled': False,
+    'part_start_number': 1,
+    'part_font': 'Arial',
+    'part_font_size': 36,
+    'part_color': 'white_outline',
+    'part_text_position': 'below',
+    'auto_fit_text': False,
+    'auto_fit_max_height': 480,
+    'auto_fit_min_size': 32
+}
+
+SETTINGS_FILENAME = 'video_settings.json'
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_FONT = os.path.join(PROJECT_ROOT, 'assets', 'fonts', 'Proxima_Nova_Semibold.otf')
+
+FONT_DIRS = [
+    "/System/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    "/Library/Fonts",
+    os.path.expanduser("~/Library/Fonts"),
+    "/usr/share/fonts/truetype/msttcorefonts",
+    "/usr/share/fonts/truetype",
+    "C:\\Windows\\Fonts",
+]
+
+FALLBACK_FONTS = [
+    PROJECT_FONT,
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "C:\\Windows\\Fonts\\Arial.ttf"
+]
+
+
+def load_video_settings(niche_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Load a niche's video settings, filling in defaults for missing keys.
+
+    Args:
+        niche_path: Path to niche directory
+
+    Returns:
+        Video settings dictionary
+    """
+    settings = dict(DEFAULT_VIDEO_SETTINGS)
+    if not niche_path:
+        return settings
+
+    settings_file = os.path.join(niche_path, SETTINGS_FILENAME)
+    if os.path.exists(settings_file):
+        try:
+            with open(settings_file, 'r') as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+    return settings
+
+
+@lru_cache(maxsize=64)
+def resolve_font_path(font_name: str) -> Optional[str]:
+    """
+    Find a font file for a font family name.
+
+    Falls back to the bundled Proxima Nova and then to common system fonts.
+
+    Args:
+        font_name: Font family name (e.g. 'Arial') or a path to a font file
+
+    Returns:
+        Font file path, or None if no font could be found
+    """
+    if font_name and os.path.isfile(font_name):
+        return font_name
+
+    if font_name:
+        names = {font_name, font_name.replace(' ', '')}
+        for font_dir in FONT_DIRS:
+            for name in names:
+                for ext in ('.ttf', '.ttc', '.otf'):
+                    path = os.path.join(font_dir, f"{name}{ext}")
+                    if os.path.exists(path):
+                        return path
+
+    for path in FALLBACK_FONTS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=128)
+def load_font(font_path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a font at a size, cached across renders.
+
+    Args:
+        font_path: Font file path from resolve_font_path()
+        size: Font size in pixels
+
+    Returns:
+        Font object
+    """
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size=size)
+
+
+def parse_color(value: str, default: str = 'black') -> Tuple[int, int, int]:
+    """
+    Parse a colour string into an RGB tuple.
+
+    Args:
+        value: Colour string (name or hex)
+        default: Colour used if value is invalid
+
+    Returns:
+        RGB tuple
+    """
+    try:
+        return ImageColor.getrgb(value)[:3]
+    except (ValueError, AttributeError):
+        return ImageColor.getrgb(default)[:3]
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    """Resolved style of one text block."""
+
+    font_path: Optional[str]
+    font_size: int
+    fill: Tuple[int, int, int]
+    box_fill: Optional[Tuple[int, int, int]]
+    stroke_fill: Optional[Tuple[int, int, int]]
+    stroke_width: int
+    padding: int
+
+    @property
+    def font(self) -> ImageFont.FreeTypeFont:
+        """Font object for this style."""
+        return load_font(self.font_path, self.font_size)
+
+    def resized(self, font_size: int) -> 'TextStyle':
+        """Get the same style at another font size."""
+        if font_size == self.font_size:
+            return self
+        stroke_width = outline_width(font_size) if self.stroke_fill is not None else 0
+        return replace(self, font_size=font_size, stroke_width=stroke_width)
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """Immutable, batch-wide layout decisions for meme frames."""
+
+    width: int
+    height: int
+    scale: float
+    background: Tuple[int, int, int]
+    background_mode: str
+    image_max_size: Tuple[int, int]
+    smart_crop: bool
+    text: TextStyle
+    line_spacing: int
+    text_max_height: Optional[int]
+    text_min_size: int
+    part: Optional[TextStyle]
+    part_start_number: int
+    blocks_above: Tuple[str, ...]
+    blocks_below: Tuple[str, ...]
+    fingerprint: str = field(default='', compare=False)
+
+    @property
+    def image_aspect(self) -> float:
+        """Width / height of the area images are fitted into."""
+        return self.image_max_size[0] / self.image_max_size[1]
+
+
+def outline_width(font_size: int) -> int:
+    """Outline width used by the white_outline style at a font size."""
+    return max(1, font_size // 18)
+
+
+def _text_style(font_name: str, font_size: int, color_style: str, padding: int) -> TextStyle:
+    """Resolve a font/colour-style pair into a TextStyle."""
+    white, black = (255, 255, 255), (0, 0, 0)
+    if color_style == 'white_outline':
+        return TextStyle(
+            font_path=resolve_font_path(font_name),
+            font_size=font_size,
+            fill=white,
+            box_fill=None,
+            stroke_fill=black,
+            stroke_width=outline_width(font_size),
+            padding=padding
+        )
+    box_fill = black if color_style == 'text_box_black' else white
+    return TextStyle(
+        font_path=resolve_font_path(font_name),
+        font_size=font_size,
+        fill=white if box_fill == black else black,
+        box_fill=box_fill,
+        stroke_fill=None,
+        stroke_width=0,
+        padding=padding
+    )
+
+
+def compile_render_plan(settings: Optional[Dict[str, Any]] = None, scale: float = 1.0) -> RenderPlan:
+    """
+    Compile video settings into a render plan.
+
+    Args:
+        settings: Video settings (defaults are used for missing keys)
+        scale: Output scale relative to 1080x1920
+
+    Returns:
+        RenderPlan with its fingerprint set
+    """
+    merged = dict(DEFAULT_VIDEO_SETTINGS)
+    merged.update(settings or {})
+
+    def px(value: float, minimum: int = 1) -> int:
+        return max(minimum, int(round(float(value) * scale)))
+
+    width = int(round(FRAME_WIDTH * scale))
+    height = int(round(FRAME_HEIGHT * scale))
+
+    blocks_above = []
+    blocks_below = []
+    (blocks_above if merged['text_position'] == 'above' else blocks_below).append('main')
+    part = None
+    if merged['part_enabled']:
+        (blocks_above if merged['part_text_position'] == 'above' else blocks_below).append('part')
+        part = _text_style(merged['part_font'], px(merged['part_font_size']),
+                           merged['part_color'], px(PART_PADDING))
+
+    plan = RenderPlan(
+        width=width,
+        height=height,
+        scale=scale,
+        background=parse_color(merged['bg_color']),
+        background_mode='blur' if merged['bg_mode'] == 'blur' else 'color',
+        image_max_size=(width, height - px(RESERVED_TEXT_HEIGHT)),
+        smart_crop=bool(merged['smart_crop']),
+        text=_text_style(merged['font'], px(merged['font_size']),
+                         merged['font_color'], px(BOX_PADDING)),
+        line_spacing=px(LINE_SPACING, 0),
+        text_max_height=px(merged['auto_fit_max_height']) if merged['auto_fit_text'] else None,
+        text_min_size=px(merged['auto_fit_min_size']),
+        part=part,
+        part_start_number=int(merged['part_start_number']),
+        blocks_above=tuple(blocks_above),
+        blocks_below=tuple(blocks_below)
+    )
+
+    canonical = json.dumps(asdict(plan), sort_keys=True, default=str)
+    fingerprint = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    return replace(plan, fingerprint=fingerprint)
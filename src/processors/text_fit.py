@@ -0,0 +1,147 @@
+"""
+Auto-fit sizing of quote text.
+
+Finds the largest font size at which a quote fits a maximum box height by
+binary search. Probes never rasterize: word widths are measured once per font
+at a reference size and scaled linearly to the probed size, so fitting a
+quote costs a few greedy wraps over cached numbers.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from src.processors.render_plan import load_font
+
+
+REFERENCE_SIZE = 100
+
+
+class WordMetrics:
+    """Word widths of one font, measured at the reference size."""
+
+    def __init__(self, font_path: Optional[str]):
+        """
+        Measure the font's constant metrics.
+
+        Args:
+            font_path: Font file path from resolve_font_path()
+        """
+        self.font = load_font(font_path, REFERENCE_SIZE)
+        ascent, descent = self.font.getmetrics()
+        self.line_height = (ascent + descent) / REFERENCE_SIZE
+        self.space_width = self.font.getlength(' ') / REFERENCE_SIZE
+        self._widths: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def widths(self, words: List[str]) -> List[float]:
+        """
+        Get word widths per pixel of font size.
+
+        Args:
+            words: Words to measure
+
+        Returns:
+            Width of each word divided by the font size
+        """
+        widths = []
+        for word in words:
+            width = self._widths.get(word)
+            if width is None:
+                width = self.font.getlength(word) / REFERENCE_SIZE
+                with self._lock:
+                    self._widths[word] = width
+            widths.append(width)
+        return widths
+
+
+@lru_cache(maxsize=16)
+def get_word_metrics(font_path: Optional[str]) -> WordMetrics:
+    """
+    Get the shared word metrics of a font.
+
+    Args:
+        font_path: Font file path from resolve_font_path()
+
+    Returns:
+        WordMetrics instance
+    """
+    return WordMetrics(font_path)
+
+
+def count_lines(widths: List[float], space_width: float, max_width: float) -> int:
+    """
+    Count the lines a greedy wrap produces (same rule as render_core.wrap_text).
+
+    Args:
+        widths: Word widths in pixels
+        space_width: Space width in pixels
+        max_width: Maximum line width in pixels
+
+    Returns:
+        Number of lines
+    """
+    lines = 0
+    line_width = None
+    for width in widths:
+        if line_width is None:
+            line_width = width
+        elif line_width + space_width + width > max_width:
+            lines += 1
+            line_width = width
+        else:
+            line_width += space_width + width
+        if line_width > max_width:
+            # A single word wider than the box gets a line to itself
+            lines += 1
+            line_width = None
+    if line_width is not None:
+        lines += 1
+    return lines
+
+
+def fit_font_size(
+    text: str,
+    font_path: Optional[str],
+    box_width: int,
+    max_height: int,
+    padding: int,
+    line_spacing: int,
+    min_size: int,
+    max_size: int
+) -> int:
+    """
+    Find the largest font size at which the text box fits max_height.
+
+    Args:
+        text: Quote text
+        font_path: Font file path from resolve_font_path()
+        box_width: Width of the text box
+        max_height: Maximum height of the text box including padding
+        padding: Box padding on each side
+        line_spacing: Extra space between lines
+        min_size: Smallest allowed font size
+        max_size: Largest allowed font size
+
+    Returns:
+        Font size (min_size if even that does not fit)
+    """
+    metrics = get_word_metrics(font_path)
+    unit_widths = metrics.widths(text.split())
+    max_width = box_width - 2 * padding
+
+    def fits(size: int) -> bool:
+        lines = count_lines([w * size for w in unit_widths], metrics.space_width * size, max_width)
+        height = lines * metrics.line_height * size + (lines - 1) * line_spacing + 2 * padding
+        return height <= max_height
+
+    low, high = min_size, max(min_size, max_size)
+    if fits(high):
+        return high
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
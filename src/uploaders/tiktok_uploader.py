@@ -18,6 +18,7 @@ from selenium.common.exceptions import TimeoutException, ElementClickIntercepted
 from utils import bold, green, red, cyan, purple, pink
 from utils import shorten_path_from_project_meme
 from utils import clear_text
+from src.processors.covers import cover_path
 
 
 # Extracts the month and day from a string date in format "MM/DD/YYYY".
@@ -169,6 +170,35 @@ def get_description_from_json(video_file_name, base_path):
         return ''
     
 
+def _set_cover(driver, cover_file: str) -> None:
+    """Uploads the exported cover image of the video"""
+
+    if not os.path.isfile(cover_file):
+        logging.info("No cover image exported for this video.")
+        return
+
+    logging.info("Opening cover editor")
+    WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Edit cover')]"))
+    ).click()
+
+    WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Upload cover')]"))
+    ).click()
+
+    logging.info(f"Uploading cover image: {bold(shorten_path_from_project_meme(cover_file))}")
+    cover_input = WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.XPATH, "//input[@type='file' and contains(@accept, 'image')]"))
+    )
+    cover_input.send_keys(cover_file)
+    time.sleep(2)
+
+    WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[.//*[text()='Confirm'] or text()='Confirm']"))
+    ).click()
+    logging.info(green("Cover image set."))
+
+
 def _set_description(driver, description: str) -> None:
     """Sets the description of the video"""
     
@@ -339,6 +369,13 @@ def upload_video_to_tiktok(video_file_name_long, schedule_time, credentials):
         except Exception as e:
             logging.error(red(f"Error in setting description: {str(e)}"))
             logging.error(red(f"Traceback: {traceback.format_exc()}"))
+
+        # Set the cover exported by the generator; TikTok's default frame is used if this fails
+        try:
+            base_name = os.path.splitext(os.path.basename(video_file_name_long))[0]
+            _set_cover(driver, cover_path(base_path, base_name, 'tiktok'))
+        except Exception as e:
+            logging.error(red(f"Error in setting cover: {str(e)}"))
         time.sleep(10)
 
 
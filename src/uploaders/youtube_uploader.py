@@ -14,6 +14,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from utils import bold, green, red, cyan
 from utils import shorten_path_from_project_meme
 from utils import clear_text
+from src.processors.covers import cover_path
 
 
 
@@ -73,6 +74,20 @@ def upload_video_to_youtube(video_file_name_short, schedule_time, credentials):
         
         time.sleep(3)
 
+        # Set the thumbnail exported by the generator
+        base_path = os.path.dirname(os.path.dirname(video_file_name_short))
+        base_name = os.path.splitext(os.path.basename(video_file_name_short))[0]
+        thumbnail_file = cover_path(base_path, base_name, 'youtube')
+        if os.path.isfile(thumbnail_file):
+            try:
+                logging.info(green("Uploading thumbnail."))
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, "//input[@id='file-loader']"))
+                ).send_keys(thumbnail_file)
+                time.sleep(2)
+            except Exception as e:
+                logging.error(red(f"Error in setting thumbnail: {str(e)}"))
+
         # Set 'No, it's not made for kids'
         logging.info(green("Selecting 'No, it's not made for kids' option."))
         WebDriverWait(driver, 30).until(
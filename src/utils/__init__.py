@@ -14,6 +14,7 @@ from .file_utils import (
     get_latest_filename, list_files, get_file_size_mb, clean_filename
 )
 from .config import ConfigManager, get_config, init_config
+from .ffmpeg import get_ffmpeg_binary
 
 __all__ = [
     # Terminal formatting
@@ -29,4 +30,7 @@ __all__ = [
     
     # Configuration
     'ConfigManager', 'get_config', 'init_config',
+    
+    # FFmpeg
+    'get_ffmpeg_binary',
 ]
@@ -0,0 +1,259 @@
+"""
+Concurrency autotuner for generation batches.
+
+How many videos to generate in parallel, and how many x264 threads each
+encode gets, depends on sound lengths, image sizes, the encoder preset and
+the machine. The tuner measures throughput in videos per minute while a
+batch runs and hill-climbs over both: it adds workers while that helps,
+tries fewer if the first step up did not, then tries the other thread
+split. The best setting found is saved per machine (and per profile) and
+used as the default by later runs; search progress is saved too, so short
+cron batches carry the search forward.
+"""
+
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .config import get_config
+
+
+DEFAULT_TUNE_FILE = os.path.join('~', '.reel-generator', 'autotune.json')
+# A trial has to beat the best setting by this much to replace it
+MIN_IMPROVEMENT = 0.05
+# Finished videos measured per trial, per worker
+TRIAL_JOBS_PER_WORKER = 2
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(key: str, default):
+    try:
+        return get_config().get(key, default)
+    except FileNotFoundError:
+        return default
+
+
+@dataclass(frozen=True)
+class TuneSetting:
+    """Parallel generation workers and x264 threads per encode (0 = ffmpeg default)."""
+
+    workers: int
+    threads: int
+
+
+def machine_key(*parts: str) -> str:
+    """
+    Build the key a tuned setting is saved under.
+
+    Args:
+        *parts: What else the setting depends on (profile, preset, encoder)
+
+    Returns:
+        Key of host name, core count and the parts
+    """
+    return '/'.join([platform.node() or 'localhost', str(os.cpu_count() or 1)] + list(parts))
+
+
+def tune_file() -> str:
+    """
+    Get the file tuned settings are saved in.
+
+    Returns:
+        Path from performance.autotune_file
+    """
+    return os.path.expanduser(_setting('performance.autotune_file', DEFAULT_TUNE_FILE))
+
+
+def load_tuned(key: str) -> Optional[Dict]:
+    """
+    Load the saved tuning state of a key.
+
+    Args:
+        key: Key from machine_key()
+
+    Returns:
+        Saved state, or None if there is none
+    """
+    try:
+        with open(tune_file(), 'r') as f:
+            return json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
+
+
+def save_tuned(key: str, state: Dict) -> None:
+    """
+    Save the tuning state of a key, keeping the other keys.
+
+    Args:
+        key: Key from machine_key()
+        state: State to save
+    """
+    path = tune_file()
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data[key] = state
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ConcurrencyTuner:
+    """Hill-climbing tuner of generation workers and encoder threads."""
+
+    def __init__(self, key: str, max_workers: int, cpu_count: Optional[int] = None):
+        """
+        Initialize the tuner from its saved state.
+
+        Args:
+            key: Key from machine_key()
+            max_workers: Most workers worth trying (e.g. the encode slot limit)
+            cpu_count: Cores to split between encoders (os.cpu_count() if None)
+        """
+        self.key = key
+        self.max_workers = max(1, max_workers)
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.trial = 0
+        self.trial_started: Optional[float] = None
+        self.trial_finished = 0
+        self._lock = threading.Lock()
+
+        saved = load_tuned(key) or {}
+        workers = min(self.max_workers, max(1, int(saved.get('workers', 1))))
+        self.best: Optional[Tuple[TuneSetting, float]] = None
+        if 'videos_per_minute' in saved:
+            self.best = (TuneSetting(workers, int(saved.get('threads', 0))), float(saved['videos_per_minute']))
+        self.phase = saved.get('phase', 'up')
+        self.moved_up = bool(saved.get('moved_up', False))
+
+        if self.best is None:
+            self.setting = TuneSetting(workers, 0)
+        elif self.phase == 'done':
+            self.setting = self.best[0]
+        else:
+            self.setting = self._next_candidate() or self.best[0]
+        self._start_trial()
+
+    @property
+    def converged(self) -> bool:
+        """Whether the search has finished."""
+        return self.phase == 'done'
+
+    def _start_trial(self) -> None:
+        self.trial += 1
+        # The clock starts with the trial's first job, not while earlier jobs drain
+        self.trial_started = None
+        self.trial_finished = 0
+
+    def _fair_threads(self, workers: int) -> int:
+        """Cores per worker, the alternative to ffmpeg's own thread count."""
+        return max(1, self.cpu_count // workers)
+
+    def _next_candidate(self) -> Optional[TuneSetting]:
+        """Get the next setting to try in the current phase, advancing past empty phases."""
+        best = self.best[0]
+        while True:
+            if self.phase == 'up':
+                if best.workers < self.max_workers:
+                    return TuneSetting(best.workers + 1, best.threads and self._fair_threads(best.workers + 1))
+                self.phase = 'threads' if self.moved_up or best.workers == 1 else 'down'
+            elif self.phase == 'down':
+                if best.workers > 1:
+                    return TuneSetting(best.workers - 1, best.threads and self._fair_threads(best.workers - 1))
+                self.phase = 'threads'
+            elif self.phase == 'threads':
+                # Try the other split: ffmpeg's own thread count or an equal share of the cores
+                threads = 0 if best.threads else self._fair_threads(best.workers)
+                candidate = TuneSetting(best.workers, threads)
+                if candidate != best:
+                    return candidate
+                self.phase = 'done'
+            else:
+                return None
+
+    def job_started(self) -> int:
+        """
+        Note that a job starts under the current setting.
+
+        Returns:
+            Trial token to pass to job_finished()
+        """
+        with self._lock:
+            if self.trial_started is None:
+                self.trial_started = time.monotonic()
+            return self.trial
+
+    def job_finished(self, trial: int) -> Optional[TuneSetting]:
+        """
+        Record a finished job and move the search on when its trial is complete.
+
+        Jobs started under an earlier setting do not count for the current trial.
+
+        Args:
+            trial: Token from job_started()
+
+        Returns:
+            The new setting if it changed, else None
+        """
+        with self._lock:
+            if self.converged or trial != self.trial:
+                return None
+            self.trial_finished += 1
+            if self.trial_finished < TRIAL_JOBS_PER_WORKER * self.setting.workers:
+                return None
+
+            elapsed = max(1e-6, time.monotonic() - self.trial_started)
+            throughput = self.trial_finished * 60.0 / elapsed
+            logger.info(f"Autotune: {self.setting.workers} worker(s), "
+                        f"{self.setting.threads or 'auto'} encoder threads: {throughput:.2f} videos/min")
+            return self._advance(throughput)
+
+    def _advance(self, throughput: float) -> Optional[TuneSetting]:
+        previous = self.setting
+        if self.best is None:
+            self.best = (self.setting, throughput)
+        elif throughput > self.best[1] * (1 + MIN_IMPROVEMENT):
+            self.best = (self.setting, throughput)
+            if self.phase == 'up':
+                self.moved_up = True
+            elif self.phase == 'threads':
+                self.phase = 'done'
+        elif self.phase == 'up':
+            self.phase = 'threads' if self.moved_up or self.best[0].workers == 1 else 'down'
+        elif self.phase == 'down':
+            self.phase = 'threads'
+        elif self.phase == 'threads':
+            self.phase = 'done'
+
+        candidate = self._next_candidate()
+        self.setting = candidate or self.best[0]
+        if self.converged:
+            logger.info(f"Autotune converged: {self.setting.workers} worker(s), "
+                        f"{self.setting.threads or 'auto'} encoder threads")
+        self._save()
+        self._start_trial()
+        return self.setting if self.setting != previous else None
+
+    def _save(self) -> None:
+        setting, throughput = self.best
+        try:
+            save_tuned(self.key, {
+                'workers': setting.workers,
+                'threads': setting.threads,
+                'videos_per_minute': round(throughput, 3),
+                'phase': self.phase,
+                'moved_up': self.moved_up,
+            })
+        except OSError as e:
+            logger.warning(f"Could not save autotune results: {e}")
@@ -0,0 +1,257 @@
+"""
+Machine-wide encode slots.
+
+The GUI, CLI batches started by hand and cron runs all encode on the same
+machine. Each job takes one of performance.max_concurrent_generations
+slots before it starts encoding, so together they never run more jobs
+than the box can handle. Slots are lock files in a shared directory; the
+OS drops a lock when its process dies, so a crashed run cannot hold a slot.
+Waiting jobs queue with a ticket file and are served in arrival order,
+and the caller is told its position while it waits.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .config import get_config
+from .resources import get_resource_manager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+DEFAULT_SLOTS = 2
+SLOTS_FOLDER = 'reel-generator-slots'
+QUEUE_FOLDER = 'queue'
+POLL_SECONDS = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(key: str, default):
+    try:
+        return get_config().get(key, default)
+    except FileNotFoundError:
+        return default
+
+
+def _try_lock(handle) -> bool:
+    """Take an exclusive lock on an open file without waiting."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+class EncodeSlots:
+    """Cross-process limit on concurrently encoding jobs."""
+
+    def __init__(self, slots: Optional[int] = None, directory: Optional[str] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            slots: Concurrent jobs allowed on the machine; 0 disables the limit
+                (performance.max_concurrent_generations if None)
+            directory: Shared lock directory (performance.slot_dir if None;
+                "auto" uses the system temp directory)
+        """
+        self.slots = int(_setting('performance.max_concurrent_generations', DEFAULT_SLOTS)
+                         if slots is None else slots)
+        configured = directory or _setting('performance.slot_dir', 'auto')
+        if not configured or configured == 'auto':
+            configured = os.path.join(tempfile.gettempdir(), SLOTS_FOLDER)
+        self.directory = os.path.expanduser(configured)
+        self._local = threading.local()
+
+    def _queue_dir(self) -> str:
+        path = os.path.join(self.directory, QUEUE_FOLDER)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _enqueue(self) -> str:
+        """Create this caller's ticket; names sort in arrival order."""
+        name = f"{time.time_ns():020d}-{os.getpid()}-{threading.get_ident()}"
+        path = os.path.join(self._queue_dir(), name)
+        open(path, 'w').close()
+        return path
+
+    def _tickets(self) -> List[str]:
+        """List the live tickets, oldest first, removing those of dead processes."""
+        queue_dir = self._queue_dir()
+        tickets = []
+        for name in sorted(os.listdir(queue_dir)):
+            parts = name.split('-')
+            if len(parts) != 3 or not parts[1].isdigit():
+                continue
+            if not _pid_alive(int(parts[1])):
+                try:
+                    os.remove(os.path.join(queue_dir, name))
+                except OSError:
+                    pass
+                continue
+            tickets.append(name)
+        return tickets
+
+    def position(self, ticket: str) -> int:
+        """
+        Get how many waiting callers are ahead of a ticket.
+
+        Args:
+            ticket: Path returned by the queue
+
+        Returns:
+            Number of older live tickets (0 if next in line)
+        """
+        name = os.path.basename(ticket)
+        tickets = self._tickets()
+        return tickets.index(name) if name in tickets else 0
+
+    def _try_slot(self) -> Optional[Tuple[int, object]]:
+        """Lock the first free slot file."""
+        for index in range(self.slots):
+            handle = open(os.path.join(self.directory, f"slot-{index}.lock"), 'a+b')
+            if _try_lock(handle):
+                return index, handle
+            handle.close()
+        return None
+
+    def in_use(self) -> int:
+        """
+        Count the slots currently held on the machine.
+
+        Returns:
+            Number of locked slot files
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        held = 0
+        for index in range(self.slots):
+            with open(os.path.join(self.directory, f"slot-{index}.lock"), 'a+b') as handle:
+                if _try_lock(handle):
+                    _unlock(handle)
+                else:
+                    held += 1
+        return held
+
+    @contextmanager
+    def acquire(self, on_wait: Optional[Callable[[int], None]] = None) -> Iterator[Optional[int]]:
+        """
+        Hold an encode slot for the duration of a job.
+
+        Waits in arrival order while all slots are taken. Nested acquires
+        on the same thread reuse the held slot. A cancel of the current
+        job (see resources) ends the wait with JobCancelled.
+
+        Args:
+            on_wait: Called with the 1-based queue position whenever it
+                changes while waiting
+
+        Yields:
+            Index of the held slot, or None if the limit is disabled
+        """
+        held = getattr(self._local, 'slot', None)
+        if self.slots <= 0 or held is not None:
+            yield held
+            return
+
+        scope = get_resource_manager().current()
+        os.makedirs(self.directory, exist_ok=True)
+        ticket = self._enqueue()
+        acquired = None
+        try:
+            reported = None
+            while acquired is None:
+                scope.raise_if_cancelled()
+                ahead = self.position(ticket)
+                # The oldest waiters may take any free slot; the rest keep their turn
+                if ahead < self.slots:
+                    acquired = self._try_slot()
+                    if acquired is not None:
+                        break
+                if ahead + 1 != reported:
+                    reported = ahead + 1
+                    logger.info(f"Waiting for an encode slot (position {reported} in queue)")
+                    if on_wait is not None:
+                        on_wait(reported)
+                time.sleep(POLL_SECONDS)
+        finally:
+            try:
+                os.remove(ticket)
+            except OSError:
+                pass
+
+        index, handle = acquired
+        self._local.slot = index
+        try:
+            yield index
+        finally:
+            self._local.slot = None
+            _unlock(handle)
+            handle.close()
+
+
+_slots: Optional[EncodeSlots] = None
+_slots_lock = threading.Lock()
+
+
+def get_encode_slots() -> EncodeSlots:
+    """
+    Get the global encode slot limiter.
+
+    Returns:
+        EncodeSlots instance
+    """
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = EncodeSlots()
+        return _slots
+
+
+def encode_slot(on_wait: Optional[Callable[[int], None]] = None):
+    """
+    Hold a machine-wide encode slot (context manager).
+
+    Args:
+        on_wait: Called with the queue position while waiting
+
+    Returns:
+        Context manager yielding the slot index
+    """
+    return get_encode_slots().acquire(on_wait)
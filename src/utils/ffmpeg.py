@@ -0,0 +1,36 @@
+"""
+FFmpeg helpers.
+
+This module locates the ffmpeg binary shared by the generator and processors.
+"""
+
+import os
+import shutil
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_binary() -> str:
+    """
+    Locate the ffmpeg executable.
+
+    Prefers the FFMPEG_BINARY environment variable, then the binary bundled
+    with imageio-ffmpeg (the one MoviePy uses), then ffmpeg on PATH.
+
+    Returns:
+        Path to the ffmpeg executable
+    """
+    env_binary = os.getenv('FFMPEG_BINARY')
+    if env_binary and env_binary != 'ffmpeg-imageio':
+        return env_binary
+
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        pass
+
+    binary = shutil.which('ffmpeg')
+    if not binary:
+        raise FileNotFoundError("ffmpeg not found. Install FFmpeg or imageio-ffmpeg.")
+    return binary
@@ -0,0 +1,222 @@
+"""
+Background mover for finished outputs.
+
+Encoders write into the local scratch directory; the mover transfers the
+finished files to the niche folders (often on a NAS) on a small thread
+pool, so encoding never waits on network writes. Each transfer is a copy
+to a hidden partial file, fsync and rename (see scratch.move_into_place),
+so the niche folders only ever show complete files.
+
+A failed transfer is retried with backoff. If the niche folder stays
+unreachable, the file is kept in a local fallback folder outside the
+scratch directory (listed in its pending.jsonl with the intended
+destination) rather than deleted.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import get_config
+from .scratch import move_into_place
+
+
+DEFAULT_WORKERS = 2
+# Staged bytes allowed to wait for the mover before submit() blocks
+DEFAULT_MAX_BACKLOG_MB = 1024
+# Seconds to wait before each retry of a failed transfer
+RETRY_DELAYS = (1.0, 4.0, 15.0)
+DEFAULT_FALLBACK_DIR = os.path.join('~', '.reel-generator', 'unmoved')
+FALLBACK_MANIFEST = 'pending.jsonl'
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(key: str, default):
+    try:
+        return get_config().get(key, default)
+    except FileNotFoundError:
+        return default
+
+
+@dataclass(frozen=True)
+class MoveFailure:
+    """A file that could not be moved to its destination."""
+
+    destination: str
+    kept_path: Optional[str]
+    error: str
+
+    @property
+    def message(self) -> str:
+        """Human-readable description for logs and dialogs."""
+        kept = f"kept at {self.kept_path}" if self.kept_path else "left in the scratch directory"
+        return f"Could not move {os.path.basename(self.destination)}: {self.error} ({kept})"
+
+
+class MoveError(RuntimeError):
+    """Raised for outputs that were encoded but could not be delivered."""
+
+    def __init__(self, failures: Sequence[MoveFailure]):
+        self.failures = list(failures)
+        super().__init__('; '.join(failure.message for failure in self.failures))
+
+
+def fallback_dir() -> str:
+    """
+    Get the local folder that keeps outputs the mover could not deliver.
+
+    Returns:
+        Path from performance.mover_fallback_dir
+    """
+    return os.path.expanduser(_setting('performance.mover_fallback_dir', DEFAULT_FALLBACK_DIR))
+
+
+class OutputMover:
+    """Bounded thread pool that moves staged files into place."""
+
+    def __init__(self, workers: Optional[int] = None, max_backlog_mb: Optional[int] = None):
+        """
+        Initialize the mover.
+
+        Args:
+            workers: Concurrent transfers (performance.mover_workers if None)
+            max_backlog_mb: Staged megabytes before submit() waits
+                (performance.mover_max_backlog_mb if None)
+        """
+        self.workers = max(1, int(workers or _setting('performance.mover_workers', DEFAULT_WORKERS)))
+        backlog_mb = max_backlog_mb or _setting('performance.mover_max_backlog_mb', DEFAULT_MAX_BACKLOG_MB)
+        self.max_backlog_bytes = int(backlog_mb) * 1024 * 1024
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='output-mover')
+        self._condition = threading.Condition()
+        self._pending_files = 0
+        self._pending_bytes = 0
+        self._errors: List[MoveFailure] = []
+        self._owned: Dict[str, List[Future]] = {}
+        self._fallback_lock = threading.Lock()
+
+    def submit(self, moves: Sequence[Tuple[str, str]], owner: Optional[str] = None) -> Future:
+        """
+        Queue a group of files to move, in order, by one worker.
+
+        Groups keep the files of one output together, e.g. stills before the
+        video so the video never appears without its thumbnail. Waits only
+        while the staged backlog is over its limit.
+
+        Args:
+            moves: (staged path, destination path) pairs
+            owner: Job the files belong to, for take()
+
+        Returns:
+            Future that completes with the group's MoveFailure list
+        """
+        size = sum(os.path.getsize(source) for source, _ in moves if os.path.exists(source))
+        with self._condition:
+            while self._pending_bytes and self._pending_bytes + size > self.max_backlog_bytes:
+                self._condition.wait()
+            self._pending_files += len(moves)
+            self._pending_bytes += size
+        future = self._pool.submit(self._move_group, list(moves), size)
+        if owner is not None:
+            with self._condition:
+                self._owned.setdefault(owner, []).append(future)
+        return future
+
+    def take(self, owner: str) -> List[Future]:
+        """
+        Get and forget the futures of the groups a job submitted.
+
+        Args:
+            owner: Job name passed to submit()
+
+        Returns:
+            Futures completing with each group's MoveFailure list
+        """
+        with self._condition:
+            return self._owned.pop(owner, [])
+
+    def _move_group(self, moves: List[Tuple[str, str]], size: int) -> List[MoveFailure]:
+        failures = []
+        try:
+            for source, destination in moves:
+                try:
+                    failure = self._move_with_retries(source, destination)
+                finally:
+                    with self._condition:
+                        self._pending_files -= 1
+                if failure is not None:
+                    logger.error(failure.message)
+                    failures.append(failure)
+                    with self._condition:
+                        self._errors.append(failure)
+        finally:
+            with self._condition:
+                self._pending_bytes -= size
+                self._condition.notify_all()
+        return failures
+
+    def _move_with_retries(self, source: str, destination: str) -> Optional[MoveFailure]:
+        """Move a file, retrying with backoff, and keep it locally if that keeps failing."""
+        for delay in RETRY_DELAYS + (None,):
+            try:
+                move_into_place(source, destination)
+                return None
+            except OSError as e:
+                error = e
+            if delay is None:
+                break
+            logger.warning(f"Moving {os.path.basename(destination)} failed ({error}), retrying in {delay:.0f}s")
+            time.sleep(delay)
+        return MoveFailure(destination, self._keep_locally(source, destination), str(error))
+
+    def _keep_locally(self, source: str, destination: str) -> Optional[str]:
+        """Move an undeliverable file to the fallback folder, outside the scratch directory."""
+        folder = fallback_dir()
+        with self._fallback_lock:
+            try:
+                os.makedirs(folder, exist_ok=True)
+                base, ext = os.path.splitext(os.path.basename(destination))
+                kept_path = os.path.join(folder, base + ext)
+                suffix = 1
+                while os.path.exists(kept_path):
+                    kept_path = os.path.join(folder, f"{base}.{suffix}{ext}")
+                    suffix += 1
+                move_into_place(source, kept_path)
+                with open(os.path.join(folder, FALLBACK_MANIFEST), 'a') as f:
+                    f.write(json.dumps({'file': kept_path, 'destination': destination}) + '\n')
+                return kept_path
+            except OSError as e:
+                logger.error(f"Could not keep {os.path.basename(destination)} in {folder}: {e}")
+                return None
+
+    def backlog(self) -> Tuple[int, int]:
+        """
+        Get how far the mover is behind.
+
+        Returns:
+            Tuple of (files waiting, bytes waiting)
+        """
+        with self._condition:
+            return self._pending_files, self._pending_bytes
+
+    def wait(self) -> List[MoveFailure]:
+        """
+        Wait until every queued file has been moved.
+
+        Returns:
+            Failed moves since the last wait()
+        """
+        with self._condition:
+            while self._pending_files:
+                self._condition.wait()
+            errors, self._errors = self._errors, []
+        return errors
+
+    def shutdown(self) -> None:
+        """Finish the queued moves and stop the worker threads."""
+        self._pool.shutdown(wait=True)
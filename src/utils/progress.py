@@ -0,0 +1,187 @@
+"""
+Encode progress and batch ETA.
+
+ffmpeg's -progress output (key=value lines, one block per update) is
+parsed into frame and time events. Jobs add up the events of their ffmpeg
+processes, and BatchEta turns them into a batch fraction and an ETA from
+the encode speed observed so far.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """One progress update of an ffmpeg process."""
+
+    frame: int
+    seconds: float
+    speed: Optional[float]
+    done: bool
+
+
+class FfmpegProgress:
+    """Parser for the key=value lines of ffmpeg -progress."""
+
+    def __init__(self):
+        """Initialize the parser."""
+        self._fields: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[ProgressEvent]:
+        """
+        Parse one line of -progress output.
+
+        Args:
+            line: Line without the trailing newline
+
+        Returns:
+            ProgressEvent when the line closes an update block, else None
+        """
+        key, _, value = line.strip().partition('=')
+        if not key:
+            return None
+        if key != 'progress':
+            self._fields[key] = value.strip()
+            return None
+
+        fields, self._fields = self._fields, {}
+        return ProgressEvent(
+            frame=_to_int(fields.get('frame')),
+            seconds=_out_time(fields),
+            speed=_to_speed(fields.get('speed')),
+            done=value.strip() == 'end'
+        )
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _out_time(fields: Dict[str, str]) -> float:
+    # out_time_us is in microseconds; old ffmpeg versions misname it out_time_ms
+    for key in ('out_time_us', 'out_time_ms'):
+        try:
+            return max(0.0, int(fields[key]) / 1_000_000)
+        except (KeyError, ValueError):
+            continue
+    return 0.0
+
+
+def _to_speed(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value.rstrip('x'))
+    except (AttributeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class JobProgress:
+    """Progress of one job (all of its ffmpeg processes together)."""
+
+    name: str
+    frames: int
+    seconds: float
+    total_seconds: Optional[float]
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Encoded share of the job, if its length is known."""
+        if not self.total_seconds:
+            return None
+        return min(1.0, self.seconds / self.total_seconds)
+
+
+class BatchEta:
+    """Batch fraction and ETA from observed encode speed, over parallel jobs."""
+
+    def __init__(self, total_jobs: int):
+        """
+        Initialize the estimator.
+
+        Args:
+            total_jobs: Number of jobs in the batch
+        """
+        self.total_jobs = max(1, total_jobs)
+        self.finished_jobs = 0
+        self.finished_seconds = 0.0
+        self.running: Dict[str, JobProgress] = {}
+        self.started = time.monotonic()
+
+    def update(self, progress: JobProgress) -> None:
+        """
+        Record progress of a running job.
+
+        Args:
+            progress: Latest job progress
+        """
+        self.running[progress.name] = progress
+
+    def job_finished(self, name: Optional[str] = None) -> None:
+        """
+        Count a job as done.
+
+        Args:
+            name: Job name (JobProgress.name); None if it never reported progress
+        """
+        self.finished_jobs += 1
+        progress = self.running.pop(name, None) if name is not None else None
+        if progress is not None:
+            self.finished_seconds += progress.total_seconds or progress.seconds
+
+    def fraction(self) -> float:
+        """
+        Get the finished share of the batch.
+
+        Returns:
+            Fraction in [0, 1]
+        """
+        running = sum(progress.fraction or 0.0 for progress in list(self.running.values()))
+        return min(1.0, (self.finished_jobs + running) / self.total_jobs)
+
+    def eta(self) -> Optional[float]:
+        """
+        Estimate the remaining time of the batch.
+
+        Returns:
+            Seconds remaining, or None until there is enough to go on
+        """
+        encoded = self.finished_seconds
+        remaining = 0.0
+        lengths = [self.finished_seconds]
+        jobs_seen = self.finished_jobs
+        for progress in list(self.running.values()):
+            if progress.total_seconds:
+                encoded += progress.seconds
+                remaining += max(0.0, progress.total_seconds - progress.seconds)
+                lengths.append(progress.total_seconds)
+                jobs_seen += 1
+
+        elapsed = time.monotonic() - self.started
+        if encoded <= 0 or elapsed <= 0 or not jobs_seen:
+            return None
+        average_length = sum(lengths) / jobs_seen
+        remaining += max(0, self.total_jobs - jobs_seen) * average_length
+        # Media seconds per wall second, including rendering and muxing between encodes
+        speed = encoded / elapsed
+        return remaining / speed
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """
+    Format an ETA for the status bar.
+
+    Args:
+        seconds: Remaining seconds or None
+
+    Returns:
+        Text such as "2m 05s", or "--" if unknown
+    """
+    if seconds is None:
+        return '--'
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
@@ -0,0 +1,370 @@
+"""
+Job-scoped tracking of clips and subprocesses.
+
+Every MoviePy clip and ffmpeg process opened for a job is registered with
+that job's scope. When the job ends, on success, error or cancel, the
+scope closes the clips and kills any process still running and closes its
+pipes, so failures in a long batch cannot leak ffmpeg readers or file
+descriptors. The manager also keeps live counts for monitoring.
+
+Scopes also carry the job's encode progress and its cancel flag: cancel
+kills the job's processes at once, and the code waiting on them raises
+JobCancelled so the job unwinds and removes its partial files.
+"""
+
+import atexit
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .progress import JobProgress, ProgressEvent
+
+
+class JobCancelled(Exception):
+    """Raised in a job that was cancelled while it was running."""
+
+
+class ResourceScope:
+    """Clips, subprocesses and progress of one job."""
+
+    def __init__(self, name: str, on_progress: Optional[Callable[[JobProgress], None]] = None):
+        """
+        Initialize the scope.
+
+        Args:
+            name: Job name, for monitoring
+            on_progress: Called with the job's progress on every ffmpeg update
+        """
+        self.name = name
+        self.clips: List[Any] = []
+        self.processes: List[subprocess.Popen] = []
+        self.on_progress = on_progress
+        self.total_seconds: Optional[float] = None
+        self.cancelled = threading.Event()
+        # Encoding budget set by the batch runner: x264 threads per ffmpeg
+        # process (0 = ffmpeg's default) and cores the job may use (None = all)
+        self.encoder_threads = 0
+        self.cores: Optional[int] = None
+        self._progress: Dict[int, ProgressEvent] = {}
+        self._lock = threading.Lock()
+
+    def expect(self, total_seconds: float) -> None:
+        """
+        Set the media length the job will encode, for progress fractions.
+
+        Args:
+            total_seconds: Output duration in seconds
+        """
+        self.total_seconds = total_seconds
+
+    def report_progress(self, key: int, event: ProgressEvent) -> None:
+        """
+        Record an update of one of the job's encodes and notify the listener.
+
+        Parallel encodes (segments) are added up.
+
+        Args:
+            key: Identifies the reporting process
+            event: Parsed -progress update
+        """
+        with self._lock:
+            self._progress[key] = event
+            frames = sum(e.frame for e in self._progress.values())
+            seconds = sum(e.seconds for e in self._progress.values())
+        if self.on_progress is not None:
+            self.on_progress(JobProgress(self.name, frames, seconds, self.total_seconds))
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Stop the job if it was cancelled.
+
+        Raises:
+            JobCancelled: If cancel() was called
+        """
+        if self.cancelled.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+
+    def cancel(self) -> None:
+        """Flag the job as cancelled and kill its processes."""
+        self.cancelled.set()
+        self.close()
+
+    def track(self, clip: Any) -> Any:
+        """
+        Register a clip (anything with close()) to close with the scope.
+
+        Args:
+            clip: Clip to track
+
+        Returns:
+            The same clip
+        """
+        with self._lock:
+            self.clips.append(clip)
+        return clip
+
+    def track_process(self, process: subprocess.Popen) -> subprocess.Popen:
+        """
+        Register a subprocess to reap with the scope.
+
+        Args:
+            process: Started process
+
+        Returns:
+            The same process
+        """
+        with self._lock:
+            self.processes.append(process)
+        return process
+
+    def release_process(self, process: subprocess.Popen) -> None:
+        """
+        Reap a process and stop tracking it.
+
+        Args:
+            process: Process registered with track_process()
+        """
+        reap_process(process)
+        with self._lock:
+            if process in self.processes:
+                self.processes.remove(process)
+
+    def live_processes(self) -> int:
+        """Count the tracked processes that are still running."""
+        with self._lock:
+            return sum(1 for process in self.processes if process.poll() is None)
+
+    def close(self) -> None:
+        """Kill the scope's live processes and close its clips."""
+        with self._lock:
+            processes, self.processes = self.processes, []
+            clips, self.clips = self.clips, []
+        for process in processes:
+            reap_process(process)
+        for clip in reversed(clips):
+            try:
+                clip.close()
+            except Exception:
+                pass
+
+
+def reap_process(process: subprocess.Popen) -> None:
+    """
+    Kill a process if it is still running and close its pipes.
+
+    Args:
+        process: Process to reap
+    """
+    if process.poll() is None:
+        process.kill()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        pass
+    for stream in (process.stdin, process.stdout, process.stderr):
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ResourceManager:
+    """Registry of the active job scopes."""
+
+    def __init__(self):
+        """Initialize the manager with a scope for resources opened outside any job."""
+        self.unscoped = ResourceScope('unscoped')
+        self._scopes: List[ResourceScope] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self) -> ResourceScope:
+        """
+        Get the scope of the calling thread's job.
+
+        Returns:
+            Innermost scope entered or bound on this thread, else the unscoped scope
+        """
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else self.unscoped
+
+    @contextmanager
+    def bind(self, scope: ResourceScope) -> Iterator[ResourceScope]:
+        """
+        Make a scope current on this thread, e.g. in a worker thread of a job.
+
+        Args:
+            scope: Scope to bind
+
+        Yields:
+            The scope
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(scope)
+        try:
+            yield scope
+        finally:
+            stack.pop()
+
+    @contextmanager
+    def scope(self, name: str, on_progress: Optional[Callable[[JobProgress], None]] = None) -> Iterator[ResourceScope]:
+        """
+        Run a job in its own scope, reaping its resources when it ends.
+
+        Args:
+            name: Job name
+            on_progress: Called with the job's encode progress
+
+        Yields:
+            The job's scope
+        """
+        scope = ResourceScope(name, on_progress)
+        with self._lock:
+            self._scopes.append(scope)
+        try:
+            with self.bind(scope):
+                yield scope
+        finally:
+            scope.close()
+            with self._lock:
+                self._scopes.remove(scope)
+
+    def reap_all(self) -> None:
+        """Kill the processes and close the clips of every active job (cancel)."""
+        with self._lock:
+            scopes = list(self._scopes)
+        for scope in scopes:
+            scope.close()
+
+    def cancel_all(self) -> None:
+        """Cancel every active job, killing its running encodes immediately."""
+        with self._lock:
+            scopes = list(self._scopes)
+        for scope in scopes:
+            scope.cancel()
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Get live resource counts.
+
+        Returns:
+            Dictionary with active jobs, open clips and running processes
+        """
+        with self._lock:
+            scopes = list(self._scopes)
+        all_scopes = scopes + [self.unscoped]
+        return {
+            'jobs': len(scopes),
+            'clips': sum(len(scope.clips) for scope in all_scopes),
+            'processes': sum(scope.live_processes() for scope in all_scopes),
+        }
+
+
+_manager = ResourceManager()
+
+# Generation runs on daemon threads; do not leave their ffmpeg children behind on exit
+atexit.register(_manager.reap_all)
+
+
+def get_resource_manager() -> ResourceManager:
+    """
+    Get the global resource manager.
+
+    Returns:
+        ResourceManager instance
+    """
+    return _manager
+
+
+def track(clip: Any) -> Any:
+    """
+    Register a clip with the current job.
+
+    Args:
+        clip: Clip to close when the job ends
+
+    Returns:
+        The same clip
+    """
+    return _manager.current().track(clip)
+
+
+def run_process(
+    command: Sequence[str],
+    input_data: Optional[memoryview] = None,
+    capture_stdout: bool = False,
+    on_line: Optional[Callable[[str], None]] = None
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run a subprocess tracked by the current job and wait for it.
+
+    Args:
+        command: Command and arguments
+        input_data: Data written to the process's stdin
+        capture_stdout: Return stdout instead of discarding it
+        on_line: Called with each stdout line as it arrives (stdout is then
+            not returned)
+
+    Returns:
+        Tuple of (return code, stdout, stderr)
+
+    Raises:
+        JobCancelled: If the job was cancelled while the process ran
+    """
+    scope = _manager.current()
+    scope.raise_if_cancelled()
+    process = scope.track_process(subprocess.Popen(
+        list(command),
+        stdin=subprocess.DEVNULL if input_data is None else subprocess.PIPE,
+        stdout=subprocess.PIPE if capture_stdout or on_line else subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    ))
+    try:
+        if on_line is None:
+            stdout, stderr = process.communicate(input_data)
+        else:
+            stdout, stderr = b'', _stream_lines(process, input_data, on_line)
+    except (OSError, ValueError):
+        # Cancel closes the pipes under us
+        scope.raise_if_cancelled()
+        raise
+    finally:
+        scope.release_process(process)
+    scope.raise_if_cancelled()
+    return process.returncode, stdout or b'', stderr or b''
+
+
+def _stream_lines(process: subprocess.Popen, input_data: Optional[memoryview],
+                  on_line: Callable[[str], None]) -> bytes:
+    """Feed stdin and drain stderr on threads while reading stdout line by line."""
+    stderr_chunks: List[bytes] = []
+
+    def feed():
+        try:
+            process.stdin.write(input_data)
+        except OSError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def drain():
+        stderr_chunks.append(process.stderr.read())
+
+    threads = [threading.Thread(target=drain, daemon=True)]
+    if input_data is not None:
+        threads.append(threading.Thread(target=feed, daemon=True))
+    for thread in threads:
+        thread.start()
+    for raw in process.stdout:
+        on_line(raw.decode('utf-8', errors='replace').rstrip())
+    process.wait()
+    for thread in threads:
+        thread.join()
+    return b''.join(stderr_chunks)
@@ -0,0 +1,205 @@
+"""
+Scratch directory utilities.
+
+Temporary audio, intermediate segments and partial outputs are written to
+a per-process scratch directory (tmpfs when it has room) instead of the
+working directory or the niche folders, and finished files are moved into
+place atomically. The performance.temp_cleanup setting decides whether
+scratch files are removed.
+"""
+
+import atexit
+import errno
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .config import get_config
+
+
+TMPFS_DIR = '/dev/shm'
+DEFAULT_MIN_FREE_MB = 1024
+SCRATCH_PREFIX = 'reel-generator-'
+
+_scratch_dir: Optional[str] = None
+_lock = threading.Lock()
+_counter = itertools.count()
+
+
+def _setting(key: str, default):
+    try:
+        return get_config().get(key, default)
+    except FileNotFoundError:
+        return default
+
+
+def temp_cleanup_enabled() -> bool:
+    """
+    Check whether temporary files should be removed.
+
+    Returns:
+        Value of performance.temp_cleanup (True if not configured)
+    """
+    return bool(_setting('performance.temp_cleanup', True))
+
+
+def choose_scratch_root() -> str:
+    """
+    Choose the directory that holds the scratch directory.
+
+    performance.scratch_dir may name a directory; "auto" (the default) uses
+    /dev/shm when it has performance.scratch_min_free_mb free, else the
+    system temp directory.
+
+    Returns:
+        Path of the scratch root
+    """
+    configured = _setting('performance.scratch_dir', 'auto')
+    if configured and configured != 'auto':
+        return os.path.expanduser(configured)
+
+    min_free = int(_setting('performance.scratch_min_free_mb', DEFAULT_MIN_FREE_MB)) * 1024 * 1024
+    if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+        try:
+            if shutil.disk_usage(TMPFS_DIR).free >= min_free:
+                return TMPFS_DIR
+        except OSError:
+            pass
+    return tempfile.gettempdir()
+
+
+def _remove_stale(root: str) -> None:
+    """Remove scratch directories left behind by processes that are gone."""
+    if os.name != 'posix':
+        return
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    for name in names:
+        pid = name[len(SCRATCH_PREFIX):]
+        if not name.startswith(SCRATCH_PREFIX) or not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        except OSError:
+            pass
+
+
+def get_scratch_dir() -> str:
+    """
+    Get this process's scratch directory, creating it on first use.
+
+    Returns:
+        Path of the scratch directory
+    """
+    global _scratch_dir
+    with _lock:
+        if _scratch_dir is None:
+            root = choose_scratch_root()
+            if temp_cleanup_enabled():
+                _remove_stale(root)
+            path = os.path.join(root, f"{SCRATCH_PREFIX}{os.getpid()}")
+            os.makedirs(path, exist_ok=True)
+            _scratch_dir = path
+            atexit.register(cleanup_scratch)
+        return _scratch_dir
+
+
+def scratch_path(name: str) -> str:
+    """
+    Get a unique path in the scratch directory.
+
+    Args:
+        name: File name to base the path on (its extension is kept)
+
+    Returns:
+        Path that does not exist yet
+    """
+    return os.path.join(get_scratch_dir(), f"{next(_counter):06d}-{os.path.basename(name)}")
+
+
+def discard(path: Optional[str]) -> None:
+    """
+    Remove a temporary file if temp_cleanup is enabled.
+
+    Args:
+        path: File path (ignored if None or missing)
+    """
+    if path and temp_cleanup_enabled() and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def scratch_file(name: str) -> Iterator[str]:
+    """
+    Provide a scratch path that is discarded afterwards.
+
+    Args:
+        name: File name to base the path on
+
+    Yields:
+        Scratch file path
+    """
+    path = scratch_path(name)
+    try:
+        yield path
+    finally:
+        discard(path)
+
+
+def move_into_place(source: str, destination: str) -> str:
+    """
+    Move a finished file to its destination atomically.
+
+    Within one filesystem this is a rename. Across filesystems (tmpfs to
+    disk) the file is copied to a hidden partial file next to the
+    destination, synced and then renamed, so the destination never holds a
+    partial file.
+
+    Args:
+        source: Finished file
+        destination: Final path
+
+    Returns:
+        The destination path
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    try:
+        os.replace(source, destination)
+        return destination
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    partial = os.path.join(os.path.dirname(os.path.abspath(destination)),
+                           f".{os.path.basename(destination)}.partial")
+    try:
+        shutil.copyfile(source, partial)
+        with open(partial, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.remove(source)
+    return destination
+
+
+def cleanup_scratch() -> None:
+    """Remove this process's scratch directory if temp_cleanup is enabled."""
+    global _scratch_dir
+    with _lock:
+        if _scratch_dir is not None and temp_cleanup_enabled():
+            shutil.rmtree(_scratch_dir, ignore_errors=True)
+            _scratch_dir = None